@@ -12,6 +12,12 @@ class CLIArguments:
     fit_file_path: Optional[str]
     setup_identifier: Optional[str]
     t_hyp_estimate: Optional[float]
+    batch_path: Optional[str]
+    batch_output_file: Optional[str]
+    batch_worker_count: Optional[int]
+    validation_mode: str
+    cache_directory: Optional[str]
+    fit_mode: str
 
     def __init__(self, raw_args: Namespace):
         self.headless = coalesce(raw_args.headless, False)
@@ -20,6 +26,12 @@ class CLIArguments:
         self.fit_file_path = raw_args.fit_file
         self.setup_identifier = raw_args.setup_identifier
         self.t_hyp_estimate = raw_args.t_hyp_estimate
+        self.batch_path = raw_args.batch
+        self.batch_output_file = raw_args.batch_output_file
+        self.batch_worker_count = raw_args.batch_worker_count
+        self.validation_mode = raw_args.validation_mode
+        self.cache_directory = raw_args.cache_directory
+        self.fit_mode = raw_args.fit_mode
 
     def is_headless(self) -> bool:
         return self.headless
@@ -38,3 +50,21 @@ class CLIArguments:
 
     def get_t_hyp_estimate(self) -> Optional[float]:
         return self.t_hyp_estimate
+
+    def get_batch_path(self) -> Optional[str]:
+        return self.batch_path
+
+    def get_batch_output_file_path(self) -> Optional[str]:
+        return self.batch_output_file
+
+    def get_batch_worker_count(self) -> Optional[int]:
+        return self.batch_worker_count
+
+    def get_validation_mode(self) -> str:
+        return self.validation_mode
+
+    def get_cache_directory_path(self) -> Optional[str]:
+        return self.cache_directory
+
+    def get_fit_mode(self) -> str:
+        return self.fit_mode
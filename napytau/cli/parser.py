@@ -1,5 +1,10 @@
 import argparse
 from napytau.cli.cli_arguments import CLIArguments
+from napytau.core.polynomials import FIT_MODE_UNWEIGHTED, FIT_MODES
+from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+    VALIDATION_MODE_FULL,
+    VALIDATION_MODES,
+)
 from napytau.import_export.import_export import IMPORT_FORMATS, IMPORT_FORMAT_NAPYTAU
 
 
@@ -43,4 +48,51 @@ def parse_cli_arguments() -> CLIArguments:
         help="""Custom t_hyp estimate to use for the calculations""",
     )
 
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="""Path to a directory tree, NaPyTau format file or manifest file of
+        datasets to process in batch mode, only relevant for headless mode""",
+    )
+
+    parser.add_argument(
+        "--batch_output_file",
+        type=str,
+        help="""Path to the CSV file the batch results are written to, the results
+        are printed if omitted""",
+    )
+
+    parser.add_argument(
+        "--batch_worker_count",
+        type=int,
+        help="""Number of worker processes for batch mode, defaults to the number of
+        CPUs""",
+    )
+
+    parser.add_argument(
+        "--validation_mode",
+        type=str,
+        default=VALIDATION_MODE_FULL,
+        choices=VALIDATION_MODES,
+        help="""How thoroughly the datapoints of NaPyTau format files are validated:
+        all of them, only a sample, none for files with a matching .sha256 checksum
+        file (trusted), or none at all""",
+    )
+
+    parser.add_argument(
+        "--cache_directory",
+        type=str,
+        help="""Path to a directory in which calculation results are cached, so they
+        are not recalculated for unchanged datasets, only relevant for headless mode""",
+    )
+
+    parser.add_argument(
+        "--fit_mode",
+        type=str,
+        default=FIT_MODE_UNWEIGHTED,
+        choices=FIT_MODES,
+        help="""Whether the shifted intensities are fitted with equal weights or
+        weighted with their errors, only relevant for headless mode""",
+    )
+
     return CLIArguments(parser.parse_args())
@@ -0,0 +1,75 @@
+from typing import Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from napytau.core.time import select_flight_times
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import DatapointColumns
+from napytau.import_export.model.dataset import DataSet
+
+
+class _Selection:
+    """
+    The dataset of the active datapoints of a dataset together with the state of
+    the dataset and the mask it was selected for.
+    """
+
+    key: Tuple[bytes, bytes, int]
+    dataset: DataSet
+
+    def __init__(self, key: Tuple[bytes, bytes, int], dataset: DataSet):
+        self.key = key
+        self.dataset = dataset
+
+
+# Keyed by the column storage of the datapoints, so entries are dropped as soon as
+# the datapoints of a dataset are garbage collected. Only the latest selection is
+# kept, which is all that is needed while checkboxes are toggled one at a time.
+_selection_cache: WeakKeyDictionary[DatapointColumns, _Selection] = WeakKeyDictionary()
+
+
+def select_active_datapoints(dataset: DataSet, active_mask: np.ndarray) -> DataSet:
+    """
+    Returns a dataset holding only the datapoints of the dataset selected by the
+    active mask. The rows are selected from the columns of the datapoints, the
+    cached flight times are indexed with the mask instead of being recalculated,
+    and no datapoint objects are created. The selection is cached, so it is only
+    repeated once the mask or the datapoints change. If all datapoints are active,
+    the dataset itself is returned.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        active_mask (ndarray): Boolean mask with one entry for every datapoint
+
+    Returns:
+        DataSet: The dataset of the active datapoints, must not be modified.
+    """
+    columns = dataset.get_datapoints().columns
+    active_mask = np.asarray(active_mask, dtype=bool)
+    if active_mask.shape != (columns.size,):
+        raise ValueError(
+            f"The active mask of shape {active_mask.shape} does not match the "
+            f"{columns.size} datapoints of the dataset."
+        )
+
+    if active_mask.all():
+        return dataset
+
+    key = (active_mask.tobytes(), columns.revisions.tobytes(), columns.size)
+    selection = _selection_cache.get(columns)
+    if (
+        selection is None
+        or selection.key != key
+        or selection.dataset.get_relative_velocity()
+        is not dataset.get_relative_velocity()
+    ):
+        selected_dataset = DataSet(
+            dataset.get_relative_velocity(),
+            DatapointCollection.from_columns(columns.select_rows(active_mask)),
+        )
+        select_flight_times(dataset, selected_dataset, active_mask)
+        selection = _Selection(key, selected_dataset)
+        _selection_cache[columns] = selection
+
+    return selection.dataset
@@ -1,6 +1,9 @@
 from napytau.core.polynomials import (
+    calculate_polynomial_coefficients_for_chi_squared,
     evaluate_differentiated_polynomial_at_measuring_times,
+    evaluate_differentiated_polynomials_at_measuring_times,
     evaluate_polynomial_at_measuring_times,
+    evaluate_polynomials_at_measuring_times,
 )
 import numpy as np
 import scipy as sp
@@ -8,6 +11,14 @@ from typing import Tuple
 
 from napytau.import_export.model.dataset import DataSet
 
+TAU_FACTOR_OPTIMIZATION_ANALYTIC = "analytic"
+TAU_FACTOR_OPTIMIZATION_NUMERIC = "numeric"
+
+TAU_FACTOR_OPTIMIZATION_METHODS = [
+    TAU_FACTOR_OPTIMIZATION_ANALYTIC,
+    TAU_FACTOR_OPTIMIZATION_NUMERIC,
+]
+
 
 def calculate_chi_squared(
     dataset: DataSet,
@@ -59,24 +70,142 @@ def calculate_chi_squared(
     return result
 
 
+def calculate_chi_squared_for_tau_factors(
+    dataset: DataSet,
+    coefficients_matrix: np.ndarray,
+    tau_factors: np.ndarray,
+    weight_factor: float,
+) -> np.ndarray:
+    """
+    Computes the chi-squared values for several hypotheses t_hyp at once, see
+    calculate_chi_squared. All polynomials are evaluated in a single matrix product
+    and the differences are broadcast over the hypotheses.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients_matrix (ndarray):
+        Matrix with one row of polynomial coefficients for every hypothesis
+        tau_factors (ndarray):
+        Hypothesis values for the scaling factor
+        weight_factor (float):
+        Weighting factor for unshifted intensities
+
+    Returns:
+        ndarray: The chi-squared value for every hypothesis.
+    """
+
+    datapoints = dataset.get_datapoints()
+    shifted_intensities = datapoints.get_shifted_intensities()
+    unshifted_intensities = datapoints.get_unshifted_intensities()
+
+    # Every row of the differences belongs to one hypothesis
+    shifted_intensity_difference: np.ndarray = (
+        shifted_intensities.get_values()
+        - evaluate_polynomials_at_measuring_times(dataset, coefficients_matrix)
+    ) / shifted_intensities.get_errors()
+
+    unshifted_intensity_difference: np.ndarray = (
+        unshifted_intensities.get_values()
+        - (
+            np.asarray(tau_factors, dtype=float)[:, np.newaxis]
+            * evaluate_differentiated_polynomials_at_measuring_times(
+                dataset, coefficients_matrix
+            )
+        )
+    ) / unshifted_intensities.get_errors()
+
+    result: np.ndarray = np.sum(
+        np.power(shifted_intensity_difference, 2)
+        + weight_factor * np.power(unshifted_intensity_difference, 2),
+        axis=1,
+    )
+
+    return result
+
+
 def optimize_tau_factor(
     dataset: DataSet,
     weight_factor: float,
     coefficients: np.ndarray,
     tau_factor_range: Tuple[float, float],
+    method: str = TAU_FACTOR_OPTIMIZATION_ANALYTIC,
 ) -> float:
     """
     Optimizes the hypothesis value t_hyp to minimize the chi-squared function.
+    For fixed coefficients the chi-squared value is a quadratic function of t_hyp,
+    so by default its minimum is calculated in closed form. The numeric method
+    minimizes the chi-squared function with scipy instead.
 
     Parameters:
         dataset (DataSet): The dataset of the experiment
         weight_factor (float): Weighting factor for unshifted intensities
         coefficients (ndarray): Polynomial coefficients for fitting
         tau_factor_range (tuple): Range for hypothesis optimization (min, max)
+        method (str): One of TAU_FACTOR_OPTIMIZATION_METHODS
 
     Returns:
         float: Optimized t_hyp value.
     """
+    if method == TAU_FACTOR_OPTIMIZATION_ANALYTIC:
+        return _calculate_optimal_tau_factor_analytically(
+            dataset,
+            weight_factor,
+            coefficients,
+            tau_factor_range,
+        )
+
+    if method == TAU_FACTOR_OPTIMIZATION_NUMERIC:
+        return _optimize_tau_factor_numerically(
+            dataset,
+            weight_factor,
+            coefficients,
+            tau_factor_range,
+        )
+
+    raise ValueError(f"Unknown tau factor optimization method: {method}")
+
+
+def _calculate_optimal_tau_factor_analytically(
+    dataset: DataSet,
+    weight_factor: float,
+    coefficients: np.ndarray,
+    tau_factor_range: Tuple[float, float],
+) -> float:
+    datapoints = dataset.get_datapoints()
+    unshifted_intensities = datapoints.get_unshifted_intensities()
+    inverse_variances: np.ndarray = 1 / np.power(unshifted_intensities.get_errors(), 2)
+    differentiated_polynomial: np.ndarray = (
+        evaluate_differentiated_polynomial_at_measuring_times(dataset, coefficients)
+    )
+
+    # Setting the derivative of the chi-squared value with respect to t_hyp to zero
+    # gives t_hyp = sum(I_us * P' / s^2) / sum(P'^2 / s^2). The shifted intensities
+    # do not depend on t_hyp, so they do not contribute.
+    denominator: float = np.sum(
+        np.power(differentiated_polynomial, 2) * inverse_variances
+    )
+    if weight_factor == 0 or denominator == 0:
+        # The chi-squared value does not depend on t_hyp, every value is optimal.
+        # The mean avoids biasing the result toward one boundary.
+        return float(np.mean(tau_factor_range))
+
+    numerator: float = np.sum(
+        unshifted_intensities.get_values()
+        * differentiated_polynomial
+        * inverse_variances
+    )
+
+    # The chi-squared value is a parabola opening upwards, so the constrained
+    # minimum is the unconstrained one clipped to the range
+    return float(np.clip(numerator / denominator, *tau_factor_range))
+
+
+def _optimize_tau_factor_numerically(
+    dataset: DataSet,
+    weight_factor: float,
+    coefficients: np.ndarray,
+    tau_factor_range: Tuple[float, float],
+) -> float:
     result: sp.optimize.OptimizeResult = sp.optimize.minimize(
         lambda t_hyp: calculate_chi_squared(
             dataset,
@@ -92,3 +221,51 @@ def optimize_tau_factor(
 
     # Return optimized t_hyp value
     return float(result.x)
+
+
+def optimize_tau_factor_and_coefficients(
+    dataset: DataSet,
+    weight_factor: float,
+    polynomial_degree: int,
+    tau_factor_range: Tuple[float, float],
+) -> Tuple[float, np.ndarray]:
+    """
+    Minimizes the chi-squared function over the polynomial coefficients and the
+    hypothesis value t_hyp together.
+    The model of the unshifted intensities is the product of t_hyp and the
+    coefficients, so the joint problem is not linear. For every fixed t_hyp it is
+    however a single weighted linear least squares problem in the coefficients, see
+    polynomials.calculate_polynomial_coefficients_for_chi_squared. The chi-squared
+    value of these optimal coefficients is minimized over t_hyp with a bounded
+    scalar search.
+
+    Parameters:
+        dataset (DataSet): The dataset of the experiment
+        weight_factor (float): Weighting factor for unshifted intensities
+        polynomial_degree (int): The degree of the polynomial to be fitted
+        tau_factor_range (tuple): Range for hypothesis optimization (min, max)
+
+    Returns:
+        tuple: The optimized t_hyp value and the polynomial coefficients for it.
+    """
+
+    def calculate_minimal_chi_squared(t_hyp: float) -> float:
+        return calculate_chi_squared(
+            dataset,
+            calculate_polynomial_coefficients_for_chi_squared(
+                dataset, t_hyp, weight_factor, polynomial_degree
+            ),
+            t_hyp,
+            weight_factor,
+        )
+
+    result: sp.optimize.OptimizeResult = sp.optimize.minimize_scalar(
+        calculate_minimal_chi_squared,
+        bounds=(tau_factor_range[0], tau_factor_range[1]),
+        method="bounded",
+    )
+    optimal_t_hyp = float(result.x)
+
+    return optimal_t_hyp, calculate_polynomial_coefficients_for_chi_squared(
+        dataset, optimal_t_hyp, weight_factor, polynomial_degree
+    )
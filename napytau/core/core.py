@@ -1,26 +1,71 @@
-from napytau.core.chi import optimize_tau_factor
+from napytau.core.chi import (
+    calculate_chi_squared,
+    calculate_chi_squared_for_tau_factors,
+    optimize_tau_factor,
+)
 from napytau.core.polynomials import (
+    FIT_MODE_UNWEIGHTED,
+    FIT_MODE_WEIGHTED,
     calculate_polynomial_coefficients_for_fit,
     calculate_polynomial_coefficients_for_tau_factor,
+    calculate_polynomial_coefficients_for_tau_factors,
+    calculate_weighted_polynomial_fit,
+    scan_polynomial_coefficients_for_tau_factors,
+)
+from napytau.core.tau import (
+    calculate_tau_i_values,
+    calculate_tau_i_values_for_coefficients,
 )
-from napytau.core.tau import calculate_tau_i_values
-from napytau.core.delta_tau import calculate_error_propagation_terms
-from napytau.core.tau_final import calculate_tau_final
-from typing import Tuple
+from napytau.core.delta_tau import (
+    calculate_covariance_matrix,
+    calculate_error_propagation_terms,
+    calculate_error_propagation_terms_for_tau_factors,
+)
+from napytau.core.tau_final import calculate_tau_final, calculate_tau_finals
+from napytau.core.active_datapoints import select_active_datapoints
+from napytau.core.result_cache import ResultCache
+from typing import Iterator, Optional, Tuple
 import numpy as np
 from napytau.import_export.model.dataset import DataSet
 
 
 def calculate_lifetime_for_fit(
-    dataset: DataSet, polynomial_degree: int
+    dataset: DataSet,
+    polynomial_degree: int,
+    cache: Optional[ResultCache] = None,
+    active_mask: Optional[np.ndarray] = None,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
 ) -> Tuple[float, float]:
     """
     Docstring missing. To be implemented with issue #44.
+    If a cache is given, the result is looked up there first. If an active mask
+    is given, only the datapoints selected by it are used. The fit mode is one of
+    polynomials.FIT_MODES.
     """
-    # Now we find the optimal coefficients for the given taufactor
-    coefficients: np.ndarray = calculate_polynomial_coefficients_for_fit(
-        dataset, polynomial_degree
-    )
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    if cache is not None:
+        return cache.get_or_calculate(
+            f"lifetime_for_fit_{fit_mode}",
+            dataset,
+            (polynomial_degree,),
+            lambda: calculate_lifetime_for_fit(
+                dataset, polynomial_degree, fit_mode=fit_mode
+            ),
+        )
+
+    # Now we find the optimal coefficients for the given taufactor. The weighted
+    # fit also yields the covariance matrix needed for the errors.
+    covariance_matrix: Optional[np.ndarray] = None
+    if fit_mode == FIT_MODE_WEIGHTED:
+        (coefficients, covariance_matrix) = calculate_weighted_polynomial_fit(
+            dataset, polynomial_degree
+        )
+    else:
+        coefficients = calculate_polynomial_coefficients_for_fit(
+            dataset, polynomial_degree, fit_mode
+        )
 
     # We now calculate the lifetimes tau_i for all measured distances
     tau_i_values: np.ndarray = calculate_tau_i_values(
@@ -33,6 +78,7 @@ def calculate_lifetime_for_fit(
         dataset,
         coefficients,
         0,
+        covariance_matrix=covariance_matrix,
     )
 
     # From lifetimes and associated errors we can now calculate the weighted mean
@@ -49,12 +95,35 @@ def calculate_optimal_tau_factor(
     t_hyp_range: Tuple[float, float],
     weight_factor: float,
     polynomial_degree: int,
+    cache: Optional[ResultCache] = None,
+    active_mask: Optional[np.ndarray] = None,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
 ) -> float:
     """
     Docstring missing. To be implemented with issue #44.
+    If a cache is given, the result is looked up there first. If an active mask
+    is given, only the datapoints selected by it are used. The fit mode is one of
+    polynomials.FIT_MODES.
     """
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    if cache is not None:
+        return cache.get_or_calculate(
+            f"optimal_tau_factor_{fit_mode}",
+            dataset,
+            (*t_hyp_range, weight_factor, polynomial_degree),
+            lambda: calculate_optimal_tau_factor(
+                dataset,
+                t_hyp_range,
+                weight_factor,
+                polynomial_degree,
+                fit_mode=fit_mode,
+            ),
+        )
+
     coefficients: np.ndarray = calculate_polynomial_coefficients_for_fit(
-        dataset, polynomial_degree
+        dataset, polynomial_degree, fit_mode
     )
 
     optimal_t_hyp = optimize_tau_factor(
@@ -71,10 +140,27 @@ def calculate_lifetime_for_custom_tau_factor(
     dataset: DataSet,
     custom_tau_factor: float,
     polynomial_degree: int,
+    cache: Optional[ResultCache] = None,
+    active_mask: Optional[np.ndarray] = None,
 ) -> Tuple[float, float]:
     """
     Docstring missing. To be implemented with issue #44.
+    If a cache is given, the result is looked up there first. If an active mask
+    is given, only the datapoints selected by it are used.
     """
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    if cache is not None:
+        return cache.get_or_calculate(
+            "lifetime_for_custom_tau_factor",
+            dataset,
+            (custom_tau_factor, polynomial_degree),
+            lambda: calculate_lifetime_for_custom_tau_factor(
+                dataset, custom_tau_factor, polynomial_degree
+            ),
+        )
+
     # Now we find the optimal coefficients for the given taufactor
     coefficients: np.ndarray = calculate_polynomial_coefficients_for_tau_factor(
         dataset,
@@ -102,3 +188,128 @@ def calculate_lifetime_for_custom_tau_factor(
     )
 
     return tau_final
+
+
+def calculate_lifetimes_for_tau_factors(
+    dataset: DataSet,
+    tau_factors: np.ndarray,
+    polynomial_degree: int,
+    weight_factor: float = 1.0,
+    active_mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the lifetime, its uncertainty and the chi-squared value for every
+    tau factor of an array, e.g. a scan range or the positions of the GUI slider.
+    Apart from the polynomial fits, all steps are evaluated for all tau factors
+    at once.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factors (ndarray): The tau factors to calculate the lifetimes for
+        polynomial_degree (int): The degree of the fitted polynomials
+        weight_factor (float): Weighting factor for unshifted intensities
+        active_mask (ndarray): Optional boolean mask of the datapoints to use,
+        all datapoints are used if it is not given
+
+    Returns:
+        tuple:
+        Arrays of the lifetimes, their uncertainties and the chi-squared values,
+        one entry for every tau factor.
+    """
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    tau_factors = np.asarray(tau_factors, dtype=float)
+
+    # One row of coefficients for every tau factor
+    coefficients_matrix: np.ndarray = calculate_polynomial_coefficients_for_tau_factors(
+        dataset,
+        tau_factors,
+        polynomial_degree,
+    )
+
+    tau_i_values: np.ndarray = calculate_tau_i_values_for_coefficients(
+        dataset,
+        coefficients_matrix,
+    )
+
+    delta_tau_i_values: np.ndarray = calculate_error_propagation_terms_for_tau_factors(
+        dataset,
+        coefficients_matrix,
+        tau_factors,
+    )
+
+    taus, delta_taus = calculate_tau_finals(tau_i_values, delta_tau_i_values)
+
+    chi_squared_values: np.ndarray = calculate_chi_squared_for_tau_factors(
+        dataset,
+        coefficients_matrix,
+        tau_factors,
+        weight_factor,
+    )
+
+    return taus, delta_taus, chi_squared_values
+
+
+def scan_lifetimes_for_tau_factors(
+    dataset: DataSet,
+    tau_factors: np.ndarray,
+    polynomial_degree: int,
+    weight_factor: float = 1.0,
+    active_mask: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[float, float, float, float]]:
+    """
+    Walks the sorted tau factors and yields the lifetime, its uncertainty and the
+    chi-squared value for every tau factor as soon as they are calculated, e.g. to
+    show the results of a long scan while it is running. The polynomial of every
+    tau factor is fitted starting from the one of the previous tau factor, see
+    polynomials.scan_polynomial_coefficients_for_tau_factors, and the covariance
+    matrix of the coefficients, which only depends on the measuring times, is only
+    calculated once.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factors (ndarray): The tau factors to calculate the lifetimes for
+        polynomial_degree (int): The degree of the fitted polynomials
+        weight_factor (float): Weighting factor for unshifted intensities
+        active_mask (ndarray): Optional boolean mask of the datapoints to use,
+        all datapoints are used if it is not given
+
+    Returns:
+        Iterator of tuples of the tau factor, the lifetime, its uncertainty and the
+        chi-squared value, in increasing order of the tau factors.
+    """
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    tau_factors = np.sort(np.asarray(tau_factors, dtype=float))
+    if len(tau_factors) == 0:
+        return
+
+    covariance_matrix: np.ndarray = calculate_covariance_matrix(
+        dataset, np.zeros(polynomial_degree)
+    )
+
+    for tau_factor, coefficients in zip(
+        tau_factors,
+        scan_polynomial_coefficients_for_tau_factors(
+            dataset, tau_factors, polynomial_degree
+        ),
+    ):
+        tau_i_values: np.ndarray = calculate_tau_i_values(dataset, coefficients)
+        delta_tau_i_values: np.ndarray = calculate_error_propagation_terms(
+            dataset,
+            coefficients,
+            float(tau_factor),
+            covariance_matrix=covariance_matrix,
+        )
+        tau, delta_tau = calculate_tau_final(tau_i_values, delta_tau_i_values)
+
+        yield (
+            float(tau_factor),
+            tau,
+            delta_tau,
+            calculate_chi_squared(
+                dataset, coefficients, float(tau_factor), weight_factor
+            ),
+        )
@@ -1,25 +1,81 @@
 from napytau.core.polynomials import (
     evaluate_differentiated_polynomial_at_measuring_times,
+    evaluate_differentiated_polynomials_at_measuring_times,
     evaluate_polynomial_at_measuring_times,
 )
+from napytau.core.polynomial_evaluation import (
+    calculate_condition_number_for_decomposition,
+    calculate_covariance_matrix_for_decomposition,
+    decompose_weighted_basis,
+    evaluate_quadratic_form_for_basis,
+)
+from napytau.core.time import calculate_powers_of_times
+from dataclasses import dataclass
 import numpy as np
+from typing import Callable, Optional, Tuple
 
 from napytau.import_export.model.dataset import DataSet
 
 
+JACOBIAN_METHOD_ANALYTIC = "analytic"
+JACOBIAN_METHOD_FINITE_DIFFERENCES = "finite_differences"
+
+JACOBIAN_METHODS = [JACOBIAN_METHOD_ANALYTIC, JACOBIAN_METHOD_FINITE_DIFFERENCES]
+
+
 def calculate_jacobian_matrix(
     dataset: DataSet,
     coefficients: np.ndarray,
+    method: str = JACOBIAN_METHOD_ANALYTIC,
 ) -> np.ndarray:
     """
     calculated the jacobian matrix for a set of polynomial coefficients taking
     different distances into account.
-    Adds Disturbances to each coefficient to calculate partial derivatives,
-    safes them in jacobian matrix
+    As the polynomial is linear in its coefficients, the partial derivative with
+    respect to coefficient k is t^k, so the jacobian matrix is the Vandermonde
+    matrix of the measuring times. The finite differences method can be selected
+    as a fallback, see calculate_finite_differences_jacobian_matrix.
     Args:
         dataset (DataSet): The dataset of the experiment
         Datapoints for fitting, consisting of distances and intensities
         coefficients (ndarray): Array of polynomial coefficients.
+        method (str): One of JACOBIAN_METHODS
+
+    Returns:
+        ndarray:
+        The computed Jacobian matrix with shape (len(distances), len(coefficients)).
+    """
+    if method == JACOBIAN_METHOD_ANALYTIC:
+        # The powers of the times are cached, so the matrix is read-only
+        return calculate_powers_of_times(dataset, len(coefficients) - 1)
+
+    if method == JACOBIAN_METHOD_FINITE_DIFFERENCES:
+        return calculate_finite_differences_jacobian_matrix(dataset, coefficients)
+
+    raise ValueError(f"Unknown jacobian method: {method}")
+
+
+def calculate_finite_differences_jacobian_matrix(
+    dataset: DataSet,
+    coefficients: np.ndarray,
+    model: Callable[
+        [DataSet, np.ndarray], np.ndarray
+    ] = evaluate_polynomial_at_measuring_times,
+    epsilon: float = 1e-6,
+) -> np.ndarray:
+    """
+    calculated the jacobian matrix for a set of model coefficients taking
+    different distances into account.
+    Adds Disturbances to each coefficient to calculate partial derivatives,
+    safes them in jacobian matrix. Unlike calculate_jacobian_matrix, this works for
+    models which are not linear in their coefficients.
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        Datapoints for fitting, consisting of distances and intensities
+        coefficients (ndarray): Array of model coefficients.
+        model (Callable):
+        The model evaluated at the measuring times, defaults to the polynomial
+        epsilon (float): small disturbance value
 
     Returns:
         ndarray:
@@ -28,24 +84,18 @@ def calculate_jacobian_matrix(
 
     datapoints = dataset.get_datapoints()
     # initializes the jacobian matrix
-    jacobian_matrix: np.ndarray = np.zeros(
-        (len(datapoints.get_distances().get_values()), len(coefficients))
-    )
+    jacobian_matrix: np.ndarray = np.zeros((len(datapoints), len(coefficients)))
 
-    epsilon: float = 1e-6  # small disturbance value
+    # The unperturbed model only has to be evaluated once
+    original_function: np.ndarray = model(dataset, coefficients)
 
     # Loop over each coefficient and calculate the partial derivative
     for i in range(len(coefficients)):
         perturbed_coefficients: np.ndarray = np.array(coefficients, dtype=float)
         perturbed_coefficients[i] += epsilon  # slightly disturb the current coefficient
 
-        # Compute the disturbed and original polynomial values at the given distances
-        perturbed_function: np.ndarray = evaluate_polynomial_at_measuring_times(
-            dataset, perturbed_coefficients
-        )
-        original_function: np.ndarray = evaluate_polynomial_at_measuring_times(
-            dataset, coefficients
-        )
+        # Compute the disturbed model values at the given distances
+        perturbed_function: np.ndarray = model(dataset, perturbed_coefficients)
 
         # Calculate the partial derivative coefficients and store it in the
         # Jacobian matrix
@@ -62,7 +112,8 @@ def calculate_covariance_matrix(
 ) -> np.ndarray:
     """
     Computes the covariance matrix for the polynomial coefficients using the
-    jacobian matrix and a weight matrix derived from the shifted intensities' errors.
+    jacobian matrix weighted with the shifted intensities' errors, see
+    calculate_covariance_matrix_and_condition_number.
     Args:
         dataset (Dataset): The dataset of the experiment
         Datapoints for fitting, consisting of distances and intensities
@@ -71,26 +122,80 @@ def calculate_covariance_matrix(
     Returns:
         ndarray: The computed covariance matrix for the polynomial coefficients.
     """
+    (covariance_matrix, _) = calculate_covariance_matrix_and_condition_number(
+        dataset, coefficients
+    )
+
+    return covariance_matrix
+
+
+def calculate_covariance_matrix_and_condition_number(
+    dataset: DataSet,
+    coefficients: np.ndarray,
+) -> Tuple[np.ndarray, float]:
+    """
+    Computes the covariance matrix (J^T W J)^-1 for the polynomial coefficients,
+    with W the diagonal matrix of the inverse squared errors of the shifted
+    intensities, together with the condition number of the weighted jacobian
+    matrix. Instead of forming W, the rows of the jacobian matrix are scaled by the
+    inverse errors and decomposed with a QR decomposition, so time and memory are
+    linear in the number of datapoints.
+    Args:
+        dataset (Dataset): The dataset of the experiment
+        Datapoints for fitting, consisting of distances and intensities
+        coefficients (ndarray): Array of polynomial coefficients.
+
+    Returns:
+        tuple:
+        The covariance matrix for the polynomial coefficients and the condition
+        number of the column scaled, weighted jacobian matrix, which tells how
+        many digits of the covariance matrix can be trusted.
+    """
 
     datapoints = dataset.get_datapoints()
     jacobian_matrix: np.ndarray = calculate_jacobian_matrix(dataset, coefficients)
 
-    # Construct the weight matrix from the inverse squared errors
-    weight_matrix: np.ndarray = np.diag(
-        1 / np.power(datapoints.get_shifted_intensities().get_errors(), 2)
+    (_, r, column_scales) = decompose_weighted_basis(
+        jacobian_matrix, 1 / datapoints.get_shifted_intensities().get_errors()
+    )
+
+    covariance_matrix: np.ndarray = calculate_covariance_matrix_for_decomposition(
+        r, column_scales
     )
 
-    fit_matrix: np.ndarray = jacobian_matrix.T @ weight_matrix @ jacobian_matrix
+    return covariance_matrix, calculate_condition_number_for_decomposition(r)
 
-    covariance_matrix: np.ndarray = np.linalg.inv(fit_matrix)
 
-    return covariance_matrix
+@dataclass
+class ErrorPropagationTerms:
+    """
+    The contributions to the error propagation terms of a polynomial, each with one
+    entry for every distance point. They allow to see which contribution dominates
+    the error of the lifetimes, calculate_error_propagation_terms only returns
+    their sum.
+    """
+
+    polynomial_variances: np.ndarray
+    unshifted_intensity_terms: np.ndarray
+    polynomial_uncertainty_terms: np.ndarray
+    covariance_terms: np.ndarray
+
+    def get_total(self) -> np.ndarray:
+        """Returns the sum of all three contributions."""
+        total: np.ndarray = (
+            self.unshifted_intensity_terms
+            + self.polynomial_uncertainty_terms
+            + self.covariance_terms
+        )
+
+        return total
 
 
 def calculate_error_propagation_terms(
     dataset: DataSet,
     coefficients: np.ndarray,
     taufactor: float,
+    covariance_matrix: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     creates the error propagation term for the polynomial coefficients.
@@ -99,12 +204,43 @@ def calculate_error_propagation_terms(
         dataset (DataSet): The dataset of the experiment
         coefficients (ndarray): Array of polynomial coefficients.
         taufactor (float): Scaling factor related to the Doppler-shift model.
+        covariance_matrix (ndarray): The covariance matrix of the coefficients, e.g.
+        from polynomials.calculate_weighted_polynomial_fit, it is calculated with
+        calculate_covariance_matrix if not given.
 
     Returns:
         ndarray: The combined error propagation terms for each distance point.
     """
+    return calculate_error_propagation_term_breakdown(
+        dataset, coefficients, taufactor, covariance_matrix
+    ).get_total()
+
+
+def calculate_error_propagation_term_breakdown(
+    dataset: DataSet,
+    coefficients: np.ndarray,
+    taufactor: float,
+    covariance_matrix: Optional[np.ndarray] = None,
+) -> ErrorPropagationTerms:
+    """
+    creates the contributions to the error propagation term for the polynomial
+    coefficients, see calculate_error_propagation_terms.
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients (ndarray): Array of polynomial coefficients.
+        taufactor (float): Scaling factor related to the Doppler-shift model.
+        covariance_matrix (ndarray): The covariance matrix of the coefficients, it
+        is calculated with calculate_covariance_matrix if not given.
+
+    Returns:
+        ErrorPropagationTerms:
+        The direct errors, polynomial uncertainties and mixed covariance terms for
+        each distance point, together with the polynomial variances they are
+        calculated from.
+    """
 
     datapoints = dataset.get_datapoints()
+    unshifted_intensities = datapoints.get_unshifted_intensities()
     calculated_differentiated_polynomial_sum_at_measuring_distances = (
         evaluate_differentiated_polynomial_at_measuring_times(
             dataset,
@@ -113,30 +249,29 @@ def calculate_error_propagation_terms(
     )
 
     gaussian_error_from_unshifted_intensity: np.ndarray = np.power(
-        datapoints.get_unshifted_intensities().get_errors(), 2
+        unshifted_intensities.get_errors(), 2
     ) / np.power(
         calculated_differentiated_polynomial_sum_at_measuring_distances,
         2,
     )
 
-    # Initialize the polynomial uncertainty term for second term
-    delta_p_j_i_squared: np.ndarray = np.zeros(
-        len(datapoints.get_distances().get_values())
-    )
-    covariance_matrix: np.ndarray = calculate_covariance_matrix(dataset, coefficients)
+    if covariance_matrix is None:
+        covariance_matrix = calculate_covariance_matrix(dataset, coefficients)
 
     # Calculate the polynomial uncertainty contributions
-    for k in range(len(coefficients)):
-        for l in range(len(coefficients)):  # noqa E741
-            delta_p_j_i_squared = (
-                delta_p_j_i_squared
-                + np.power(datapoints.get_distances().get_values(), k)
-                * np.power(datapoints.get_distances().get_values(), l)
-                * covariance_matrix[k, l]
-            )
+    # sum_k sum_l d^k * d^l * cov[k, l] as a quadratic form over the powers of the
+    # distances
+    delta_p_j_i_squared: np.ndarray = evaluate_quadratic_form_for_basis(
+        np.vander(
+            datapoints.get_distances().get_values(),
+            len(coefficients),
+            increasing=True,
+        ),
+        covariance_matrix,
+    )
 
     gaussian_error_from_polynomial_uncertainties: np.ndarray = (
-        np.power(datapoints.get_unshifted_intensities().get_values(), 2)
+        np.power(unshifted_intensities.get_values(), 2)
         / np.power(
             calculated_differentiated_polynomial_sum_at_measuring_distances,
             4,
@@ -144,15 +279,82 @@ def calculate_error_propagation_terms(
     ) * np.power(delta_p_j_i_squared, 2)
 
     error_from_covariance: np.ndarray = (
-        datapoints.get_unshifted_intensities().get_values()
-        * taufactor
-        * delta_p_j_i_squared
+        unshifted_intensities.get_values() * taufactor * delta_p_j_i_squared
     ) / np.power(calculated_differentiated_polynomial_sum_at_measuring_distances, 3)
 
-    interim_result: np.ndarray = (
+    return ErrorPropagationTerms(
+        delta_p_j_i_squared,
+        gaussian_error_from_unshifted_intensity,
+        gaussian_error_from_polynomial_uncertainties,
+        error_from_covariance,
+    )
+
+
+def calculate_error_propagation_terms_for_tau_factors(
+    dataset: DataSet,
+    coefficients_matrix: np.ndarray,
+    tau_factors: np.ndarray,
+) -> np.ndarray:
+    """
+    creates the error propagation terms for several tau factors and their
+    polynomial coefficients at once, see calculate_error_propagation_terms.
+    The jacobian matrix only depends on the measuring times, so the covariance
+    matrix and the polynomial uncertainty contributions are shared by all
+    polynomials of the same degree and only calculated once. The remaining terms
+    are broadcast over the tau factors.
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients_matrix (ndarray):
+        Matrix with one row of polynomial coefficients for every tau factor
+        tau_factors (ndarray): Scaling factors related to the Doppler-shift model.
+
+    Returns:
+        ndarray:
+        Matrix of the combined error propagation terms with one row for every tau
+        factor and one column for every distance point.
+    """
+
+    datapoints = dataset.get_datapoints()
+    unshifted_intensities = datapoints.get_unshifted_intensities()
+    number_of_coefficients = np.shape(coefficients_matrix)[1]
+
+    differentiated_polynomials: np.ndarray = (
+        evaluate_differentiated_polynomials_at_measuring_times(
+            dataset, coefficients_matrix
+        )
+    )
+
+    covariance_matrix: np.ndarray = calculate_covariance_matrix(
+        dataset, np.zeros(number_of_coefficients)
+    )
+    delta_p_j_i_squared: np.ndarray = evaluate_quadratic_form_for_basis(
+        np.vander(
+            datapoints.get_distances().get_values(),
+            number_of_coefficients,
+            increasing=True,
+        ),
+        covariance_matrix,
+    )
+
+    gaussian_error_from_unshifted_intensity: np.ndarray = np.power(
+        unshifted_intensities.get_errors(), 2
+    ) / np.power(differentiated_polynomials, 2)
+
+    gaussian_error_from_polynomial_uncertainties: np.ndarray = (
+        np.power(unshifted_intensities.get_values(), 2)
+        / np.power(differentiated_polynomials, 4)
+    ) * np.power(delta_p_j_i_squared, 2)
+
+    error_from_covariance: np.ndarray = (
+        unshifted_intensities.get_values()
+        * np.asarray(tau_factors, dtype=float)[:, np.newaxis]
+        * delta_p_j_i_squared
+    ) / np.power(differentiated_polynomials, 3)
+
+    errors: np.ndarray = (
         gaussian_error_from_unshifted_intensity
         + gaussian_error_from_polynomial_uncertainties
+        + error_from_covariance
     )
-    errors: np.ndarray = interim_result + error_from_covariance
-    # Return the sum of all three contributions
+
     return errors
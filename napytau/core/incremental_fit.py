@@ -0,0 +1,250 @@
+from typing import Optional
+
+import numpy as np
+import scipy as sp
+
+from napytau.core.errors.polynomial_coefficient_error import (
+    PolynomialCoefficientError,
+)
+
+INCREMENTAL_FIT_REFACTORIZATION_INTERVAL = 256
+"""
+The number of updates after which the factorisation is recalculated from the
+active points, so rounding errors of the updates do not accumulate.
+"""
+
+
+class IncrementalPolynomialFit:
+    """
+    A weighted least squares fit of a polynomial to those of a fixed set of points
+    which are active, e.g. the datapoints checked in the GUI. The upper triangular
+    Cholesky factor R of the normal equations, R^T R = A^T W A, is kept and updated
+    with a rank-one update or downdate when a single point is activated or
+    deactivated. Toggling a point therefore costs O(degree^2) instead of the
+    O(n * degree^2) of a new fit.
+
+    To keep the normal equations well conditioned, the x values are mapped onto
+    [-1, 1] using the range of all points, like numpy.polynomial.Polynomial.fit.
+    If the active points do not determine the polynomial, e.g. because there are
+    fewer of them than coefficients, the minimum norm solution is calculated from
+    the active points instead.
+    """
+
+    degree: int
+    _domain: np.ndarray
+    _basis: np.ndarray
+    _observations: np.ndarray
+    _active: np.ndarray
+    _right_hand_side: np.ndarray
+    _factor: Optional[np.ndarray]
+    _update_count: int
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        degree: int,
+        weights: Optional[np.ndarray] = None,
+        active_mask: Optional[np.ndarray] = None,
+    ):
+        """
+        Args:
+            x (ndarray): The x values of all points
+            y (ndarray): The y values of all points
+            degree (int): The degree of the fitted polynomial
+            weights (ndarray): Optional weights of the unsquared residuals, e.g. the
+            inverse errors of the y values, all points are weighted equally if not
+            given
+            active_mask (ndarray): Optional mask of the active points, all points
+            are active if not given
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        weights = (
+            np.ones_like(x) if weights is None else np.asarray(weights, dtype=float)
+        )
+        if (
+            degree < 0
+            or np.ndim(x) != 1
+            or y.shape != x.shape
+            or weights.shape != x.shape
+        ):
+            raise ValueError(
+                "The x values, y values and weights must be arrays of the same "
+                "length and the degree must not be negative."
+            )
+
+        self.degree = degree
+        self._domain = (
+            np.array([x.min(), x.max()]) if len(x) > 0 else np.array([-1.0, 1.0])
+        )
+        if self._domain[0] == self._domain[1]:
+            self._domain = self._domain + np.array([-1.0, 1.0])
+        self._basis = (
+            np.vander(self._map_to_window(x), degree + 1, increasing=True)
+            * weights[:, np.newaxis]
+        )
+        self._observations = y * weights
+        self._active = (
+            np.ones(len(x), dtype=bool)
+            if active_mask is None
+            else self._validate_mask(active_mask).copy()
+        )
+        self._refactorize()
+
+    def set_active(self, row: int, active: bool) -> None:
+        """
+        Activates or deactivates a single point and updates the fit accordingly.
+        """
+        if bool(self._active[row]) == active:
+            return
+
+        self._active[row] = active
+        self._right_hand_side += (
+            (1 if active else -1) * self._observations[row] * self._basis[row]
+        )
+
+        self._update_count += 1
+        if (
+            self._factor is None
+            or self._update_count >= INCREMENTAL_FIT_REFACTORIZATION_INTERVAL
+            or not _update_cholesky_factor(self._factor, self._basis[row], active)
+        ):
+            # The factor is recalculated once it is needed
+            self._factor = None
+
+    def set_active_mask(self, active_mask: np.ndarray) -> None:
+        """
+        Activates the points selected by the mask and deactivates all others. Only
+        the points whose state changed are updated, if more than half of the
+        points changed, the fit is recalculated instead.
+        """
+        active_mask = self._validate_mask(active_mask)
+        changed_rows = np.flatnonzero(active_mask != self._active)
+
+        if 2 * len(changed_rows) > len(self._active):
+            self._active = active_mask.copy()
+            self._refactorize()
+            return
+
+        for row in changed_rows:
+            self.set_active(int(row), bool(active_mask[row]))
+
+    def get_active_mask(self) -> np.ndarray:
+        """Returns a read-only view on the mask of the active points."""
+        view = self._active.view()
+        view.flags.writeable = False
+
+        return view
+
+    def get_coefficients(self) -> np.ndarray:
+        """
+        Returns the coefficients of the fitted polynomial in increasing order of
+        degree, e.g. [3, 4, 2] for 2x^2 + 4x + 3.
+        """
+        return np.array(
+            np.polynomial.Polynomial(
+                self._get_window_coefficients(),
+                domain=self._domain,
+                window=[-1.0, 1.0],
+            )
+            .convert()
+            .coef
+        )
+
+    def evaluate(self, x: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the fitted polynomial at the x values. This avoids the
+        conversion of the coefficients and is more accurate than evaluating the
+        coefficients of get_coefficients for polynomials of high degree.
+        """
+        return np.asarray(
+            np.polynomial.polynomial.polyval(
+                self._map_to_window(np.asarray(x, dtype=float)),
+                self._get_window_coefficients(),
+            )
+        )
+
+    def _get_window_coefficients(self) -> np.ndarray:
+        if not self._active.any():
+            raise PolynomialCoefficientError(
+                "At least one point must be active to fit a polynomial."
+            )
+
+        if self._factor is None:
+            self._refactorize()
+
+        if self._factor is None:
+            coefficients: np.ndarray = np.linalg.lstsq(
+                self._basis[self._active], self._observations[self._active]
+            )[0]
+
+            return coefficients
+
+        return np.array(
+            sp.linalg.solve_triangular(
+                self._factor,
+                sp.linalg.solve_triangular(
+                    self._factor, self._right_hand_side, trans="T"
+                ),
+            )
+        )
+
+    def _refactorize(self) -> None:
+        basis = self._basis[self._active]
+
+        self._right_hand_side = basis.T @ self._observations[self._active]
+        self._update_count = 0
+        self._factor = None
+        if len(basis) < self.degree + 1:
+            return
+
+        factor = np.linalg.qr(basis, mode="r")
+        # The rank-one updates assume a positive diagonal
+        factor *= np.where(np.diag(factor) < 0, -1.0, 1.0)[:, np.newaxis]
+        diagonal = np.diag(factor)
+        if diagonal.min() > np.finfo(float).eps * len(basis) * diagonal.max():
+            self._factor = factor
+
+    def _map_to_window(self, x: np.ndarray) -> np.ndarray:
+        (lower, upper) = self._domain
+        window_x: np.ndarray = (2 * x - (lower + upper)) / (upper - lower)
+
+        return window_x
+
+    def _validate_mask(self, active_mask: np.ndarray) -> np.ndarray:
+        active_mask = np.asarray(active_mask, dtype=bool)
+        if active_mask.shape != self._observations.shape:
+            raise ValueError(
+                f"The active mask of shape {active_mask.shape} does not match the "
+                f"{len(self._observations)} points of the fit."
+            )
+
+        return active_mask
+
+
+def _update_cholesky_factor(
+    factor: np.ndarray, row: np.ndarray, is_added: bool
+) -> bool:
+    """
+    Updates the upper triangular factor R in place to the factor of
+    R^T R + row row^T if the row is added, or R^T R - row row^T otherwise.
+    Returns False if a downdate would make the factor singular, the factor has to
+    be recalculated then.
+    """
+    row = row.copy()
+    sign = 1.0 if is_added else -1.0
+
+    for k in range(len(row)):
+        squared_diagonal = factor[k, k] ** 2 + sign * row[k] ** 2
+        if squared_diagonal <= np.finfo(float).eps * factor[k, k] ** 2:
+            return False
+
+        diagonal = np.sqrt(squared_diagonal)
+        cosine = diagonal / factor[k, k]
+        sine = row[k] / factor[k, k]
+        factor[k, k] = diagonal
+        factor[k, k + 1 :] = (factor[k, k + 1 :] + sign * sine * row[k + 1 :]) / cosine
+        row[k + 1 :] = cosine * row[k + 1 :] - sine * factor[k, k + 1 :]
+
+    return True
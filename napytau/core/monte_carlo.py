@@ -0,0 +1,309 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Optional, Sequence
+
+import numpy as np
+import scipy as sp
+
+from napytau.core.active_datapoints import select_active_datapoints
+from napytau.core.delta_tau import calculate_error_propagation_terms
+from napytau.core.errors.polynomial_coefficient_error import (
+    PolynomialCoefficientError,
+)
+from napytau.core.polynomials import (
+    FIT_MODE_UNWEIGHTED,
+    FIT_MODE_WEIGHTED,
+    FIT_MODES,
+    calculate_polynomial_coefficients_for_fit,
+    calculate_weighted_polynomial_fit,
+)
+from napytau.core.tau import calculate_tau_i_values
+from napytau.core.tau_final import calculate_tau_final
+from napytau.import_export.model.dataset import DataSet
+
+MONTE_CARLO_DEFAULT_REPLICA_COUNT = 4096
+"""The number of replicas of the dataset drawn by default."""
+
+MONTE_CARLO_CHUNK_SIZE = 1024
+"""
+The number of replicas evaluated at once by default. It bounds the memory of the
+batched arrays, which hold one row of every datapoint for every replica.
+"""
+
+MONTE_CARLO_DEFAULT_PERCENTILES = (15.865, 50.0, 84.135)
+"""The median and the bounds of the central 68.27 % of a lifetime distribution."""
+
+
+@dataclass
+class LifetimeDistribution:
+    """
+    The lifetimes calculated for replicas of a dataset, whose values were drawn
+    from the errors of the datapoints and of the relative velocity, together with
+    the lifetime and the uncertainty propagated analytically from the dataset
+    itself. Replicas for which no lifetime could be calculated, e.g. because the
+    derivative of their polynomial vanishes at a distance point, are NaN.
+    """
+
+    lifetimes: np.ndarray
+    nominal_lifetime: float
+    propagated_uncertainty: float
+
+    def get_valid_lifetimes(self) -> np.ndarray:
+        """Returns the lifetimes of the replicas which could be calculated."""
+        valid_lifetimes: np.ndarray = self.lifetimes[np.isfinite(self.lifetimes)]
+
+        return valid_lifetimes
+
+    def get_mean(self) -> float:
+        return float(np.mean(self.get_valid_lifetimes()))
+
+    def get_standard_deviation(self) -> float:
+        return float(np.std(self.get_valid_lifetimes(), ddof=1))
+
+    def get_percentiles(
+        self, percentiles: Sequence[float] = MONTE_CARLO_DEFAULT_PERCENTILES
+    ) -> np.ndarray:
+        """
+        Returns the given percentiles of the lifetimes, by default the median and
+        the bounds of the central 68.27 %, which correspond to one standard
+        deviation for a normal distribution.
+        """
+        lifetime_percentiles: np.ndarray = np.percentile(
+            self.get_valid_lifetimes(), percentiles
+        )
+
+        return lifetime_percentiles
+
+
+class _ReplicaInputs:
+    """
+    The values and errors of a dataset which are resampled for every replica, and
+    the quantities of the nominal fit which are kept fixed.
+    """
+
+    distances: np.ndarray
+    distance_errors: np.ndarray
+    shifted_intensities: np.ndarray
+    shifted_intensity_errors: np.ndarray
+    unshifted_intensities: np.ndarray
+    unshifted_intensity_errors: np.ndarray
+    velocity: float
+    velocity_error: float
+    polynomial_degree: int
+    fit_weights: np.ndarray
+    tau_i_weights: np.ndarray
+
+    def __init__(
+        self,
+        dataset: DataSet,
+        polynomial_degree: int,
+        fit_weights: np.ndarray,
+        tau_i_weights: np.ndarray,
+    ):
+        datapoints = dataset.get_datapoints()
+        relative_velocity = dataset.get_relative_velocity()
+
+        self.distances = np.array(datapoints.get_distances().get_values())
+        self.distance_errors = np.array(datapoints.get_distances().get_errors())
+        self.shifted_intensities = np.array(
+            datapoints.get_shifted_intensities().get_values()
+        )
+        self.shifted_intensity_errors = np.array(
+            datapoints.get_shifted_intensities().get_errors()
+        )
+        self.unshifted_intensities = np.array(
+            datapoints.get_unshifted_intensities().get_values()
+        )
+        self.unshifted_intensity_errors = np.array(
+            datapoints.get_unshifted_intensities().get_errors()
+        )
+        self.velocity = relative_velocity.value.get_velocity()
+        self.velocity_error = relative_velocity.error.get_velocity()
+        self.polynomial_degree = polynomial_degree
+        self.fit_weights = fit_weights
+        self.tau_i_weights = tau_i_weights
+
+
+def calculate_lifetime_distribution(
+    dataset: DataSet,
+    polynomial_degree: int,
+    replica_count: int = MONTE_CARLO_DEFAULT_REPLICA_COUNT,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
+    active_mask: Optional[np.ndarray] = None,
+    seed: Optional[int] = None,
+    worker_count: int = 1,
+    chunk_size: int = MONTE_CARLO_CHUNK_SIZE,
+) -> LifetimeDistribution:
+    """
+    Calculates the distribution of the lifetime of core.calculate_lifetime_for_fit
+    by Monte-Carlo resampling. For every replica, the distances, the shifted and
+    unshifted intensities and the relative velocity are drawn from normal
+    distributions around their values, with their errors as standard deviations.
+    The replicas are evaluated in chunks, with one axis of the arrays for the
+    replicas: the polynomials of all replicas of a chunk are fitted by solving a
+    stack of normal equations, and the lifetimes of the distance points and their
+    weighted means are calculated for all replicas at once. The weights of the
+    means are the inverse squared errors propagated for the dataset itself, so
+    every replica is averaged the same way.
+
+    The chunks draw their replicas from independent streams spawned from the seed,
+    so the lifetimes only depend on the seed and the chunk size, not on the number
+    of workers.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        polynomial_degree (int): The degree of the fitted polynomials
+        replica_count (int): The number of replicas to draw
+        fit_mode (str): One of polynomials.FIT_MODES
+        active_mask (ndarray): Optional boolean mask of the datapoints to use,
+        all datapoints are used if it is not given
+        seed (int): Optional seed of the random numbers, for reproducible results
+        worker_count (int): The number of worker processes the chunks are
+        distributed across, the chunks are evaluated in the current process if it
+        is 1
+        chunk_size (int): The number of replicas evaluated at once
+
+    Returns:
+        LifetimeDistribution:
+        The lifetimes of the replicas together with the lifetime and its
+        uncertainty propagated analytically from the dataset.
+    """
+    if fit_mode not in FIT_MODES:
+        raise ValueError(f"Unknown fit mode: {fit_mode}")
+
+    if replica_count < 1 or worker_count < 1 or chunk_size < 1:
+        raise ValueError(
+            "The number of replicas, the number of workers and the chunk size must "
+            "be positive."
+        )
+
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    if len(dataset.get_datapoints()) < polynomial_degree + 1:
+        raise PolynomialCoefficientError(
+            f"At least {polynomial_degree + 1} datapoints are needed for a fit of "
+            f"degree {polynomial_degree}."
+        )
+
+    # The nominal lifetime and the errors of its distance points, as calculated by
+    # core.calculate_lifetime_for_fit
+    covariance_matrix: Optional[np.ndarray] = None
+    if fit_mode == FIT_MODE_WEIGHTED:
+        (coefficients, covariance_matrix) = calculate_weighted_polynomial_fit(
+            dataset, polynomial_degree
+        )
+        fit_weights = 1 / np.array(
+            dataset.get_datapoints().get_shifted_intensities().get_errors()
+        )
+    else:
+        coefficients = calculate_polynomial_coefficients_for_fit(
+            dataset, polynomial_degree, fit_mode
+        )
+        fit_weights = np.ones(len(dataset.get_datapoints()))
+
+    delta_tau_i_values: np.ndarray = calculate_error_propagation_terms(
+        dataset, coefficients, 0, covariance_matrix=covariance_matrix
+    )
+    (nominal_lifetime, propagated_uncertainty) = calculate_tau_final(
+        calculate_tau_i_values(dataset, coefficients), delta_tau_i_values
+    )
+
+    inputs = _ReplicaInputs(
+        dataset,
+        polynomial_degree,
+        fit_weights,
+        1 / np.power(delta_tau_i_values, 2),
+    )
+
+    chunk_sizes = [
+        min(chunk_size, replica_count - start)
+        for start in range(0, replica_count, chunk_size)
+    ]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    calculate_chunk = partial(_calculate_replica_lifetimes, inputs)
+
+    chunk_lifetimes: List[np.ndarray]
+    if worker_count == 1 or len(chunk_sizes) == 1:
+        chunk_lifetimes = list(map(calculate_chunk, seed_sequences, chunk_sizes))
+    else:
+        # The inputs only hold one value per datapoint, so they are cheap to send
+        # along with every chunk
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            chunk_lifetimes = list(
+                executor.map(calculate_chunk, seed_sequences, chunk_sizes)
+            )
+
+    return LifetimeDistribution(
+        np.concatenate(chunk_lifetimes),
+        float(nominal_lifetime),
+        float(propagated_uncertainty),
+    )
+
+
+def _calculate_replica_lifetimes(
+    inputs: _ReplicaInputs,
+    seed_sequence: np.random.SeedSequence,
+    replica_count: int,
+) -> np.ndarray:
+    """
+    Draws replicas of the dataset and calculates their lifetimes. All arrays have
+    the replicas along the first axis and the distance points along the second.
+    """
+    generator = np.random.default_rng(seed_sequence)
+    shape = (replica_count, len(inputs.distances))
+
+    distances = inputs.distances + inputs.distance_errors * generator.standard_normal(
+        shape
+    )
+    shifted_intensities = (
+        inputs.shifted_intensities
+        + inputs.shifted_intensity_errors * generator.standard_normal(shape)
+    )
+    unshifted_intensities = (
+        inputs.unshifted_intensities
+        + inputs.unshifted_intensity_errors * generator.standard_normal(shape)
+    )
+    velocities = inputs.velocity + inputs.velocity_error * generator.standard_normal(
+        (replica_count, 1)
+    )
+
+    times = distances / (velocities * sp.constants.speed_of_light)
+    # The times of every replica are mapped onto [-1, 1], like in
+    # incremental_fit.IncrementalPolynomialFit, which keeps the normal equations
+    # well conditioned. The derivatives are scaled back with the inner derivative.
+    lower_times = times.min(axis=1, keepdims=True)
+    time_ranges = times.max(axis=1, keepdims=True) - lower_times
+    time_ranges[time_ranges == 0] = 1.0
+    window_times = 2 * (times - lower_times) / time_ranges - 1
+
+    # Basis of shape (replicas, distance points, coefficients)
+    basis = np.empty(shape + (inputs.polynomial_degree + 1,))
+    basis[:, :, 0] = 1.0
+    for exponent in range(1, inputs.polynomial_degree + 1):
+        basis[:, :, exponent] = basis[:, :, exponent - 1] * window_times
+
+    weighted_basis = basis * inputs.fit_weights[:, np.newaxis]
+    transposed_basis = weighted_basis.transpose(0, 2, 1)
+    coefficients = np.linalg.solve(
+        transposed_basis @ weighted_basis,
+        transposed_basis @ (shifted_intensities * inputs.fit_weights)[:, :, np.newaxis],
+    )[:, :, 0]
+
+    derivative_coefficients = coefficients[:, 1:] * np.arange(
+        1, inputs.polynomial_degree + 1
+    )
+    derivatives = (
+        basis[:, :, : inputs.polynomial_degree]
+        @ derivative_coefficients[:, :, np.newaxis]
+    )[:, :, 0] * (2 / time_ranges)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau_i_values = unshifted_intensities / derivatives
+
+    lifetimes: np.ndarray = (tau_i_values @ inputs.tau_i_weights) / np.sum(
+        inputs.tau_i_weights
+    )
+    lifetimes[~np.isfinite(lifetimes)] = np.nan
+
+    return lifetimes
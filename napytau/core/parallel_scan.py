@@ -0,0 +1,271 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from napytau.core.active_datapoints import select_active_datapoints
+from napytau.core.core import calculate_lifetimes_for_tau_factors
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+PARALLEL_SCAN_CHUNKS_PER_WORKER = 4
+"""
+The number of chunks the tau factors are split into per worker by default, so
+workers which finish early can take over chunks of slower ones.
+"""
+
+PARALLEL_SCAN_RESULT_ROWS = 3
+"""The rows of the result array: lifetimes, their uncertainties and chi-squared."""
+
+
+class _SharedScanLayout:
+    """
+    The layout of the shared memory block of a parallel scan. The block holds the
+    values, errors and presence mask of the datapoint columns, the tau factors and
+    the result array, one after the other.
+    """
+
+    name: str
+    datapoint_count: int
+    tau_factor_count: int
+
+    def __init__(self, name: str, datapoint_count: int, tau_factor_count: int):
+        self.name = name
+        self.datapoint_count = datapoint_count
+        self.tau_factor_count = tau_factor_count
+
+    @staticmethod
+    def get_size(datapoint_count: int, tau_factor_count: int) -> int:
+        field_count = len(DatapointField)
+
+        return max(
+            1,
+            2 * field_count * datapoint_count * 8
+            + field_count * datapoint_count
+            + tau_factor_count * 8
+            + PARALLEL_SCAN_RESULT_ROWS * tau_factor_count * 8,
+        )
+
+    def get_arrays(
+        self, shared_memory: SharedMemory
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns views on the values, errors, presence mask, tau factors and results
+        in the shared memory block.
+        """
+        field_count = len(DatapointField)
+        # The presence mask comes last, so the float arrays stay aligned
+        shapes_and_types: List[Tuple[Tuple[int, ...], type]] = [
+            ((field_count, self.datapoint_count), np.float64),
+            ((field_count, self.datapoint_count), np.float64),
+            ((self.tau_factor_count,), np.float64),
+            ((PARALLEL_SCAN_RESULT_ROWS, self.tau_factor_count), np.float64),
+            ((field_count, self.datapoint_count), np.bool_),
+        ]
+
+        arrays = []
+        offset = 0
+        for shape, dtype in shapes_and_types:
+            array: np.ndarray = np.ndarray(
+                shape, dtype=dtype, buffer=shared_memory.buf, offset=offset
+            )
+            arrays.append(array)
+            offset += array.nbytes
+        (values, errors, tau_factors, results, present) = arrays
+
+        return values, errors, present, tau_factors, results
+
+
+class _WorkerState:
+    """The dataset and arrays a worker process attached to once."""
+
+    shared_memory: SharedMemory
+    dataset: DataSet
+    tau_factors: np.ndarray
+    results: np.ndarray
+    polynomial_degree: int
+    weight_factor: float
+
+    def __init__(
+        self,
+        shared_memory: SharedMemory,
+        dataset: DataSet,
+        tau_factors: np.ndarray,
+        results: np.ndarray,
+        polynomial_degree: int,
+        weight_factor: float,
+    ):
+        self.shared_memory = shared_memory
+        self.dataset = dataset
+        self.tau_factors = tau_factors
+        self.results = results
+        self.polynomial_degree = polynomial_degree
+        self.weight_factor = weight_factor
+
+
+_worker_state: Optional[_WorkerState] = None
+
+
+def calculate_lifetimes_for_tau_factors_in_parallel(
+    dataset: DataSet,
+    tau_factors: np.ndarray,
+    polynomial_degree: int,
+    weight_factor: float = 1.0,
+    active_mask: Optional[np.ndarray] = None,
+    worker_count: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Calculates the lifetime, its uncertainty and the chi-squared value for every
+    tau factor across a pool of worker processes, see
+    core.calculate_lifetimes_for_tau_factors. The numeric columns of the dataset
+    are placed in shared memory once, every worker attaches to them when it starts
+    and builds its dataset on top of them without copying, so the dataset is
+    neither pickled nor loaded per task. The tasks only consist of the bounds of a
+    chunk of tau factors, and the workers write their results straight into a
+    shared result array. With a single worker, the tau factors are calculated in
+    the current process.
+
+    The headless mode does not scan tau factors, it searches the optimal one with
+    core.calculate_optimal_tau_factor, and the batch mode already spreads its
+    datasets across worker processes. This function is meant for scans over many
+    tau factors of a single dataset, where starting the pool pays off.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factors (ndarray): The tau factors to calculate the lifetimes for
+        polynomial_degree (int): The degree of the fitted polynomials
+        weight_factor (float): Weighting factor for unshifted intensities
+        active_mask (ndarray): Optional boolean mask of the datapoints to use,
+        all datapoints are used if it is not given
+        worker_count (int): The number of worker processes, the number of CPUs if
+        not given
+        chunk_size (int): The number of tau factors per task, chosen so that every
+        worker gets PARALLEL_SCAN_CHUNKS_PER_WORKER tasks if not given
+
+    Returns:
+        ndarray:
+        Array of shape (3, len(tau_factors)) with the lifetimes, their
+        uncertainties and the chi-squared values, in the order of the tau factors.
+    """
+    if active_mask is not None:
+        dataset = select_active_datapoints(dataset, active_mask)
+
+    tau_factors = np.asarray(tau_factors, dtype=float)
+    worker_count = worker_count or cpu_count() or 1
+    if worker_count == 1 or len(tau_factors) <= 1:
+        return np.array(
+            calculate_lifetimes_for_tau_factors(
+                dataset, tau_factors, polynomial_degree, weight_factor
+            )
+        ).reshape(PARALLEL_SCAN_RESULT_ROWS, len(tau_factors))
+
+    columns = dataset.get_datapoints().columns
+    shared_memory = SharedMemory(
+        create=True,
+        size=_SharedScanLayout.get_size(columns.size, len(tau_factors)),
+    )
+    try:
+        layout = _SharedScanLayout(shared_memory.name, columns.size, len(tau_factors))
+        (values, errors, present, shared_tau_factors, results) = layout.get_arrays(
+            shared_memory
+        )
+        values[:] = columns.values[:, : columns.size]
+        errors[:] = columns.errors[:, : columns.size]
+        present[:] = columns.present[:, : columns.size]
+        shared_tau_factors[:] = tau_factors
+
+        with ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_initialize_worker,
+            initargs=(
+                layout,
+                dataset.get_relative_velocity(),
+                polynomial_degree,
+                weight_factor,
+            ),
+        ) as executor:
+            if chunk_size is None:
+                chunk_size = ceil(
+                    len(tau_factors) / (worker_count * PARALLEL_SCAN_CHUNKS_PER_WORKER)
+                )
+            starts = range(0, len(tau_factors), chunk_size)
+            # Consuming the results raises the errors of the workers
+            list(
+                executor.map(
+                    _calculate_chunk,
+                    starts,
+                    [min(start + chunk_size, len(tau_factors)) for start in starts],
+                )
+            )
+
+        scan_results: np.ndarray = results.copy()
+        # The views have to be released before the block can be closed
+        del values, errors, present, shared_tau_factors, results
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+    return scan_results
+
+
+def _initialize_worker(
+    layout: _SharedScanLayout,
+    relative_velocity: ValueErrorPair[RelativeVelocity],
+    polynomial_degree: int,
+    weight_factor: float,
+) -> None:
+    global _worker_state
+
+    shared_memory = _attach_shared_memory(layout.name)
+    (values, errors, present, tau_factors, results) = layout.get_arrays(shared_memory)
+    columns = DatapointColumns.wrap_arrays(
+        values, errors, present, np.ones(layout.datapoint_count, dtype=bool)
+    )
+
+    _worker_state = _WorkerState(
+        shared_memory,
+        DataSet(relative_velocity, DatapointCollection.from_columns(columns)),
+        tau_factors,
+        results,
+        polynomial_degree,
+        weight_factor,
+    )
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    shared_memory = SharedMemory(name=name)
+    # Before Python 3.13 attaching registers the block with the resource tracker,
+    # which would unlink it when the first worker exits
+    resource_tracker.unregister(shared_memory._name, "shared_memory")  # type: ignore[attr-defined]
+
+    return shared_memory
+
+
+def _calculate_chunk(start: int, stop: int) -> None:
+    if _worker_state is None:
+        raise RuntimeError("The worker was not initialized with a scan.")
+
+    (taus, delta_taus, chi_squared_values) = calculate_lifetimes_for_tau_factors(
+        _worker_state.dataset,
+        _worker_state.tau_factors[start:stop],
+        _worker_state.polynomial_degree,
+        _worker_state.weight_factor,
+    )
+    _worker_state.results[0, start:stop] = taus
+    _worker_state.results[1, start:stop] = delta_taus
+    _worker_state.results[2, start:stop] = chi_squared_values
@@ -0,0 +1,250 @@
+from typing import Tuple
+
+import numpy as np
+
+from napytau.core.errors.polynomial_coefficient_error import (
+    PolynomialCoefficientError,
+)
+
+
+def _validate_coefficients(coefficients: np.ndarray) -> None:
+    if len(coefficients) == 0:
+        raise PolynomialCoefficientError(
+            "An empty array of coefficients can not be evaluated."
+        )
+
+
+def calculate_derivative_coefficients(coefficients: np.ndarray) -> np.ndarray:
+    """
+    Calculates the coefficients of the derivative of a polynomial.
+
+    Args:
+        coefficients (ndarray):
+        Array of polynomial coefficients [a_0, a_1, ..., a_n],
+        where the polynomial is P(t) = a_0 + a_1*t + a_2*t^2 + ... + a_n*t^n.
+
+    Returns:
+        ndarray:
+        Array of coefficients [a_1, 2*a_2, ..., n*a_n] of P'(t). The derivative of
+        a constant polynomial is returned as [0].
+    """
+    _validate_coefficients(coefficients)
+
+    if len(coefficients) == 1:
+        return np.zeros(1)
+
+    return np.asarray(coefficients[1:], dtype=float) * np.arange(1, len(coefficients))
+
+
+def evaluate_polynomial(times: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+    """
+    Evaluates a polynomial at the given times using Horner's method. This is the
+    cheapest way of evaluating a polynomial at a set of times which is only
+    used once.
+
+    Args:
+        times (ndarray): The times to evaluate the polynomial at
+        coefficients (ndarray):
+        Array of polynomial coefficients [a_0, a_1, ..., a_n],
+        where the polynomial is P(t) = a_0 + a_1*t + a_2*t^2 + ... + a_n*t^n.
+
+    Returns:
+        ndarray: Array of polynomial values evaluated at the given times.
+    """
+    _validate_coefficients(coefficients)
+
+    result: np.ndarray = np.full(np.shape(times), coefficients[-1], dtype=float)
+    for coefficient in coefficients[-2::-1]:
+        result = result * times + coefficient
+
+    return result
+
+
+def evaluate_differentiated_polynomial(
+    times: np.ndarray, coefficients: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluates the derivative of a polynomial at the given times using Horner's method.
+
+    Args:
+        times (ndarray): The times to evaluate the derivative at
+        coefficients (ndarray):
+        Array of polynomial coefficients [a_0, a_1, ..., a_n],
+        where the polynomial is P(t) = a_0 + a_1*t + a_2*t^2 + ... + a_n*t^n.
+
+    Returns:
+        ndarray: Array of the derivative values of the polynomial at the given times.
+    """
+    return evaluate_polynomial(times, calculate_derivative_coefficients(coefficients))
+
+
+def evaluate_polynomial_for_basis(
+    basis: np.ndarray, coefficients: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluates a polynomial as a matrix product with a Vandermonde basis matrix, whose
+    column k holds the k-th power of the times. Building the basis once and reusing
+    it makes repeated evaluations at the same times a single BLAS call.
+
+    Args:
+        basis (ndarray):
+        Vandermonde matrix of shape (len(times), m) with m >= len(coefficients)
+        coefficients (ndarray):
+        Array of polynomial coefficients [a_0, a_1, ..., a_n],
+        where the polynomial is P(t) = a_0 + a_1*t + a_2*t^2 + ... + a_n*t^n.
+
+    Returns:
+        ndarray: Array of polynomial values evaluated at the times of the basis.
+    """
+    _validate_coefficients(coefficients)
+
+    result: np.ndarray = basis[:, : len(coefficients)] @ np.asarray(
+        coefficients, dtype=float
+    )
+
+    return result
+
+
+def evaluate_differentiated_polynomial_for_basis(
+    basis: np.ndarray, coefficients: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluates the derivative of a polynomial as a matrix product with a Vandermonde
+    basis matrix, see evaluate_polynomial_for_basis.
+
+    Args:
+        basis (ndarray):
+        Vandermonde matrix of shape (len(times), m) with m >= len(coefficients) - 1
+        coefficients (ndarray):
+        Array of polynomial coefficients [a_0, a_1, ..., a_n],
+        where the polynomial is P(t) = a_0 + a_1*t + a_2*t^2 + ... + a_n*t^n.
+
+    Returns:
+        ndarray: Array of the derivative values at the times of the basis.
+    """
+    return evaluate_polynomial_for_basis(
+        basis, calculate_derivative_coefficients(coefficients)
+    )
+
+
+def calculate_derivative_basis(basis: np.ndarray) -> np.ndarray:
+    """
+    Calculates the derivative of a Vandermonde basis matrix with respect to the
+    times, i.e. the matrix whose column k holds k * t^(k-1). Multiplying it with a
+    vector of coefficients evaluates the derivative of the polynomial, so it is the
+    design matrix of a fit against the derivative.
+
+    Args:
+        basis (ndarray):
+        Vandermonde matrix of shape (len(times), m), column k holding t^k
+
+    Returns:
+        ndarray: Matrix of shape (len(times), m), column k holding k * t^(k-1).
+    """
+    derivative_basis: np.ndarray = np.zeros(np.shape(basis), dtype=float)
+    derivative_basis[:, 1:] = basis[:, :-1] * np.arange(1, np.shape(basis)[1])
+
+    return derivative_basis
+
+
+def evaluate_quadratic_form_for_basis(
+    basis: np.ndarray, covariance_matrix: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluates the quadratic form b_i^T C b_i of a covariance matrix C for every row
+    b_i of a basis matrix, i.e. sum_k sum_l b_ik * b_il * C_kl. This is the variance
+    of a polynomial with coefficient covariance C at the times of the basis.
+
+    Args:
+        basis (ndarray):
+        Basis matrix of shape (len(times), m) with m >= len(covariance_matrix)
+        covariance_matrix (ndarray):
+        Covariance matrix of the polynomial coefficients
+
+    Returns:
+        ndarray: The quadratic form evaluated for every row of the basis.
+    """
+    truncated_basis = basis[:, : len(covariance_matrix)]
+
+    # The row-wise dot products are summed by einsum without allocating the
+    # elementwise product of the two matrices
+    result: np.ndarray = np.einsum(
+        "ij,ij->i", truncated_basis @ covariance_matrix, truncated_basis
+    )
+
+    return result
+
+
+def decompose_weighted_basis(
+    basis: np.ndarray, weights: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the QR decomposition of a basis matrix whose rows are scaled by
+    weights, e.g. the inverse errors of the fitted values. The rows are scaled
+    instead of multiplying with a diagonal weight matrix, so time and memory are
+    linear in the number of rows. The powers of the times differ by orders of
+    magnitude, the columns are therefore scaled to unit length before the
+    decomposition to keep it accurate.
+
+    Args:
+        basis (ndarray):
+        Basis matrix of shape (len(times), m) with len(times) >= m
+        weights (ndarray): The weights of the rows of the basis
+
+    Returns:
+        tuple:
+        The matrix Q of shape (len(times), m), the upper triangular matrix R of
+        shape (m, m) and the m column scales s, so that the weighted basis equals
+        Q R diag(s).
+    """
+    if np.shape(basis)[0] < np.shape(basis)[1]:
+        raise np.linalg.LinAlgError(
+            f"A basis with {np.shape(basis)[0]} rows and {np.shape(basis)[1]} "
+            "columns does not have full column rank."
+        )
+
+    weighted_basis = basis * weights[:, np.newaxis]
+    column_scales = np.linalg.norm(weighted_basis, axis=0)
+    column_scales[column_scales == 0] = 1.0
+    (q, r) = np.linalg.qr(weighted_basis / column_scales)
+
+    return q, r, column_scales
+
+
+def calculate_covariance_matrix_for_decomposition(
+    r: np.ndarray, column_scales: np.ndarray
+) -> np.ndarray:
+    """
+    Calculates the covariance matrix (B^T W^2 B)^-1 of the coefficients of a
+    weighted fit from the decomposition of decompose_weighted_basis. Only the
+    small triangular matrix R is inverted, the normal equations are never formed.
+
+    Args:
+        r (ndarray): The upper triangular matrix R of the decomposition
+        column_scales (ndarray): The column scales of the decomposition
+
+    Returns:
+        ndarray: The covariance matrix of shape (m, m).
+    """
+    inverse_r = np.linalg.inv(r)
+    covariance_matrix: np.ndarray = (inverse_r @ inverse_r.T) / np.outer(
+        column_scales, column_scales
+    )
+
+    return covariance_matrix
+
+
+def calculate_condition_number_for_decomposition(r: np.ndarray) -> float:
+    """
+    Calculates the condition number of the column scaled, weighted basis of a
+    decomposition of decompose_weighted_basis, which equals the condition number
+    of R. About log10 of it decimal digits of the covariance matrix are lost, the
+    normal equations would lose twice as many.
+
+    Args:
+        r (ndarray): The upper triangular matrix R of the decomposition
+
+    Returns:
+        float: The condition number in the 2-norm, infinite for a singular basis.
+    """
+    return float(np.linalg.cond(r))
@@ -3,10 +3,33 @@ from napytau.core.errors.polynomial_coefficient_error import (
 )
 import numpy as np
 import scipy as sp
+from typing import Iterator, Optional, Tuple
 
-from napytau.core.time import calculate_times_from_distances_and_relative_velocity
+from napytau.core.polynomial_evaluation import (
+    calculate_covariance_matrix_for_decomposition,
+    calculate_derivative_basis,
+    decompose_weighted_basis,
+    evaluate_differentiated_polynomial_for_basis,
+    evaluate_polynomial_for_basis,
+)
+from napytau.core.time import (
+    calculate_powers_of_times,
+    calculate_times_from_distances_and_relative_velocity,
+)
 from napytau.import_export.model.dataset import DataSet
 
+FIT_MODE_UNWEIGHTED = "unweighted"
+FIT_MODE_WEIGHTED = "weighted"
+
+FIT_MODES = [FIT_MODE_UNWEIGHTED, FIT_MODE_WEIGHTED]
+
+TAU_FACTOR_FIT_TOLERANCE = 1e-8
+"""
+The root mean square deviation of the ratio of a polynomial to its derivative from
+the tau factor, relative to the tau factor, below which the initial guess of a fit
+for the tau factor is accepted without iterating.
+"""
+
 
 def evaluate_polynomial_at_measuring_times(
     dataset: DataSet,
@@ -30,13 +53,12 @@ def evaluate_polynomial_at_measuring_times(
             "An empty array of coefficients can not be evaluated."
         )
 
-    times: np.ndarray = calculate_times_from_distances_and_relative_velocity(dataset)
-    # Evaluate the polynomial sum at the given time points
-    sum_at_measuring_distances: np.ndarray = np.zeros_like(times, dtype=float)
-    for exponent, coefficient in enumerate(coefficients):
-        sum_at_measuring_distances += coefficient * np.power(times, exponent)
-
-    return sum_at_measuring_distances
+    # The powers of the times are cached per dataset, so the evaluation is a
+    # single matrix product
+    return evaluate_polynomial_for_basis(
+        calculate_powers_of_times(dataset, len(coefficients) - 1),
+        coefficients,
+    )
 
 
 def evaluate_differentiated_polynomial_at_measuring_times(
@@ -63,33 +85,102 @@ def evaluate_differentiated_polynomial_at_measuring_times(
             "An empty array of coefficients can not be evaluated."
         )
 
-    times: np.ndarray = calculate_times_from_distances_and_relative_velocity(dataset)
-    sum_of_derivative_at_measuring_distances: np.ndarray = np.zeros_like(
-        times, dtype=float
+    return evaluate_differentiated_polynomial_for_basis(
+        calculate_powers_of_times(dataset, max(len(coefficients) - 2, 0)),
+        coefficients,
+    )
+
+
+def evaluate_polynomials_at_measuring_times(
+    dataset: DataSet,
+    coefficients_matrix: np.ndarray,
+) -> np.ndarray:
+    """
+    Evaluates several polynomials of the same degree at the measuring times in a
+    single matrix product.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients_matrix (ndarray):
+        Matrix of shape (number of polynomials, n + 1), every row holding the
+        coefficients [a_0, a_1, ..., a_n] of one polynomial.
+
+    Returns:
+        ndarray:
+        Matrix of shape (number of polynomials, len(distances)), every row holding
+        the values of one polynomial at the measuring times.
+    """
+    if np.shape(coefficients_matrix)[1] == 0:
+        raise PolynomialCoefficientError(
+            "An empty array of coefficients can not be evaluated."
+        )
+
+    result: np.ndarray = (
+        coefficients_matrix
+        @ calculate_powers_of_times(dataset, np.shape(coefficients_matrix)[1] - 1).T
+    )
+
+    return result
+
+
+def evaluate_differentiated_polynomials_at_measuring_times(
+    dataset: DataSet,
+    coefficients_matrix: np.ndarray,
+) -> np.ndarray:
+    """
+    Evaluates the derivatives of several polynomials of the same degree at the
+    measuring times in a single matrix product.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients_matrix (ndarray):
+        Matrix of shape (number of polynomials, n + 1), every row holding the
+        coefficients [a_0, a_1, ..., a_n] of one polynomial.
+
+    Returns:
+        ndarray:
+        Matrix of shape (number of polynomials, len(distances)), every row holding
+        the derivative values of one polynomial at the measuring times.
+    """
+    if np.shape(coefficients_matrix)[1] == 0:
+        raise PolynomialCoefficientError(
+            "An empty array of coefficients can not be evaluated."
+        )
+
+    result: np.ndarray = (
+        coefficients_matrix
+        @ calculate_derivative_basis(
+            calculate_powers_of_times(dataset, np.shape(coefficients_matrix)[1] - 1)
+        ).T
     )
-    for exponent, coefficient in enumerate(coefficients):
-        if exponent > 0:
-            sum_of_derivative_at_measuring_distances += (
-                exponent * coefficient * np.power(times, (exponent - 1))
-            )
 
-    return sum_of_derivative_at_measuring_distances
+    return result
 
 
 def calculate_polynomial_coefficients_for_fit(
     dataset: DataSet,
     degree: int,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
 ) -> np.ndarray:
     """
     Calculates the polynomial coefficients for the polynomial fit.
+    In the weighted fit mode, the shifted intensities are weighted with their
+    errors, see calculate_weighted_polynomial_fit.
 
     Args:
         dataset (DataSet): The dataset of the experiment
         degree (int): The degree of the polynomial to be fitted
+        fit_mode (str): One of FIT_MODES
 
     Returns:
         ndarray: Array of polynomial coefficients for the fit.
     """
+    if fit_mode == FIT_MODE_WEIGHTED:
+        return calculate_weighted_polynomial_fit(dataset, degree)[0]
+
+    if fit_mode != FIT_MODE_UNWEIGHTED:
+        raise ValueError(f"Unknown fit mode: {fit_mode}")
+
     # Calculate the polynomial coefficients for the fit
     polynomial_coefficients: np.ndarray = (
         np.polynomial.Polynomial.fit(
@@ -104,40 +195,349 @@ def calculate_polynomial_coefficients_for_fit(
     return polynomial_coefficients
 
 
+def calculate_weighted_polynomial_fit(
+    dataset: DataSet,
+    degree: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the polynomial coefficients of the fit of the shifted intensities
+    weighted with their inverse squared errors, together with the covariance
+    matrix of the coefficients. Both are calculated from the same QR decomposition
+    of the weighted design matrix, so the covariance matrix, which equals the one
+    of delta_tau.calculate_covariance_matrix, is a by-product of the fit.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        degree (int): The degree of the polynomial to be fitted
+
+    Returns:
+        tuple:
+        Array of degree + 1 polynomial coefficients and their covariance matrix.
+    """
+    shifted_intensities = dataset.get_datapoints().get_shifted_intensities()
+    if len(shifted_intensities) < degree + 1:
+        raise PolynomialCoefficientError(
+            f"At least {degree + 1} datapoints are needed for a weighted fit of "
+            f"degree {degree}."
+        )
+
+    weights = 1 / shifted_intensities.get_errors()
+    (q, r, column_scales) = decompose_weighted_basis(
+        calculate_powers_of_times(dataset, degree), weights
+    )
+
+    coefficients: np.ndarray = (
+        sp.linalg.solve_triangular(
+            r, q.T @ (shifted_intensities.get_values() * weights)
+        )
+        / column_scales
+    )
+    covariance_matrix = calculate_covariance_matrix_for_decomposition(r, column_scales)
+
+    return coefficients, covariance_matrix
+
+
 def calculate_polynomial_coefficients_for_tau_factor(
     dataset: DataSet,
     tau_factor: float,
     degree: int,
+    initial_coefficients: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
-    Calculates the polynomial coefficients for the tau factor.
+    Calculates the polynomial coefficients for the tau factor, i.e. the degree
+    coefficients [a_0, a_1, ...] of the polynomial P for which P(t) / P'(t) is
+    closest to the tau factor at the measuring times. Like the coefficients of all
+    other polynomials, they are in increasing order of degree.
+    The least squares problem is solved with its analytic jacobian matrix, the
+    powers of the times are taken from the cache in time.py. Unless an initial
+    guess is given, the solver starts from the solution of the linearised problem
+    P(t) - tau_factor * P'(t) = 0, from which it usually converges in a single
+    step.
+
+    The ratio does not depend on the scale of the polynomial, so the scale of the
+    solution would depend on the initial guess. The solution is therefore scaled
+    to fit the shifted intensities best, weighted with their inverse squared
+    errors, which makes warm starts possible.
 
     Args:
         dataset (DataSet): The dataset of the experiment
         tau_factor (float): The tau factor to be used in the polynomial fit
-        degree (int): The degree of the polynomial to be fitted
+        degree (int): The number of coefficients of the polynomial to be fitted
+        initial_coefficients (ndarray): Optional initial guess, e.g. the
+        coefficients of a neighbouring tau factor, see also
+        scan_polynomial_coefficients_for_tau_factors
 
     Returns:
         ndarray: Array of polynomial coefficients for the tau factor.
     """
+    (coefficients, _) = _TauFactorFit(dataset, degree).fit(
+        tau_factor, initial_coefficients
+    )
+
+    return coefficients
+
 
-    polynomial_fit = (
-        lambda x, *coefficients: (
-            np.poly1d(coefficients)(x) / np.polyder(np.poly1d(coefficients))(x)
+def scan_polynomial_coefficients_for_tau_factors(
+    dataset: DataSet,
+    tau_factors: np.ndarray,
+    degree: int,
+) -> Iterator[np.ndarray]:
+    """
+    Calculates the polynomial coefficients for a sequence of tau factors by
+    continuation, see calculate_polynomial_coefficients_for_tau_factor. The bases
+    of the fits and the factorisation from which the linearised problem of every
+    tau factor is solved are only calculated once. Every fit starts from the
+    solution of the previous tau factor if that is closer to the ratio than the
+    solution of the linearised problem, which saves iterations if the tau factors
+    are sorted and closely spaced. The coefficients are yielded as soon as they
+    are calculated.
+    Polynomials with more than three coefficients are not always determined by
+    their ratio to the derivative, and the ratio can have several local minima if
+    the derivative changes its sign between the times. The coefficients can then
+    differ from those of separate fits.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factors (ndarray): The tau factors in the order they are walked
+        degree (int): The number of coefficients of the polynomials to be fitted
+
+    Returns:
+        Iterator of the arrays of polynomial coefficients, one for every tau
+        factor.
+    """
+    tau_factor_fit = _TauFactorFit(dataset, degree)
+
+    solution: Optional[np.ndarray] = None
+    for tau_factor in tau_factors:
+        (coefficients, solution) = tau_factor_fit.fit(float(tau_factor), solution)
+        yield coefficients
+
+
+class _TauFactorFit:
+    """
+    The fits of polynomials with a given number of coefficients, in increasing
+    order of degree, to tau factors for a dataset, see
+    calculate_polynomial_coefficients_for_tau_factor. Everything which does not
+    depend on the tau factor is calculated once.
+    """
+
+    _basis: np.ndarray
+    _derivative_basis: np.ndarray
+    _linear_factor: np.ndarray
+    _linear_column_scales: np.ndarray
+    _weights: np.ndarray
+    _shifted_intensities: np.ndarray
+
+    def __init__(self, dataset: DataSet, degree: int):
+        self._basis = calculate_powers_of_times(dataset, degree - 1)
+        self._derivative_basis = calculate_derivative_basis(self._basis)
+
+        # B - tau_factor * D = Q (R_B - tau_factor * R_D) for the QR decomposition
+        # of [B, D], so the linearised problem of every tau factor is solved from
+        # the small matrix R instead of the whole bases
+        combined_basis = np.hstack((self._basis, self._derivative_basis))
+        self._linear_column_scales = np.linalg.norm(combined_basis, axis=0)
+        self._linear_column_scales[self._linear_column_scales == 0] = 1.0
+        self._linear_factor = (
+            np.linalg.qr(combined_basis / self._linear_column_scales, mode="r")
+            * self._linear_column_scales
+        )
+
+        shifted_intensities = dataset.get_datapoints().get_shifted_intensities()
+        self._weights = 1 / np.power(shifted_intensities.get_errors(), 2)
+        self._shifted_intensities = shifted_intensities.get_values()
+
+    def fit(
+        self, tau_factor: float, initial_coefficients: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fits the polynomial for the tau factor, starting from the initial guess if
+        it is closer to the ratio than the solution of the linearised problem. The
+        start is accepted as it is if it is within TAU_FACTOR_FIT_TOLERANCE.
+        Returns the coefficients scaled to the shifted intensities and the unscaled
+        solution of the solver, from which continuations start, as the trust
+        region of the solver is not invariant to the scale of the coefficients.
+        """
+        linearized_coefficients = self._calculate_linearized_coefficients(tau_factor)
+        cost = self._calculate_cost(linearized_coefficients, tau_factor)
+        if initial_coefficients is not None:
+            initial_cost = self._calculate_cost(initial_coefficients, tau_factor)
+        if initial_coefficients is None or initial_cost > cost:
+            initial_coefficients = linearized_coefficients
+        else:
+            cost = initial_cost
+
+        solution = initial_coefficients
+        if cost > len(self._basis) * (TAU_FACTOR_FIT_TOLERANCE * tau_factor) ** 2:
+            solution = sp.optimize.least_squares(
+                _calculate_tau_factor_residuals,
+                initial_coefficients,
+                jac=_calculate_tau_factor_jacobian_matrix,
+                args=(self._basis, self._derivative_basis, tau_factor),
+            ).x
+
+        polynomial = self._basis @ solution
+        squared_norm = np.sum(self._weights * polynomial * polynomial)
+        if squared_norm == 0:
+            return np.array(solution), solution
+
+        coefficients: np.ndarray = (
+            solution * np.sum(self._weights * polynomial * self._shifted_intensities)
+        ) / squared_norm
+
+        return coefficients, solution
+
+    def _calculate_linearized_coefficients(self, tau_factor: float) -> np.ndarray:
+        # The coefficients minimizing |P - tau_factor * P'| for |c| = 1 are the
+        # right singular vector of the smallest singular value, the columns are
+        # scaled first as the powers of the times differ by orders of magnitude
+        degree = np.shape(self._basis)[1]
+        linear_matrix = (
+            self._linear_factor[:, :degree]
+            - tau_factor * self._linear_factor[:, degree:]
+        )
+        column_scales = np.linalg.norm(linear_matrix, axis=0)
+        column_scales[column_scales == 0] = 1.0
+        coefficients: np.ndarray = (
+            np.linalg.svd(linear_matrix / column_scales)[2][-1] / column_scales
         )
-        - tau_factor
+
+        if not np.all(self._derivative_basis @ coefficients != 0):
+            # The ratio is not defined for this guess, e.g. for fewer datapoints
+            # than coefficients
+            return np.ones(degree)
+
+        return coefficients
+
+    def _calculate_cost(self, coefficients: np.ndarray, tau_factor: float) -> float:
+        if not np.all(self._derivative_basis @ coefficients != 0):
+            return float("inf")
+
+        residuals = _calculate_tau_factor_residuals(
+            coefficients, self._basis, self._derivative_basis, tau_factor
+        )
+
+        return float(residuals @ residuals)
+
+
+def _calculate_tau_factor_residuals(
+    coefficients: np.ndarray,
+    basis: np.ndarray,
+    derivative_basis: np.ndarray,
+    tau_factor: float,
+) -> np.ndarray:
+    residuals: np.ndarray = (basis @ coefficients) / (
+        derivative_basis @ coefficients
+    ) - tau_factor
+
+    return residuals
+
+
+def _calculate_tau_factor_jacobian_matrix(
+    coefficients: np.ndarray,
+    basis: np.ndarray,
+    derivative_basis: np.ndarray,
+    tau_factor: float,
+) -> np.ndarray:
+    # d/dc_k P / P' = (t^k P' - P k t^(k-1)) / P'^2
+    polynomial = basis @ coefficients
+    derivative = derivative_basis @ coefficients
+    jacobian_matrix: np.ndarray = (
+        basis * derivative[:, np.newaxis] - derivative_basis * polynomial[:, np.newaxis]
+    ) / np.power(derivative, 2)[:, np.newaxis]
+
+    return jacobian_matrix
+
+
+def calculate_polynomial_coefficients_for_tau_factors(
+    dataset: DataSet,
+    tau_factors: np.ndarray,
+    degree: int,
+) -> np.ndarray:
+    """
+    Calculates the polynomial coefficients for several tau factors, see
+    calculate_polynomial_coefficients_for_tau_factor. Every fit starts from the
+    solution of its linearised problem, so the coefficients equal those of
+    separate fits, only the bases and their factorisation are shared.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factors (ndarray): The tau factors to be used in the polynomial fits
+        degree (int): The degree of the polynomial to be fitted
+
+    Returns:
+        ndarray:
+        Matrix with one row of polynomial coefficients for every tau factor.
+    """
+    tau_factor_fit = _TauFactorFit(dataset, degree)
+
+    coefficients_matrix: np.ndarray = np.array(
+        [tau_factor_fit.fit(float(tau_factor))[0] for tau_factor in tau_factors]
+    ).reshape(len(tau_factors), degree)
+
+    return coefficients_matrix
+
+
+def calculate_polynomial_coefficients_for_chi_squared(
+    dataset: DataSet,
+    tau_factor: float,
+    weight_factor: float,
+    degree: int,
+) -> np.ndarray:
+    """
+    Calculates the polynomial coefficients minimizing the chi-squared value for a
+    fixed tau factor, see chi.calculate_chi_squared. For a fixed tau factor both
+    the polynomial and its scaled derivative are linear in the coefficients, so the
+    minimum is the solution of a single weighted linear least squares problem.
+    The rows of the design matrix are the powers of the times weighted with the
+    errors of the shifted intensities, followed by the scaled derivatives of the
+    powers weighted with the errors of the unshifted intensities.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        tau_factor (float): The tau factor to be used in the polynomial fit
+        weight_factor (float): Weighting factor for unshifted intensities
+        degree (int): The degree of the polynomial to be fitted
+
+    Returns:
+        ndarray: Array of degree + 1 polynomial coefficients.
+    """
+    design_matrix, observations = _calculate_chi_squared_system(
+        dataset, tau_factor, weight_factor, degree
     )
 
-    # Initial guess: coefficients as ones
-    initial_guess = np.ones(degree)
+    coefficients: np.ndarray = np.linalg.lstsq(design_matrix, observations)[0]
 
-    # Solve for coefficients using least squares
-    res = sp.optimize.least_squares(
-        lambda coefficients: polynomial_fit(
-            calculate_times_from_distances_and_relative_velocity(dataset),
-            *coefficients,
-        ),
-        initial_guess,
+    return coefficients
+
+
+def _calculate_chi_squared_system(
+    dataset: DataSet,
+    tau_factor: float,
+    weight_factor: float,
+    degree: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    datapoints = dataset.get_datapoints()
+    shifted_intensities = datapoints.get_shifted_intensities()
+    unshifted_intensities = datapoints.get_unshifted_intensities()
+
+    basis = calculate_powers_of_times(dataset, degree)
+    shifted_weights = 1 / shifted_intensities.get_errors()
+    unshifted_weights = np.sqrt(weight_factor) / unshifted_intensities.get_errors()
+
+    design_matrix: np.ndarray = np.vstack(
+        (
+            basis * shifted_weights[:, np.newaxis],
+            tau_factor
+            * calculate_derivative_basis(basis)
+            * unshifted_weights[:, np.newaxis],
+        )
+    )
+    observations: np.ndarray = np.concatenate(
+        (
+            shifted_intensities.get_values() * shifted_weights,
+            unshifted_intensities.get_values() * unshifted_weights,
+        )
     )
 
-    return np.array(res.x)
+    return design_matrix, observations
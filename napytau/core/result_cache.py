@@ -0,0 +1,184 @@
+import json
+from collections import OrderedDict
+from hashlib import blake2b
+from os import makedirs
+from pathlib import PurePath
+from threading import Lock
+from typing import Callable, Optional, Tuple, TypeVar, Union
+
+import numpy as np
+
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.reader.file_reader import FileReader
+from napytau.import_export.writer.file_writer import FileWriter
+
+RESULT_CACHE_CAPACITY = 1024
+"""The number of results kept in memory by default."""
+
+RESULT_CACHE_FILE_SUFFIX = ".json"
+
+CacheableResult = Union[float, Tuple[float, ...]]
+T = TypeVar("T", bound=CacheableResult)
+
+
+class ResultCache:
+    """
+    Caches the results of calculations on datasets, keyed by a hash of the numeric
+    data of the dataset and the parameters of the calculation. Unchanged datasets
+    therefore hit the cache no matter where they were loaded from, while any change
+    to a datapoint, its active flag or the parameters misses it.
+
+    The least recently used results are kept in memory. If a directory is given,
+    the results are also persisted there, one file per result, so they survive the
+    process and can be shared between processes, e.g. the workers of a batch.
+    """
+
+    capacity: int
+    directory_path: Optional[PurePath]
+    _results: "OrderedDict[str, CacheableResult]"
+    _lock: Lock
+
+    def __init__(
+        self,
+        capacity: int = RESULT_CACHE_CAPACITY,
+        directory_path: Optional[PurePath] = None,
+    ):
+        self.capacity = capacity
+        self.directory_path = directory_path
+        self._results = OrderedDict()
+        self._lock = Lock()
+        if directory_path is not None:
+            makedirs(directory_path, exist_ok=True)
+
+    def get_or_calculate(
+        self,
+        calculation_name: str,
+        dataset: DataSet,
+        parameters: Tuple[float, ...],
+        calculate: Callable[[], T],
+    ) -> T:
+        """
+        Returns the cached result of the calculation for the dataset and parameters,
+        or calculates and caches it if there is none.
+
+        Args:
+            calculation_name (str): The name of the calculation, part of the key
+            dataset (DataSet): The dataset the calculation is performed on
+            parameters (tuple): The parameters of the calculation
+            calculate (callable): Calculates the result on a cache miss
+
+        Returns:
+            The cached or calculated result.
+        """
+        key = create_result_key(calculation_name, dataset, parameters)
+
+        cached_result = self._get(key)
+        if cached_result is not None:
+            return cached_result  # type: ignore[return-value]
+
+        result = calculate()
+        self._put(key, result)
+
+        return result
+
+    def clear(self) -> None:
+        """Removes all results from memory, persisted results are kept."""
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _get(self, key: str) -> Optional[CacheableResult]:
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        result = self._read(key)
+        if result is not None:
+            self._remember(key, result)
+
+        return result
+
+    def _put(self, key: str, result: CacheableResult) -> None:
+        self._remember(key, result)
+        self._write(key, result)
+
+    def _remember(self, key: str, result: CacheableResult) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[CacheableResult]:
+        if self.directory_path is None:
+            return None
+
+        try:
+            raw_result = json.loads(FileReader.read_text(self._get_file_path(key)))
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Missing or broken files are treated as misses and overwritten later
+            return None
+
+        if isinstance(raw_result, list):
+            return tuple(float(value) for value in raw_result)
+
+        return float(raw_result)
+
+    def _write(self, key: str, result: CacheableResult) -> None:
+        if self.directory_path is None:
+            return
+
+        raw_result = (
+            [float(value) for value in result]
+            if isinstance(result, tuple)
+            else float(result)
+        )
+        with FileWriter.open_text_atomically(self._get_file_path(key)) as file:
+            file.write(json.dumps(raw_result))
+
+    def _get_file_path(self, key: str) -> PurePath:
+        return PurePath(str(self.directory_path), key + RESULT_CACHE_FILE_SUFFIX)
+
+
+def create_result_key(
+    calculation_name: str, dataset: DataSet, parameters: Tuple[float, ...]
+) -> str:
+    """
+    Creates the cache key of a calculation from a hash of the numeric data of the
+    dataset and the parameters of the calculation.
+
+    Args:
+        calculation_name (str): The name of the calculation
+        dataset (DataSet): The dataset the calculation is performed on
+        parameters (tuple): The parameters of the calculation
+
+    Returns:
+        The key as a hexadecimal string.
+    """
+    columns = dataset.get_datapoints().columns
+    relative_velocity = dataset.get_relative_velocity()
+
+    key_hash = blake2b(digest_size=20)
+    key_hash.update(
+        json.dumps(
+            [
+                calculation_name,
+                [float(parameter) for parameter in parameters],
+                relative_velocity.value.get_velocity(),
+                relative_velocity.error.get_velocity(),
+                columns.size,
+            ]
+        ).encode()
+    )
+    for array in (
+        columns.values[:, : columns.size],
+        columns.errors[:, : columns.size],
+        columns.present[:, : columns.size],
+        columns.active[: columns.size],
+    ):
+        key_hash.update(np.ascontiguousarray(array).data)
+
+    return key_hash.hexdigest()
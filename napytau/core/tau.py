@@ -1,5 +1,6 @@
 from napytau.core.polynomials import (
     evaluate_differentiated_polynomial_at_measuring_times,
+    evaluate_differentiated_polynomials_at_measuring_times,
 )  # noqa E501
 import numpy as np
 from napytau.import_export.model.dataset import DataSet
@@ -33,3 +34,32 @@ def calculate_tau_i_values(
     )
 
     return tau_i_values
+
+
+def calculate_tau_i_values_for_coefficients(
+    dataset: DataSet,
+    coefficients_matrix: np.ndarray,
+) -> np.ndarray:
+    """
+    Calculates the decay times (tau_i) for several sets of polynomial coefficients
+    at once, see calculate_tau_i_values.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        coefficients_matrix (ndarray):
+        Matrix with one row of polynomial coefficients for every fit
+
+    Returns:
+        ndarray:
+        Matrix with one row of decay times for every fit and one column for every
+        distance point.
+    """
+
+    tau_i_values: np.ndarray = (
+        dataset.get_datapoints().get_unshifted_intensities().get_values()
+        / evaluate_differentiated_polynomials_at_measuring_times(
+            dataset, coefficients_matrix
+        )
+    )
+
+    return tau_i_values
@@ -31,3 +31,37 @@ def calculate_tau_final(
     uncertainty: float = np.sqrt(1 / np.sum(weights))
 
     return weighted_mean, uncertainty
+
+
+def calculate_tau_finals(
+    tau_i_values: np.ndarray,
+    delta_tau_i_values: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the final decay times (tau_final) and their associated uncertainties
+    for several fits at once, see calculate_tau_final.
+
+    Args:
+        tau_i_values (ndarray):
+        Matrix of individual decay times (tau_i), one row for every fit
+        delta_tau_i_values (ndarray):
+        Matrix of uncertainties associated with each tau_i
+
+    Returns:
+        tuple: Arrays of the weighted means of tau and their uncertainties
+    """
+    # For empty input arrays return -1 to show the invalidity of the input data.
+    if np.shape(tau_i_values)[1] == 0:
+        invalid: np.ndarray = np.full(np.shape(tau_i_values)[0], -1.0)
+        return invalid, invalid.copy()
+
+    weights: np.ndarray = 1 / np.power(delta_tau_i_values, 2)
+    weight_sums: np.ndarray = np.sum(weights, axis=1)
+
+    # Calculate the weighted means of tau_i
+    weighted_means: np.ndarray = np.sum(weights * tau_i_values, axis=1) / weight_sums
+
+    # Calculate the uncertainties of the weighted means
+    uncertainties: np.ndarray = np.sqrt(1 / weight_sums)
+
+    return weighted_means, uncertainties
@@ -1,16 +1,130 @@
 import numpy as np
 import scipy as sp
+from typing import Optional, Tuple
+from weakref import WeakKeyDictionary
 
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
 from napytau.import_export.model.dataset import DataSet
 
 
+class _FlightTimes:
+    """
+    The flight times of a dataset together with the state of the dataset they were
+    calculated for. Powers of the times are added on demand.
+    """
+
+    key: Tuple[int, int, float]
+    times: np.ndarray
+    powers: Optional[np.ndarray]
+
+    def __init__(self, key: Tuple[int, int, float], times: np.ndarray):
+        self.key = key
+        self.times = times
+        self.powers = None
+
+
+# Keyed by the column storage of the datapoints, so entries are dropped as soon as
+# the datapoints of a dataset are garbage collected.
+_flight_times_cache: WeakKeyDictionary[DatapointColumns, _FlightTimes] = (
+    WeakKeyDictionary()
+)
+
+
+def _get_flight_times(dataset: DataSet) -> _FlightTimes:
+    columns = dataset.get_datapoints().columns
+    velocity = dataset.get_relative_velocity().value.get_velocity()
+    key = (columns.get_revision(DatapointField.DISTANCE), columns.size, velocity)
+
+    flight_times = _flight_times_cache.get(columns)
+    if flight_times is None or flight_times.key != key:
+        times = np.array(
+            dataset.get_datapoints().get_distances().get_values()
+            / (velocity * sp.constants.speed_of_light)
+        )
+        times.flags.writeable = False
+        flight_times = _FlightTimes(key, times)
+        _flight_times_cache[columns] = flight_times
+
+    return flight_times
+
+
 def calculate_times_from_distances_and_relative_velocity(
     dataset: DataSet,
 ) -> np.ndarray:
-    return np.array(
-        dataset.get_datapoints().get_distances().get_values()
-        / (
-            dataset.get_relative_velocity().value.get_velocity()
-            * sp.constants.speed_of_light
-        )
+    """
+    Calculates the flight times of the particles for all measured distances.
+    The times are cached per dataset and only recalculated once the distances or
+    the relative velocity of the dataset change, the returned array is read-only.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+
+    Returns:
+        ndarray: The flight times for all distances of the dataset.
+    """
+    return _get_flight_times(dataset).times
+
+
+def calculate_powers_of_times(
+    dataset: DataSet,
+    max_exponent: int,
+) -> np.ndarray:
+    """
+    Calculates the powers t^0, t^1, ..., t^max_exponent of the flight times of the
+    dataset. The powers share the cache of the flight times and are only
+    recalculated if a higher exponent is requested, the returned array is read-only.
+
+    Args:
+        dataset (DataSet): The dataset of the experiment
+        max_exponent (int): The highest exponent to calculate
+
+    Returns:
+        ndarray:
+        Matrix of shape (len(distances), max_exponent + 1), with column k holding
+        the k-th power of the flight times.
+    """
+    flight_times = _get_flight_times(dataset)
+
+    if flight_times.powers is None or flight_times.powers.shape[1] <= max_exponent:
+        powers = np.vander(flight_times.times, max_exponent + 1, increasing=True)
+        powers.flags.writeable = False
+        flight_times.powers = powers
+
+    return flight_times.powers[:, : max_exponent + 1]
+
+
+def select_flight_times(
+    dataset: DataSet,
+    selected_dataset: DataSet,
+    mask: np.ndarray,
+) -> None:
+    """
+    Fills the cache of a dataset holding the rows of another dataset selected by a
+    mask, e.g. its active datapoints, with the selected rows of the cached flight
+    times and their powers, so they do not have to be recalculated.
+
+    Args:
+        dataset (DataSet): The dataset the rows were selected from
+        selected_dataset (DataSet): The dataset holding the selected rows
+        mask (ndarray): The boolean mask the rows were selected with
+    """
+    flight_times = _get_flight_times(dataset)
+    selected_columns = selected_dataset.get_datapoints().columns
+    key = (
+        selected_columns.get_revision(DatapointField.DISTANCE),
+        selected_columns.size,
+        selected_dataset.get_relative_velocity().value.get_velocity(),
     )
+
+    times = flight_times.times[mask]
+    times.flags.writeable = False
+    selected_flight_times = _FlightTimes(key, times)
+    if flight_times.powers is not None:
+        powers = flight_times.powers[mask]
+        powers.flags.writeable = False
+        selected_flight_times.powers = powers
+
+    _flight_times_cache[selected_columns] = selected_flight_times
@@ -16,7 +16,7 @@ from napytau.gui.components.menu_bar import MenuBar
 from napytau.gui.components.toolbar import Toolbar
 from napytau.import_export.import_export import (
     IMPORT_FORMAT_LEGACY,
-    import_napytau_format_from_file,
+    stream_napytau_format_from_file,
     import_legacy_format_from_files,
     read_legacy_setup_data_into_data_set,
     read_napytau_setup_data_into_data_set,
@@ -27,11 +27,6 @@ from napytau.import_export.model.dataset import DataSet
 from napytau.import_export.model.relative_velocity import RelativeVelocity
 from napytau.util.model.value_error_pair import ValueErrorPair
 
-# Modes: "System" (standard), "Dark", "Light"
-customtkinter.set_appearance_mode("System")
-# Themes: "blue" (standard), "green", "dark-blue"
-customtkinter.set_default_color_theme("blue")
-
 
 class App(customtkinter.CTk):
     def __init__(self) -> None:
@@ -143,7 +138,7 @@ class App(customtkinter.CTk):
             )
 
             if file_path:
-                self.dataset = import_napytau_format_from_file(PurePath(file_path))
+                self.dataset = stream_napytau_format_from_file(PurePath(file_path))
                 self.logger.log_message(
                     f"chosen directory: {file_path}", LogMessageType.INFO
                 )
@@ -299,5 +294,12 @@ class App(customtkinter.CTk):
 
 
 def init(cli_arguments: CLIArguments) -> None:
+    # The appearance is configured when the GUI starts instead of when this module
+    # is imported, so importing it has no global side effects
+    # Modes: "System" (standard), "Dark", "Light"
+    customtkinter.set_appearance_mode("System")
+    # Themes: "blue" (standard), "green", "dark-blue"
+    customtkinter.set_default_color_theme("blue")
+
     app = App()
     app.mainloop()
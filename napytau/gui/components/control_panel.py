@@ -1,17 +1,24 @@
 import customtkinter
-from typing import TYPE_CHECKING
+import numpy as np
+from typing import TYPE_CHECKING, Optional
 
+from napytau.gui.model.lifetime_lookup_table import LifetimeLookupTable
 from napytau.gui.model.log_message_type import LogMessageType
 
 from napytau.core.core import (
     calculate_optimal_tau_factor,
     calculate_lifetime_for_custom_tau_factor,
 )
+from napytau.core.result_cache import ResultCache
 from napytau.util.coalesce import coalesce
 
 if TYPE_CHECKING:
     from napytau.gui.app import App  # Import only for the type checking.
 
+# Number of positions of the timescale slider, the lifetimes for all of them are
+# precomputed in one batch
+TIMESCALE_SLIDER_STEPS = 200
+
 
 class ControlPanel(customtkinter.CTkFrame):
     def __init__(self, parent: "App"):
@@ -36,10 +43,18 @@ class ControlPanel(customtkinter.CTkFrame):
         self.timescale = customtkinter.DoubleVar(value=1.0)
 
         self.result_chi_squared = customtkinter.StringVar(value="N/A")
+        # The chi squared of the slider position, which must not overwrite the
+        # result of the minimization
+        self.result_slider_chi_squared = customtkinter.StringVar(value="N/A")
         self.result_tau = customtkinter.StringVar(value="N/A")
         self.result_tau_error = customtkinter.StringVar(value="N/A")
         self.result_absolute_tau_t = customtkinter.StringVar(value="N/A")
 
+        self._lifetime_lookup_table: Optional[LifetimeLookupTable] = None
+
+        # Repeated calculations on an unchanged dataset are answered from the cache
+        self._result_cache = ResultCache()
+
         self._create_widgets()
 
     def _create_widgets(self) -> None:
@@ -89,6 +104,8 @@ class ControlPanel(customtkinter.CTkFrame):
                         self.parent.datasets[0],
                         value,
                         int(self.parent.menu_bar.number_of_polynomials.get()),
+                        self._result_cache,
+                        self._get_active_mask(),
                     )
 
                     self.result_tau.set(str(lifetime[0]))
@@ -112,14 +129,14 @@ class ControlPanel(customtkinter.CTkFrame):
         def sync_slider(value: float) -> None:
             if self._check_dataset_set():
                 tau_factor.set(f"{value:.2f}")
-                lifetime = calculate_lifetime_for_custom_tau_factor(
-                    coalesce(self.parent.dataset[0]),
-                    value,
-                    int(self.parent.menu_bar.number_of_polynomials.get()),
+                lookup_table = self._get_lifetime_lookup_table(
+                    timescale_min, timescale_max
                 )
+                tau, tau_error, chi_squared = lookup_table.lookup(value)
 
-                self.result_tau.set(str(lifetime[0]))
-                self.result_tau_error.set(str(lifetime[1]))
+                self.result_tau.set(str(tau))
+                self.result_tau_error.set(str(tau_error))
+                self.result_slider_chi_squared.set(str(chi_squared))
 
         update_timescale_button = customtkinter.CTkButton(
             frame,
@@ -161,6 +178,7 @@ class ControlPanel(customtkinter.CTkFrame):
             frame,
             from_=timescale_min,
             to=timescale_max,
+            number_of_steps=TIMESCALE_SLIDER_STEPS,
             variable=self.timescale,
             command=sync_slider,
         )
@@ -171,11 +189,58 @@ class ControlPanel(customtkinter.CTkFrame):
         entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
         slider.grid(row=1, column=0, columnspan=4, padx=5, pady=5, sticky="ew")
 
+        slider_chi_squared_label = customtkinter.CTkLabel(frame, text="χ²(t):")
+        slider_chi_squared_label.grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        slider_chi_squared = customtkinter.CTkEntry(
+            frame,
+            textvariable=self.result_slider_chi_squared,
+            state="readonly",
+            justify="right",
+            width=0,
+        )
+        slider_chi_squared.grid(
+            row=2, column=1, columnspan=3, padx=5, pady=5, sticky="ew"
+        )
+
         frame.columnconfigure(0, weight=1)
         frame.columnconfigure(1, weight=1)
 
         return frame
 
+    def _get_lifetime_lookup_table(
+        self, timescale_min: float, timescale_max: float
+    ) -> LifetimeLookupTable:
+        """
+        Returns the lifetimes for all positions of the timescale slider. They are
+        recalculated if the dataset or the polynomial degree changed.
+        """
+        dataset = coalesce(self.parent.dataset[0])
+        polynomial_degree = int(self.parent.menu_bar.number_of_polynomials.get())
+        active_mask = self._get_active_mask()
+
+        if (
+            self._lifetime_lookup_table is None
+            or not self._lifetime_lookup_table.is_valid_for(
+                dataset, polynomial_degree, active_mask
+            )
+        ):
+            self._lifetime_lookup_table = LifetimeLookupTable(
+                dataset,
+                polynomial_degree,
+                np.linspace(timescale_min, timescale_max, TIMESCALE_SLIDER_STEPS + 1),
+                active_mask,
+            )
+
+        return self._lifetime_lookup_table
+
+    def _get_active_mask(self) -> np.ndarray:
+        """
+        Returns the mask of the datapoints checked for the calculation. The
+        checkboxes toggle the active flags of the datapoints of the dataset, so the
+        mask is read from there without creating a filtered copy of the datapoints.
+        """
+        return coalesce(self.parent.dataset[0]).get_datapoints().get_active_mask()
+
     def _create_chi_squared_widget(self) -> customtkinter.CTkFrame:
         """
         Create the chi squared widget.
@@ -310,6 +375,8 @@ class ControlPanel(customtkinter.CTkFrame):
                     (5, 100),
                     1.0,
                     int(self.parent.menu_bar.number_of_polynomials.get()),
+                    self._result_cache,
+                    self._get_active_mask(),
                 )
             )
 
@@ -4,14 +4,16 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from matplotlib.axes import Axes
 import customtkinter
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import numpy as np
 
+from napytau.core.incremental_fit import IncrementalPolynomialFit
 from napytau.gui.components.toolbar import Toolbar
 from napytau.gui.model.color import Color
 from napytau.gui.model.marker_factory import generate_marker
 from napytau.gui.model.marker_factory import generate_error_marker_path
 
+from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
 
 
@@ -22,6 +24,10 @@ if TYPE_CHECKING:
 class Graph:
     def __init__(self, parent: "App") -> None:
         self.parent = parent
+        self._intensity_fits: Optional[
+            Tuple[IncrementalPolynomialFit, IncrementalPolynomialFit]
+        ] = None
+        self._intensity_fits_state: Tuple[int, int, bytes, int] = (0, 0, b"", 0)
         self.graph_frame = self.plot(customtkinter.get_appearance_mode())
         self.graph_frame.grid(
             row=1, column=0, rowspan=2, padx=(10, 10), pady=(10, 0), sticky="nsew"
@@ -58,7 +64,7 @@ class Graph:
         # draw the markers on the axes
         self.plot_markers(self.parent.datapoints_for_fitting, axes_1)
 
-        if len(self.parent.datapoints_for_fitting.get_active_datapoints()) > 0:
+        if self.parent.datapoints_for_fitting.get_active_mask().any():
             # draw the fitting curve
             self.plot_fitting_curve(self.parent.datapoints_for_fitting, axes_1)
             self.plot_derivative_curve(self.parent.datapoints_for_fitting, axes_1)
@@ -120,8 +126,12 @@ class Graph:
         :param axes: the axes on which to draw the markers
         :return: nothing
         """
-        # Extracting distance values / intensities of checked datapoints
-        checked_datapoints: DatapointCollection = datapoints.get_active_datapoints()
+        # Only the checked datapoints are plotted, without creating a filtered copy
+        checked_datapoints: List[Datapoint] = [
+            datapoint
+            for datapoint, active in zip(datapoints, datapoints.get_active_mask())
+            if active
+        ]
 
         index: int = 0
         for datapoint in checked_datapoints:
@@ -167,30 +177,16 @@ class Graph:
         :return: nothing
         """
 
-        # Extracting distance values / intensities of checked datapoints
-        checked_datapoints: DatapointCollection = datapoints.get_active_datapoints()
-
-        checked_distances: list[float] = [
-            valueErrorPair.value
-            for valueErrorPair in checked_datapoints.get_distances()
+        # Extracting distance values of checked datapoints
+        checked_distances = datapoints.get_distances().get_values()[
+            datapoints.get_active_mask()
         ]
 
-        checked_shifted_intensities: list[float] = [
-            valueErrorPair.value
-            for valueErrorPair in checked_datapoints.get_shifted_intensities()
-        ]
-
-        # Calculating coefficients
-        coeffs = np.polyfit(
-            checked_distances,
-            checked_shifted_intensities,
-            int(self.parent.menu_bar.number_of_polynomials.get()),
-        )
-
-        poly = np.poly1d(coeffs)  # Creating polynomial with given coefficients
+        # The fit is only updated for the datapoints toggled since the last plot
+        shifted_intensity_fit = self._get_intensity_fits(datapoints)[0]
 
         x_fit = np.linspace(min(checked_distances), max(checked_distances), 100)
-        y_fit = poly(x_fit)
+        y_fit = shifted_intensity_fit.evaluate(x_fit)
 
         # plot the curve
         axes.plot(x_fit, y_fit, color="red", linestyle="--", linewidth="0.6")
@@ -206,26 +202,50 @@ class Graph:
         :return: nothing
         """
 
-        # Extracting distance values / intensities of checked datapoints
-        checked_datapoints: DatapointCollection = datapoints.get_active_datapoints()
-
-        checked_distances = checked_datapoints.get_distances().get_values()
-
-        checked_unshifted_intensities = (
-            checked_datapoints.get_unshifted_intensities().get_values()
-        )
-
-        # Calculating coefficients
-        coeffs = np.polyfit(
-            checked_distances,
-            checked_unshifted_intensities,
-            int(self.parent.menu_bar.number_of_polynomials.get()),
-        )
+        # Extracting distance values of checked datapoints
+        checked_distances = datapoints.get_distances().get_values()[
+            datapoints.get_active_mask()
+        ]
 
-        poly = np.poly1d(coeffs)  # Creating polynomial with given coefficients
+        # The fit is only updated for the datapoints toggled since the last plot
+        unshifted_intensity_fit = self._get_intensity_fits(datapoints)[1]
 
         x_fit = np.linspace(min(checked_distances), max(checked_distances), 100)
-        y_fit = poly(x_fit)
+        y_fit = unshifted_intensity_fit.evaluate(x_fit)
 
         # plot the curve
         axes.plot(x_fit, y_fit, color="blue", linestyle="-", linewidth="0.6")
+
+    def _get_intensity_fits(
+        self, datapoints: DatapointCollection
+    ) -> Tuple[IncrementalPolynomialFit, IncrementalPolynomialFit]:
+        """
+        Returns the fits of the shifted and unshifted intensities over the
+        distances of the checked datapoints. The fits are only recreated if the
+        datapoints or the polynomial degree changed, toggling a checkbox only
+        updates them for the toggled datapoint.
+        """
+        degree = int(self.parent.menu_bar.number_of_polynomials.get())
+        columns = datapoints.columns
+        state = (id(columns), columns.size, columns.revisions.tobytes(), degree)
+
+        if self._intensity_fits is None or self._intensity_fits_state != state:
+            distances = datapoints.get_distances().get_values()
+            self._intensity_fits = (
+                IncrementalPolynomialFit(
+                    distances,
+                    datapoints.get_shifted_intensities().get_values(),
+                    degree,
+                ),
+                IncrementalPolynomialFit(
+                    distances,
+                    datapoints.get_unshifted_intensities().get_values(),
+                    degree,
+                ),
+            )
+            self._intensity_fits_state = state
+
+        for intensity_fit in self._intensity_fits:
+            intensity_fit.set_active_mask(datapoints.get_active_mask())
+
+        return self._intensity_fits
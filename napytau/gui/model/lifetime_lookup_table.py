@@ -0,0 +1,92 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from napytau.core.core import calculate_lifetimes_for_tau_factors
+from napytau.import_export.model.dataset import DataSet
+
+
+class LifetimeLookupTable:
+    """
+    Precomputed lifetimes, uncertainties and chi-squared values for a grid of tau
+    factors, e.g. the positions of the timescale slider. The table is calculated
+    in one batched call and is only valid as long as the dataset, the polynomial
+    degree and the active mask it was calculated for do not change.
+    """
+
+    tau_factors: np.ndarray
+    taus: np.ndarray
+    delta_taus: np.ndarray
+    chi_squared_values: np.ndarray
+
+    def __init__(
+        self,
+        dataset: DataSet,
+        polynomial_degree: int,
+        tau_factors: np.ndarray,
+        active_mask: Optional[np.ndarray] = None,
+    ):
+        self.tau_factors = np.sort(np.asarray(tau_factors, dtype=float))
+        self._polynomial_degree = polynomial_degree
+        self._dataset = dataset
+        self._dataset_state = _get_dataset_state(dataset)
+        self._active_mask_state = _get_active_mask_state(active_mask)
+        self.taus, self.delta_taus, self.chi_squared_values = (
+            calculate_lifetimes_for_tau_factors(
+                dataset, self.tau_factors, polynomial_degree, active_mask=active_mask
+            )
+        )
+
+    def is_valid_for(
+        self,
+        dataset: DataSet,
+        polynomial_degree: int,
+        active_mask: Optional[np.ndarray] = None,
+    ) -> bool:
+        """
+        Checks if the table was calculated for the given dataset in its current
+        state, the given polynomial degree and the given active mask.
+        """
+        return (
+            dataset is self._dataset
+            and polynomial_degree == self._polynomial_degree
+            and _get_dataset_state(dataset) == self._dataset_state
+            and _get_active_mask_state(active_mask) == self._active_mask_state
+        )
+
+    def lookup(self, tau_factor: float) -> Tuple[float, float, float]:
+        """
+        Returns the lifetime, its uncertainty and the chi-squared value for the tau
+        factor of the table closest to the given one.
+        """
+        index = int(np.searchsorted(self.tau_factors, tau_factor))
+        if index == len(self.tau_factors) or (
+            index > 0
+            and tau_factor - self.tau_factors[index - 1]
+            < self.tau_factors[index] - tau_factor
+        ):
+            index -= 1
+
+        return (
+            float(self.taus[index]),
+            float(self.delta_taus[index]),
+            float(self.chi_squared_values[index]),
+        )
+
+
+def _get_dataset_state(dataset: DataSet) -> Tuple[int, int, bytes, float]:
+    columns = dataset.get_datapoints().columns
+
+    return (
+        id(columns),
+        columns.size,
+        columns.revisions.tobytes(),
+        dataset.get_relative_velocity().value.get_velocity(),
+    )
+
+
+def _get_active_mask_state(active_mask: Optional[np.ndarray]) -> Optional[bytes]:
+    if active_mask is None:
+        return None
+
+    return np.asarray(active_mask, dtype=bool).tobytes()
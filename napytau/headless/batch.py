@@ -0,0 +1,386 @@
+from concurrent.futures import ProcessPoolExecutor
+from csv import writer as csv_writer
+from functools import lru_cache
+from io import StringIO
+from os.path import isdir, isfile
+from pathlib import PurePath
+from re import compile as compile_regex
+from re import escape as escape_regex
+from typing import Iterable, List, Optional
+
+from napytau.core.core import (
+    calculate_lifetime_for_custom_tau_factor,
+    calculate_lifetime_for_fit,
+    calculate_optimal_tau_factor,
+)
+from napytau.core.polynomials import FIT_MODE_UNWEIGHTED
+from napytau.core.result_cache import ResultCache
+from napytau.import_export.crawler.file_crawler import FileCrawler
+from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+    VALIDATION_MODE_FULL,
+)
+from napytau.import_export.import_export import (
+    IMPORT_FORMAT_BINARY,
+    IMPORT_FORMAT_LEGACY,
+    IMPORT_FORMAT_NAPYTAU,
+    find_legacy_setup_directories,
+    import_binary_format_from_file,
+    import_legacy_format_from_files,
+    stream_napytau_format_from_file,
+    read_legacy_setup_data_into_data_set,
+    read_napytau_setup_data_into_data_set,
+)
+from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.reader.file_reader import FileReader
+from napytau.import_export.writer.file_writer import FileWriter
+
+POLYNOMIAL_DEGREE = 2
+TAU_FACTOR_RANGE = (0.1, 1.0)
+WEIGHT_FACTOR = 1.0
+
+NAPYTAU_FILE_SUFFIX = ".json"
+BINARY_FILE_SUFFIX = ".napybin"
+MANIFEST_COMMENT_PREFIX = "#"
+MANIFEST_COLUMN_SEPARATOR = "\t"
+
+RESULT_TABLE_COLUMNS = [
+    "path",
+    "format",
+    "setup",
+    "tau_fit",
+    "tau_fit_error",
+    "tau_factor",
+    "tau_custom",
+    "tau_custom_error",
+    "error",
+]
+
+
+class BatchJob:
+    """
+    A single dataset to be processed in batch mode, either a legacy setup directory,
+    a NaPyTau format file or a binary format file, optionally together with a setup
+    identifier.
+    """
+
+    path: PurePath
+    dataset_format: str
+    setup_identifier: Optional[str]
+
+    def __init__(
+        self,
+        path: PurePath,
+        dataset_format: str,
+        setup_identifier: Optional[str] = None,
+    ):
+        self.path = path
+        self.dataset_format = dataset_format
+        self.setup_identifier = setup_identifier
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BatchJob):
+            return False
+
+        return (
+            self.path == other.path
+            and self.dataset_format == other.dataset_format
+            and self.setup_identifier == other.setup_identifier
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchJob(path={self.path}, dataset_format={self.dataset_format}, "
+            f"setup_identifier={self.setup_identifier})"
+        )
+
+
+class BatchResult:
+    """
+    The lifetimes calculated for a batch job. If the job failed, the error message
+    is set and the lifetimes are None.
+    """
+
+    job: BatchJob
+    tau_fit: Optional[float]
+    tau_fit_error: Optional[float]
+    tau_factor: Optional[float]
+    tau_custom: Optional[float]
+    tau_custom_error: Optional[float]
+    error: Optional[str]
+
+    def __init__(
+        self,
+        job: BatchJob,
+        tau_fit: Optional[float] = None,
+        tau_fit_error: Optional[float] = None,
+        tau_factor: Optional[float] = None,
+        tau_custom: Optional[float] = None,
+        tau_custom_error: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        self.job = job
+        self.tau_fit = tau_fit
+        self.tau_fit_error = tau_fit_error
+        self.tau_factor = tau_factor
+        self.tau_custom = tau_custom
+        self.tau_custom_error = tau_custom_error
+        self.error = error
+
+    def is_successful(self) -> bool:
+        return self.error is None
+
+    def to_row(self) -> List[str]:
+        return [
+            str(self.job.path),
+            self.job.dataset_format,
+            _format_optional(self.job.setup_identifier),
+            _format_optional(self.tau_fit),
+            _format_optional(self.tau_fit_error),
+            _format_optional(self.tau_factor),
+            _format_optional(self.tau_custom),
+            _format_optional(self.tau_custom_error),
+            _format_optional(self.error),
+        ]
+
+
+def collect_batch_jobs(path: PurePath) -> List[BatchJob]:
+    """
+    Collects the batch jobs for the given path. The path can either be
+    - a directory, which is searched recursively for legacy setup directories,
+    NaPyTau format files and binary format files,
+    - a NaPyTau format file or a binary format file,
+    - or a manifest file listing one directory or file per line.
+    Relative paths in a manifest are resolved against the directory of the manifest,
+    a setup identifier can be added to a line separated by a tab. Empty lines and
+    lines starting with "#" are ignored.
+    """
+    if isdir(path):
+        return _collect_batch_jobs_from_directory_tree(path)
+
+    if not isfile(path):
+        raise ImportExportError(f"Batch path {path} does not exist.")
+
+    if path.suffix == NAPYTAU_FILE_SUFFIX:
+        return [BatchJob(path, IMPORT_FORMAT_NAPYTAU)]
+
+    if path.suffix == BINARY_FILE_SUFFIX:
+        return [BatchJob(path, IMPORT_FORMAT_BINARY)]
+
+    return _collect_batch_jobs_from_manifest(path)
+
+
+def _collect_batch_jobs_from_directory_tree(directory_path: PurePath) -> List[BatchJob]:
+    jobs = [
+        BatchJob(setup_directory_path, IMPORT_FORMAT_LEGACY)
+        for setup_directory_path in find_legacy_setup_directories(directory_path)
+    ]
+
+    # A directory has to hold files for all patterns, so both suffixes share one
+    data_file_crawler: FileCrawler[List[PurePath]] = FileCrawler(
+        [
+            compile_regex(
+                f".*({escape_regex(NAPYTAU_FILE_SUFFIX)}|"
+                f"{escape_regex(BINARY_FILE_SUFFIX)})$"
+            )
+        ],
+        lambda files: files,
+    )
+    for data_file_paths in data_file_crawler.crawl_recursively(directory_path):
+        jobs.extend(
+            BatchJob(
+                data_file_path,
+                IMPORT_FORMAT_NAPYTAU
+                if data_file_path.suffix == NAPYTAU_FILE_SUFFIX
+                else IMPORT_FORMAT_BINARY,
+            )
+            for data_file_path in data_file_paths
+        )
+
+    # The directories are crawled in parallel, so the jobs are sorted to keep the
+    # result table reproducible
+    return sorted(jobs, key=lambda job: job.path)
+
+
+def _collect_batch_jobs_from_manifest(manifest_path: PurePath) -> List[BatchJob]:
+    jobs = []
+    for row in FileReader.read_rows(manifest_path):
+        row = row.rstrip("\n")
+        if row.strip() == "" or row.lstrip().startswith(MANIFEST_COMMENT_PREFIX):
+            continue
+
+        columns = row.split(MANIFEST_COLUMN_SEPARATOR)
+        path = manifest_path.parent / columns[0].strip()
+        setup_identifier = columns[1].strip() if len(columns) > 1 else None
+
+        if isdir(path):
+            jobs.append(BatchJob(path, IMPORT_FORMAT_LEGACY, setup_identifier))
+        elif path.suffix == NAPYTAU_FILE_SUFFIX:
+            jobs.append(BatchJob(path, IMPORT_FORMAT_NAPYTAU, setup_identifier))
+        elif path.suffix == BINARY_FILE_SUFFIX:
+            jobs.append(BatchJob(path, IMPORT_FORMAT_BINARY, setup_identifier))
+        else:
+            raise ImportExportError(
+                f"Manifest entry {columns[0]} is neither a directory nor a "
+                f"NaPyTau or binary format file."
+            )
+
+    return jobs
+
+
+def run_batch_job(
+    job: BatchJob,
+    t_hyp_estimate: Optional[float],
+    validation_mode: str = VALIDATION_MODE_FULL,
+    cache_directory_path: Optional[PurePath] = None,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
+) -> BatchResult:
+    """
+    Loads the dataset of a batch job and calculates its lifetimes. Errors are not
+    raised but recorded in the result, so that a single broken dataset does not
+    abort the whole batch. If a cache directory is given, results of unchanged
+    datasets are read from there instead of being recalculated. The fit mode is
+    one of polynomials.FIT_MODES.
+    """
+    try:
+        dataset = _load_dataset(job, validation_mode)
+        cache = _get_result_cache(cache_directory_path)
+
+        (tau_fit, tau_fit_error) = calculate_lifetime_for_fit(
+            dataset=dataset,
+            polynomial_degree=POLYNOMIAL_DEGREE,
+            cache=cache,
+            fit_mode=fit_mode,
+        )
+
+        if t_hyp_estimate is not None:
+            tau_factor = t_hyp_estimate
+        else:
+            tau_factor = calculate_optimal_tau_factor(
+                dataset=dataset,
+                t_hyp_range=TAU_FACTOR_RANGE,
+                weight_factor=WEIGHT_FACTOR,
+                polynomial_degree=POLYNOMIAL_DEGREE,
+                cache=cache,
+                fit_mode=fit_mode,
+            )
+
+        tau_custom, tau_custom_error = calculate_lifetime_for_custom_tau_factor(
+            dataset=dataset,
+            custom_tau_factor=tau_factor,
+            polynomial_degree=POLYNOMIAL_DEGREE,
+            cache=cache,
+        )
+    except Exception as error:
+        # Only keep the first line, as e.g. schema errors span the whole schema
+        message = next(iter(str(error).splitlines()), "")
+        return BatchResult(job, error=f"{type(error).__name__}: {message}")
+
+    return BatchResult(
+        job,
+        float(tau_fit),
+        float(tau_fit_error),
+        float(tau_factor),
+        float(tau_custom),
+        float(tau_custom_error),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_result_cache(
+    cache_directory_path: Optional[PurePath],
+) -> Optional[ResultCache]:
+    # One cache per process, so the in-memory results are shared between the jobs
+    # a worker runs
+    if cache_directory_path is None:
+        return None
+
+    return ResultCache(directory_path=cache_directory_path)
+
+
+def _load_dataset(job: BatchJob, validation_mode: str) -> DataSet:
+    if job.dataset_format == IMPORT_FORMAT_LEGACY:
+        dataset = import_legacy_format_from_files(job.path)
+        if job.setup_identifier is not None:
+            read_legacy_setup_data_into_data_set(
+                dataset, job.path / job.setup_identifier
+            )
+
+        return dataset
+
+    if job.dataset_format == IMPORT_FORMAT_NAPYTAU:
+        (dataset, raw_setups) = stream_napytau_format_from_file(
+            job.path, validation_mode
+        )
+        if job.setup_identifier is not None:
+            read_napytau_setup_data_into_data_set(
+                dataset, raw_setups, job.setup_identifier
+            )
+
+        return dataset
+
+    if job.dataset_format == IMPORT_FORMAT_BINARY:
+        (dataset, raw_setups) = import_binary_format_from_file(job.path)
+        if job.setup_identifier is not None:
+            read_napytau_setup_data_into_data_set(
+                dataset, raw_setups, job.setup_identifier
+            )
+
+        return dataset
+
+    raise ValueError(f"Unknown dataset format: {job.dataset_format}")
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    t_hyp_estimate: Optional[float] = None,
+    worker_count: Optional[int] = None,
+    validation_mode: str = VALIDATION_MODE_FULL,
+    cache_directory_path: Optional[PurePath] = None,
+    fit_mode: str = FIT_MODE_UNWEIGHTED,
+) -> List[BatchResult]:
+    """
+    Runs the batch jobs across a pool of worker processes, so that the import cost
+    of the libraries is only paid once per worker instead of once per dataset.
+    With a single worker, the jobs are run in the current process.
+    The results are returned in the order of the jobs.
+    """
+    if worker_count == 1 or len(jobs) <= 1:
+        return [
+            run_batch_job(
+                job, t_hyp_estimate, validation_mode, cache_directory_path, fit_mode
+            )
+            for job in jobs
+        ]
+
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        return list(
+            executor.map(
+                run_batch_job,
+                jobs,
+                [t_hyp_estimate] * len(jobs),
+                [validation_mode] * len(jobs),
+                [cache_directory_path] * len(jobs),
+                [fit_mode] * len(jobs),
+            )
+        )
+
+
+def create_result_table(results: Iterable[BatchResult]) -> str:
+    """
+    Creates a consolidated result table in the CSV format with one row per job.
+    """
+    table = StringIO()
+    table_writer = csv_writer(table, lineterminator="\n")
+    table_writer.writerow(RESULT_TABLE_COLUMNS)
+    table_writer.writerows(result.to_row() for result in results)
+
+    return table.getvalue()
+
+
+def write_result_table(results: Iterable[BatchResult], file_path: PurePath) -> None:
+    FileWriter.write_text(file_path, create_result_table(results))
+
+
+def _format_optional(value: Optional[object]) -> str:
+    return "" if value is None else str(value)
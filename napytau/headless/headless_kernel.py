@@ -1,4 +1,5 @@
 from pathlib import PurePath
+from typing import Optional
 
 
 from napytau.cli.cli_arguments import CLIArguments
@@ -7,19 +8,36 @@ from napytau.core.core import (
     calculate_lifetime_for_custom_tau_factor,
     calculate_optimal_tau_factor,
 )
+from napytau.core.result_cache import ResultCache
+from napytau.headless.batch import (
+    POLYNOMIAL_DEGREE,
+    TAU_FACTOR_RANGE,
+    WEIGHT_FACTOR,
+    collect_batch_jobs,
+    create_result_table,
+    run_batch,
+    write_result_table,
+)
 from napytau.headless.logging import log_dataset, log_dataset_setup_data
 from napytau.import_export.import_export import (
+    IMPORT_FORMAT_BINARY,
     IMPORT_FORMAT_LEGACY,
     IMPORT_FORMAT_NAPYTAU,
     import_legacy_format_from_files,
     read_legacy_setup_data_into_data_set,
-    import_napytau_format_from_file,
+    import_binary_format_from_file,
+    stream_napytau_format_from_file,
     read_napytau_setup_data_into_data_set,
 )
 from napytau.import_export.model.dataset import DataSet
 
 
 def init(cli_arguments: CLIArguments) -> None:
+    batch_path = cli_arguments.get_batch_path()
+    if batch_path is not None:
+        init_batch(cli_arguments, batch_path)
+        return
+
     if cli_arguments.get_dataset_format() == IMPORT_FORMAT_LEGACY:
         setup_files_directory_path = cli_arguments.get_data_files_directory_path()
 
@@ -41,8 +59,22 @@ def init(cli_arguments: CLIArguments) -> None:
         setup_files_directory_path = cli_arguments.get_data_files_directory_path()
         setup_identifier = cli_arguments.get_setup_identifier()
 
-        (dataset, raw_setups) = import_napytau_format_from_file(
-            PurePath(setup_files_directory_path)
+        (dataset, raw_setups) = stream_napytau_format_from_file(
+            PurePath(setup_files_directory_path),
+            cli_arguments.get_validation_mode(),
+        )
+
+        log_dataset(dataset)
+
+        if setup_identifier is not None:
+            read_napytau_setup_data_into_data_set(dataset, raw_setups, setup_identifier)
+            log_dataset_setup_data(dataset)
+
+    elif cli_arguments.get_dataset_format() == IMPORT_FORMAT_BINARY:
+        setup_identifier = cli_arguments.get_setup_identifier()
+
+        (dataset, raw_setups) = import_binary_format_from_file(
+            PurePath(cli_arguments.get_data_files_directory_path())
         )
 
         log_dataset(dataset)
@@ -55,9 +87,13 @@ def init(cli_arguments: CLIArguments) -> None:
             f"Unknown dataset format: {cli_arguments.get_dataset_format()}"
         )
 
+    cache = _create_result_cache(cli_arguments)
+
     (tau_fit, tau_fit_error) = calculate_lifetime_for_fit(
         dataset=dataset,
-        polynomial_degree=2,
+        polynomial_degree=POLYNOMIAL_DEGREE,
+        cache=cache,
+        fit_mode=cli_arguments.get_fit_mode(),
     )
     print(f"Calculated lifetime: {tau_fit} ± {tau_fit_error}")
 
@@ -67,22 +103,67 @@ def init(cli_arguments: CLIArguments) -> None:
         tau_custom, tau_custom_error = calculate_lifetime_for_custom_tau_factor(
             dataset=dataset,
             custom_tau_factor=t_hyp_estimate,
-            polynomial_degree=2,
+            polynomial_degree=POLYNOMIAL_DEGREE,
+            cache=cache,
         )
     else:
         t_hyp = calculate_optimal_tau_factor(
             dataset=dataset,
-            t_hyp_range=(0.1, 1.0),
-            weight_factor=1.0,
-            polynomial_degree=2,
+            t_hyp_range=TAU_FACTOR_RANGE,
+            weight_factor=WEIGHT_FACTOR,
+            polynomial_degree=POLYNOMIAL_DEGREE,
+            cache=cache,
+            fit_mode=cli_arguments.get_fit_mode(),
         )
         print(f"Tau factor: {t_hyp}")
 
         tau_custom, tau_custom_error = calculate_lifetime_for_custom_tau_factor(
             dataset=dataset,
             custom_tau_factor=t_hyp,
-            polynomial_degree=2,
+            polynomial_degree=POLYNOMIAL_DEGREE,
+            cache=cache,
         )
     print(
         f"Calculated lifetime with custom tau factor: {tau_custom} ± {tau_custom_error}"
     )
+
+
+def init_batch(cli_arguments: CLIArguments, batch_path: str) -> None:
+    jobs = collect_batch_jobs(PurePath(batch_path))
+    print(f"Processing {len(jobs)} datasets")
+
+    results = run_batch(
+        jobs,
+        cli_arguments.get_t_hyp_estimate(),
+        cli_arguments.get_batch_worker_count(),
+        cli_arguments.get_validation_mode(),
+        _get_cache_directory_path(cli_arguments),
+        cli_arguments.get_fit_mode(),
+    )
+
+    failed_results = [result for result in results if not result.is_successful()]
+    for result in failed_results:
+        print(f"Failed to process {result.job.path}: {result.error}")
+
+    output_file_path = cli_arguments.get_batch_output_file_path()
+    if output_file_path is not None:
+        write_result_table(results, PurePath(output_file_path))
+        print(f"Results written to: {output_file_path}")
+    else:
+        print(create_result_table(results), end="")
+
+    print(f"Processed {len(results) - len(failed_results)} of {len(results)} datasets")
+
+
+def _create_result_cache(cli_arguments: CLIArguments) -> Optional[ResultCache]:
+    cache_directory_path = _get_cache_directory_path(cli_arguments)
+    if cache_directory_path is None:
+        return None
+
+    return ResultCache(directory_path=cache_directory_path)
+
+
+def _get_cache_directory_path(cli_arguments: CLIArguments) -> Optional[PurePath]:
+    cache_directory = cli_arguments.get_cache_directory_path()
+
+    return PurePath(cache_directory) if cache_directory is not None else None
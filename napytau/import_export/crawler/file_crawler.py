@@ -1,7 +1,8 @@
-from os import walk
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from os import scandir, walk
 from os.path import isdir
 from pathlib import PurePath
-from typing import List, Callable
+from typing import Iterator, List, Callable, Optional, Set, Tuple
 from re import match as regex_match
 from re import Pattern
 
@@ -61,3 +62,64 @@ class FileCrawler[T]:
             )
 
         return crawled_files
+
+    def crawl_recursively(
+        self, directory_path: PurePath, worker_count: Optional[int] = None
+    ) -> Iterator[T]:
+        """
+        Crawls the whole directory tree below the base directory and yields the
+        return type for every directory containing files matching all file name
+        patterns. The directories are scanned in parallel by a pool of threads,
+        which hides the latency of network file systems, and results are yielded
+        as soon as their directory has been scanned, so the order is not fixed.
+        Directories which can not be read are skipped, just like os.walk does.
+        """
+        if not isdir(directory_path):
+            raise ValueError(f"Directory path {directory_path} is not a directory.")
+
+        executor = ThreadPoolExecutor(max_workers=worker_count)
+        try:
+            pending_scans: Set[Future[Tuple[List[PurePath], List[PurePath]]]] = {
+                executor.submit(self._scan_directory, directory_path)
+            }
+            while len(pending_scans) > 0:
+                finished_scans, pending_scans = wait(
+                    pending_scans, return_when=FIRST_COMPLETED
+                )
+                for finished_scan in finished_scans:
+                    subdirectory_paths, crawled_files = finished_scan.result()
+                    pending_scans.update(
+                        executor.submit(self._scan_directory, subdirectory_path)
+                        for subdirectory_path in subdirectory_paths
+                    )
+                    if self._matches_all_file_name_patterns(crawled_files):
+                        yield self.return_type_factory(crawled_files)
+        finally:
+            # Scans still queued when the consumer stops early are not needed anymore
+            executor.shutdown(cancel_futures=True)
+
+    def _scan_directory(
+        self, directory_path: PurePath
+    ) -> Tuple[List[PurePath], List[PurePath]]:
+        subdirectory_paths = []
+        crawled_files = []
+        try:
+            with scandir(directory_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectory_paths.append(PurePath(entry.path))
+                    elif any(
+                        regex_match(file_name_pattern, entry.name)
+                        for file_name_pattern in self.file_name_patterns
+                    ):
+                        crawled_files.append(PurePath(entry.path))
+        except OSError:
+            return [], []
+
+        return subdirectory_paths, sorted(crawled_files)
+
+    def _matches_all_file_name_patterns(self, crawled_files: List[PurePath]) -> bool:
+        return all(
+            any(regex_match(file_name_pattern, file.name) for file in crawled_files)
+            for file_name_pattern in self.file_name_patterns
+        )
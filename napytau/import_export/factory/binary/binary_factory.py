@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.polynomial import Polynomial
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+BINARY_FORMAT_FIELDS = [field.name for field in DatapointField]
+"""The datapoint fields in the order of the rows of the stored arrays."""
+
+
+class BinaryFactory:
+    """
+    A factory class for converting datasets from and to the metadata and arrays of
+    the binary format. The datapoint columns are stored as they are, so a dataset
+    can be created on top of memory-mapped arrays without copying them.
+    """
+
+    @staticmethod
+    def create_dataset(metadata: dict, arrays: Dict[str, np.ndarray]) -> DataSet:
+        if metadata.get("fields") != BINARY_FORMAT_FIELDS:
+            raise ImportExportError(
+                f"The datapoint fields {metadata.get('fields')} of the binary data do "
+                f"not match the expected fields {BINARY_FORMAT_FIELDS}."
+            )
+
+        try:
+            columns = DatapointColumns.wrap_arrays(
+                arrays["values"],
+                arrays["errors"],
+                arrays["present"],
+                arrays["active"],
+            )
+            dataset = DataSet(
+                ValueErrorPair(
+                    RelativeVelocity(metadata["relativeVelocity"]),
+                    RelativeVelocity(metadata["relativeVelocityError"]),
+                ),
+                DatapointCollection.from_columns(columns),
+            )
+        except (KeyError, ValueError) as e:
+            raise ImportExportError(
+                f"The binary data does not contain a valid dataset: {e}"
+            ) from e
+
+        if metadata.get("tauFactor") is not None:
+            dataset.set_tau_factor(metadata["tauFactor"])
+
+        if metadata.get("weightedMeanTau") is not None:
+            dataset.set_weighted_mean_tau(
+                ValueErrorPair(
+                    metadata["weightedMeanTau"], metadata["weightedMeanTauError"]
+                )
+            )
+
+        if metadata.get("samplingPoints") is not None:
+            dataset.set_sampling_points(metadata["samplingPoints"])
+
+        if metadata.get("polynomialCount") is not None:
+            dataset.set_polynomial_count(metadata["polynomialCount"])
+
+        if metadata.get("polynomials") is not None:
+            dataset.set_polynomials(
+                [Polynomial(coefficients) for coefficients in metadata["polynomials"]]
+            )
+
+        return dataset
+
+    @staticmethod
+    def create_metadata_and_arrays(
+        dataset: DataSet, raw_setups: Optional[List[dict]] = None
+    ) -> Tuple[dict, Dict[str, np.ndarray]]:
+        """
+        Creates the metadata and arrays of the binary format for the dataset.
+        The raw setups, e.g. those imported with a NapyTau format file, are stored
+        along with the dataset.
+        """
+        columns = dataset.get_datapoints().columns
+        weighted_mean_tau = dataset.get_weighted_mean_tau()
+        polynomials = dataset.get_polynomials()
+
+        metadata = {
+            "fields": BINARY_FORMAT_FIELDS,
+            "relativeVelocity": dataset.get_relative_velocity().value.get_velocity(),
+            "relativeVelocityError": (
+                dataset.get_relative_velocity().error.get_velocity()
+            ),
+            "tauFactor": dataset.get_tau_factor(),
+            "weightedMeanTau": (
+                weighted_mean_tau.value if weighted_mean_tau is not None else None
+            ),
+            "weightedMeanTauError": (
+                weighted_mean_tau.error if weighted_mean_tau is not None else None
+            ),
+            "samplingPoints": dataset.get_sampling_points(),
+            "polynomialCount": dataset.get_polynomial_count(),
+            "polynomials": (
+                [list(polynomial.coefficients) for polynomial in polynomials]
+                if polynomials is not None
+                else None
+            ),
+            "setups": raw_setups if raw_setups is not None else [],
+        }
+        arrays = {
+            "values": columns.values[:, : columns.size],
+            "errors": columns.errors[:, : columns.size],
+            "present": columns.present[:, : columns.size],
+            "active": columns.active[: columns.size],
+        }
+
+        return metadata, arrays
@@ -0,0 +1,114 @@
+import json
+import struct
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from napytau.import_export.import_export_error import ImportExportError
+
+BINARY_FORMAT_MAGIC = b"NAPYTAUB"
+BINARY_FORMAT_VERSION = 1
+BINARY_FORMAT_ALIGNMENT = 64
+"""The arrays start at multiples of the alignment, relative to the data section."""
+
+# Magic, version and length of the json header, all little endian
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class BinaryFormatService:
+    """
+    Converts between the binary format and its metadata and arrays. A file in the
+    binary format consists of
+    - a preamble with the magic bytes, the format version and the header length,
+    - a json header with the metadata and the dtype, shape and offset of every
+      array,
+    - and the data section with the raw little endian arrays, each aligned to
+      BINARY_FORMAT_ALIGNMENT bytes.
+    The arrays can therefore be read straight from a memory-mapped file.
+    """
+
+    @staticmethod
+    def create_binary_data(
+        metadata: dict, arrays: Dict[str, np.ndarray]
+    ) -> Iterator[bytes]:
+        """
+        Yields the binary data of the metadata and arrays chunk by chunk, so the
+        arrays are not copied into one large buffer.
+        """
+        array_descriptions = {}
+        contiguous_arrays = []
+        offset = 0
+        for name, array in arrays.items():
+            contiguous_array = np.ascontiguousarray(
+                array, dtype=array.dtype.newbyteorder("<")
+            )
+            array_descriptions[name] = {
+                "dtype": contiguous_array.dtype.str,
+                "shape": list(contiguous_array.shape),
+                "offset": offset,
+            }
+            contiguous_arrays.append(contiguous_array)
+            offset += _align(contiguous_array.nbytes)
+
+        header = json.dumps(
+            {"metadata": metadata, "arrays": array_descriptions},
+            separators=(",", ":"),
+        ).encode()
+
+        yield _PREAMBLE.pack(BINARY_FORMAT_MAGIC, BINARY_FORMAT_VERSION, len(header))
+        yield header
+        yield _padding(_PREAMBLE.size + len(header))
+        for contiguous_array in contiguous_arrays:
+            yield contiguous_array.tobytes()
+            yield _padding(contiguous_array.nbytes)
+
+    @staticmethod
+    def parse_binary_data(
+        buffer: memoryview,
+    ) -> Tuple[dict, Dict[str, np.ndarray]]:
+        """
+        Parses the metadata and arrays from the binary data. The arrays are views
+        on the buffer, no data is copied.
+        """
+        if len(buffer) < _PREAMBLE.size:
+            raise ImportExportError("Provided binary data is too short.")
+
+        (magic, version, header_length) = _PREAMBLE.unpack_from(buffer)
+        if magic != BINARY_FORMAT_MAGIC:
+            raise ImportExportError("Provided binary data is not in the binary format.")
+
+        if version != BINARY_FORMAT_VERSION:
+            raise ImportExportError(
+                f"Provided binary data has the unsupported version {version}."
+            )
+
+        try:
+            header = json.loads(
+                bytes(buffer[_PREAMBLE.size : _PREAMBLE.size + header_length])
+            )
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ImportExportError(f"Provided binary header could not be parsed: {e}")
+
+        data_offset = _align(_PREAMBLE.size + header_length)
+        arrays = {}
+        for name, description in header["arrays"].items():
+            dtype = np.dtype(description["dtype"])
+            shape = tuple(description["shape"])
+            count = int(np.prod(shape))
+            offset = data_offset + description["offset"]
+            if offset + count * dtype.itemsize > len(buffer):
+                raise ImportExportError(f"Provided binary data is truncated in {name}.")
+
+            arrays[name] = np.frombuffer(
+                buffer, dtype=dtype, count=count, offset=offset
+            ).reshape(shape)
+
+        return header["metadata"], arrays
+
+
+def _align(size: int) -> int:
+    return -(-size // BINARY_FORMAT_ALIGNMENT) * BINARY_FORMAT_ALIGNMENT
+
+
+def _padding(size: int) -> bytes:
+    return bytes(_align(size) - size)
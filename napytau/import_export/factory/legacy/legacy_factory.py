@@ -1,4 +1,7 @@
-from typing import List, Optional, Tuple
+import warnings
+from typing import Iterable, List, Tuple
+
+import numpy as np
 
 from napytau.import_export.factory.legacy.raw_legacy_data import RawLegacyData
 
@@ -6,13 +9,23 @@ from napytau.import_export.factory.legacy.raw_legacy_setup_data import (
     RawLegacySetupData,
 )
 from napytau.import_export.import_export_error import ImportExportError
-from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+    find_rows_of_unique_distances,
+)
 from napytau.import_export.model.dataset import DataSet
 from napytau.import_export.model.relative_velocity import RelativeVelocity
 from napytau.util.model.ValueErrorPairCollection import ValueErrorPairCollection
 from napytau.util.model.value_error_pair import ValueErrorPair
 
+LEGACY_COMMENT_PREFIX = "#"
+
+DISTANCE_ROW_COLUMN_COUNTS = [3]
+CALIBRATION_ROW_COLUMN_COUNTS = [3]
+FIT_ROW_COLUMN_COUNTS = [5, 9]
+
 
 class LegacyFactory:
     """
@@ -31,7 +44,9 @@ class LegacyFactory:
         )
 
     @staticmethod
-    def parse_velocity(velocity_rows: List[str]) -> ValueErrorPair[RelativeVelocity]:
+    def parse_velocity(
+        velocity_rows: Iterable[str],
+    ) -> ValueErrorPair[RelativeVelocity]:
         filtered_velocities = list(
             filter(lambda x: not x.startswith("#"), velocity_rows)
         )
@@ -64,135 +79,95 @@ class LegacyFactory:
 
     @staticmethod
     def parse_datapoints(
-        distance_rows: List[str],
-        calibration_rows: List[str],
-        fit_rows: List[str],
+        distance_rows: Iterable[str],
+        calibration_rows: Iterable[str],
+        fit_rows: Iterable[str],
     ) -> DatapointCollection:
-        datapoints = DatapointCollection([])
-        for distance_row in distance_rows:
-            distance = LegacyFactory.parse_distance_row(distance_row)
-            datapoints.add_datapoint(Datapoint(distance))
-        for calibration_row in calibration_rows:
-            (distance_index, calibration) = LegacyFactory.parse_calibration_row(
-                calibration_row
-            )
-            datapoint = datapoints.get_datapoint_by_distance(distance_index)
-            datapoint.set_calibration(calibration)
-        for fit_row in fit_rows:
-            (
-                distance_index,
-                shifted_intensity,
-                unshifted_intensity,
-                feeding_shifted_intensity,
-                feeding_unshifted_intensity,
-            ) = LegacyFactory.parse_fit_row(fit_row)
-            datapoint = datapoints.get_datapoint_by_distance(distance_index)
-            datapoint.set_intensity(shifted_intensity, unshifted_intensity)
-            if (
-                feeding_shifted_intensity is not None
-                and feeding_unshifted_intensity is not None
-            ):
-                datapoint.set_feeding_intensity(
-                    feeding_shifted_intensity, feeding_unshifted_intensity
-                )
+        """
+        Parses the rows of all files into arrays at once and joins the calibration
+        and fit rows with the distance rows by their distance, without creating an
+        intermediate datapoint per row. The rows are consumed once, so they can be
+        lazy iterators, e.g. from FileReader.iterate_rows.
+        """
+        (distances, distance_errors) = LegacyFactory.parse_distance_rows(distance_rows)
+        calibration_table = LegacyFactory.parse_calibration_rows(calibration_rows)
+        fit_table = LegacyFactory.parse_fit_rows(fit_rows)
+
+        # Repeated distances describe the same datapoint, the last row replaces the
+        # earlier ones like the calibration and fit rows do
+        unique_rows = find_rows_of_unique_distances(distances)
+        distances = distances[unique_rows]
+        distance_errors = distance_errors[unique_rows]
+
+        shape = (len(DatapointField), len(distances))
+        values = np.full(shape, np.nan)
+        errors = np.full(shape, np.nan)
+        present = np.zeros(shape, dtype=bool)
+
+        values[DatapointField.DISTANCE] = distances
+        errors[DatapointField.DISTANCE] = distance_errors
+        present[DatapointField.DISTANCE] = True
+
+        calibration_rows_by_distance = _find_rows_by_distance(
+            distances, calibration_table[:, 0]
+        )
+        values[DatapointField.CALIBRATION, calibration_rows_by_distance] = (
+            calibration_table[:, 1]
+        )
+        errors[DatapointField.CALIBRATION, calibration_rows_by_distance] = (
+            calibration_table[:, 2]
+        )
+        present[DatapointField.CALIBRATION, calibration_rows_by_distance] = True
+
+        fit_rows_by_distance = _find_rows_by_distance(distances, fit_table[:, 0])
+        fit_fields = [
+            DatapointField.SHIFTED_INTENSITY,
+            DatapointField.UNSHIFTED_INTENSITY,
+        ]
+        if fit_table.shape[1] == max(FIT_ROW_COLUMN_COUNTS):
+            fit_fields += [
+                DatapointField.FEEDING_SHIFTED_INTENSITY,
+                DatapointField.FEEDING_UNSHIFTED_INTENSITY,
+            ]
+        for index, field in enumerate(fit_fields):
+            values[field, fit_rows_by_distance] = fit_table[:, 2 * index + 1]
+            errors[field, fit_rows_by_distance] = fit_table[:, 2 * index + 2]
+            present[field, fit_rows_by_distance] = True
 
-        return datapoints
+        return DatapointCollection.from_columns(
+            DatapointColumns.from_arrays(values, errors, present)
+        )
 
     @staticmethod
-    def parse_distance_row(distance_row: str) -> ValueErrorPair[float]:
-        split_row = distance_row.split(" ")
-        if len(split_row) < 3:
-            raise ValueError(
-                f"Expected at least 3 values in distance row, but got {len(split_row)}"
-            )
-
-        if len(split_row) > 3:
-            raise ValueError(
-                f"Expected at most 3 values in distance row, but got {len(split_row)}"
-            )
+    def parse_distance_rows(
+        distance_rows: Iterable[str],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parses the distance rows into arrays of the distances and their errors.
+        """
+        table = _load_table(distance_rows, "distance", DISTANCE_ROW_COLUMN_COUNTS, str)
 
         # The first value (at index 0) is a label, however since we index by distance we can ignore it # noqa E501
-        distance = float(split_row[1])
-        distance_error = float(split_row[2])
-
-        return ValueErrorPair(distance, distance_error)
+        return table[:, 1].astype(float), table[:, 2].astype(float)
 
     @staticmethod
-    def parse_calibration_row(
-        calibration_row: str,
-    ) -> Tuple[float, ValueErrorPair[float]]:
-        split_row = calibration_row.split(" ")
-        if len(split_row) < 3:
-            raise ValueError(
-                f"Expected at least 3 values in calibration row, but got {len(split_row)}"  # noqa E501
-            )
-
-        if len(split_row) > 3:
-            raise ValueError(
-                f"Expected at most 3 values in calibration row, but got {len(split_row)}"  # noqa E501
-            )
-
-        distance_index = float(split_row[0])
-        calibration = float(split_row[1])
-        calibration_error = float(split_row[2])
-
-        return distance_index, ValueErrorPair(calibration, calibration_error)
+    def parse_calibration_rows(calibration_rows: Iterable[str]) -> np.ndarray:
+        """
+        Parses the calibration rows into a table with the columns distance,
+        calibration and calibration error.
+        """
+        return _load_table(
+            calibration_rows, "calibration", CALIBRATION_ROW_COLUMN_COUNTS, float
+        )
 
     @staticmethod
-    def parse_fit_row(
-        fit_row: str,
-    ) -> Tuple[
-        float,
-        ValueErrorPair[float],
-        ValueErrorPair[float],
-        Optional[ValueErrorPair[float]],
-        Optional[ValueErrorPair[float]],
-    ]:
-        split_row = fit_row.split(" ")
-        if len(split_row) < 5:
-            raise ValueError(
-                f"Expected at least 5 values in fit row, but got {len(split_row)}"
-            )
-
-        distance_index = float(split_row[0])
-        shifted_intensity = float(split_row[1])
-        shifted_intensity_error = float(split_row[2])
-        unshifted_intensity = float(split_row[3])
-        unshifted_intensity_error = float(split_row[4])
-
-        if len(split_row) == 5:
-            return (
-                distance_index,
-                ValueErrorPair(shifted_intensity, shifted_intensity_error),
-                ValueErrorPair(unshifted_intensity, unshifted_intensity_error),
-                None,
-                None,
-            )
-
-        if len(split_row) < 9:
-            raise ValueError(
-                f"Expected at least 9 values in fit row, but got {len(split_row)}"
-            )
-
-        if len(split_row) > 9:
-            raise ValueError(
-                f"Expected at most 9 values in fit row, but got {len(split_row)}"
-            )
-
-        feeding_shifted_intensity = float(split_row[5])
-        feeding_shifted_intensity_error = float(split_row[6])
-        feeding_unshifted_intensity = float(split_row[7])
-        feeding_unshifted_intensity_error = float(split_row[8])
-
-        return (
-            distance_index,
-            ValueErrorPair(shifted_intensity, shifted_intensity_error),
-            ValueErrorPair(unshifted_intensity, unshifted_intensity_error),
-            ValueErrorPair(feeding_shifted_intensity, feeding_shifted_intensity_error),
-            ValueErrorPair(
-                feeding_unshifted_intensity, feeding_unshifted_intensity_error
-            ),
-        )
+    def parse_fit_rows(fit_rows: Iterable[str]) -> np.ndarray:
+        """
+        Parses the fit rows into a table with the columns distance, shifted
+        intensity, unshifted intensity and optionally feeding shifted and feeding
+        unshifted intensity, each followed by its error.
+        """
+        return _load_table(fit_rows, "fit", FIT_ROW_COLUMN_COUNTS, float)
 
     @staticmethod
     def enrich_dataset(dataset: DataSet, raw_setup_data: RawLegacySetupData) -> DataSet:
@@ -286,3 +261,58 @@ class LegacyFactory:
             sampling_points.append(float(split_row[0]))
 
         return sampling_points
+
+
+def _load_table(
+    rows: Iterable[str], name: str, column_counts: List[int], dtype: type
+) -> np.ndarray:
+    """
+    Loads whitespace separated rows into a two-dimensional array in one call.
+    Comments and empty rows are skipped, all rows must have the same number of
+    columns, which must be one of the given column counts.
+    """
+    with warnings.catch_warnings():
+        # Files without any data rows are valid and handled below
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            table: np.ndarray = np.loadtxt(
+                rows, dtype=dtype, comments=LEGACY_COMMENT_PREFIX, ndmin=2
+            )
+        except ValueError as e:
+            raise ValueError(f"The {name} rows are not formatted correctly: {e}") from e
+
+    if table.shape[0] == 0:
+        return np.empty((0, min(column_counts)), dtype=dtype)
+
+    if table.shape[1] < min(column_counts):
+        raise ValueError(
+            f"Expected at least {min(column_counts)} values in {name} row, but got {table.shape[1]}"  # noqa E501
+        )
+
+    if table.shape[1] not in column_counts:
+        raise ValueError(
+            f"Expected {' or '.join(map(str, column_counts))} values in {name} row, but got {table.shape[1]}"  # noqa E501
+        )
+
+    return table
+
+
+def _find_rows_by_distance(distances: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """
+    Finds the rows of the wanted distances with a sorted merge. Raises an error if
+    a wanted distance is not part of the distances.
+    """
+    order = np.argsort(distances, kind="stable")
+    positions = np.searchsorted(distances[order], wanted)
+    positions = np.minimum(positions, max(len(distances) - 1, 0))
+    found = (
+        distances[order][positions] == wanted
+        if len(distances) > 0
+        else np.zeros(len(wanted), dtype=bool)
+    )
+    if not np.all(found):
+        raise ValueError(
+            f'Datapoint with distance: "{float(wanted[~found][0])}" not found.'
+        )
+
+    return order[positions]
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Iterable
 
 
 @dataclass
 class RawLegacyData:
-    velocity_rows: List[str]
-    distance_rows: List[str]
-    fit_rows: List[str]
-    calibration_rows: List[str]
+    # The rows of the files, either as lists or as lazy iterators over the rows
+    velocity_rows: Iterable[str]
+    distance_rows: Iterable[str]
+    fit_rows: Iterable[str]
+    calibration_rows: Iterable[str]
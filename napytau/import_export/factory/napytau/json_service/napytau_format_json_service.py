@@ -1,7 +1,14 @@
 import json
+import re
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
 import jsonschema
 
 from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import DatapointField
 from napytau.import_export.model.dataset import DataSet
 from napytau.util.coalesce import coalesce
 
@@ -173,6 +180,79 @@ _SCHEMA = """
 }
 """
 
+STREAM_CHUNK_SIZE = 1 << 16
+"""The number of characters read from a stream at once."""
+
+STREAMED_ARRAY_KEY = "datapoints"
+"""The top level key of the array which is streamed record by record."""
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# The characters which may continue a number, e.g. a chunk ending with "0." or
+# "1e" after a number was decoded from the part before them
+_JSON_NUMBER_CONTINUATION = re.compile(r"[0-9.eE+-]*")
+
+VALIDATION_MODE_FULL = "full"
+VALIDATION_MODE_SAMPLE = "sample"
+VALIDATION_MODE_TRUSTED = "trusted"
+VALIDATION_MODE_NONE = "none"
+
+VALIDATION_MODES = [
+    VALIDATION_MODE_FULL,
+    VALIDATION_MODE_SAMPLE,
+    VALIDATION_MODE_TRUSTED,
+    VALIDATION_MODE_NONE,
+]
+"""
+How thoroughly the datapoints are validated. In the sample mode only every
+VALIDATION_SAMPLE_INTERVAL-th datapoint is validated, in the none mode no datapoint
+is validated. The trusted mode skips the validation of files with a matching
+checksum and is resolved to the full or none mode when the file is imported.
+The top level fields are always validated, as they are cheap to check.
+"""
+
+VALIDATION_SAMPLE_INTERVAL = 100
+
+_NUMBER_BOUND_CHECKS: dict[str, Callable[[float, float], bool]] = {
+    "minimum": lambda value, bound: value >= bound,
+    "exclusiveMinimum": lambda value, bound: value > bound,
+    "maximum": lambda value, bound: value <= bound,
+    "exclusiveMaximum": lambda value, bound: value < bound,
+}
+_ANNOTATION_KEYWORDS = ["description", "title"]
+
+CALCULATION_DATA_INDENT = 2
+"""The indentation of calculation data which is not written in compact mode."""
+
+WRITE_BATCH_SIZE = 4096
+"""The number of datapoints which are encoded and written at once."""
+
+_CALCULATION_DATAPOINT_KEYS: List[Tuple[DatapointField, str, str]] = [
+    (DatapointField.DISTANCE, "distance", "distanceError"),
+    (DatapointField.TAU, "tau", "tauError"),
+    (DatapointField.SHIFTED_INTENSITY, "shiftedIntensity", "shiftedIntensityError"),
+    (
+        DatapointField.UNSHIFTED_INTENSITY,
+        "unshiftedIntensity",
+        "unshiftedIntensityError",
+    ),
+    (
+        DatapointField.FEEDING_SHIFTED_INTENSITY,
+        "feedingShiftedIntensity",
+        "feedingShiftedIntensityError",
+    ),
+    (
+        DatapointField.FEEDING_UNSHIFTED_INTENSITY,
+        "feedingUnshiftedIntensity",
+        "feedingUnshiftedIntensityError",
+    ),
+]
+"""
+The keys of the datapoint fields in the calculation data, the feeding intensities
+are only written for datapoints with a feeding shifted intensity.
+"""
+_FEEDING_KEYS_START = 4
+
 
 class NapytauFormatJsonService:
     @staticmethod
@@ -189,22 +269,109 @@ class NapytauFormatJsonService:
         return dict(json_data)
 
     @staticmethod
-    def validate_against_schema(json_data: dict) -> bool:
+    def validate_against_schema(
+        json_data: dict, validation_mode: str = VALIDATION_MODE_FULL
+    ) -> bool:
         """
-        Validates the provided json data against the napytau json schema
+        Validates the provided json data against the napytau json schema. The
+        validators are compiled only once per process, the datapoints are checked
+        by a validator specialised for them, as they make up most of the data.
         """
 
-        schema = json.loads(_SCHEMA)
+        datapoints = json_data.get(STREAMED_ARRAY_KEY)
+        if isinstance(datapoints, list):
+            # The datapoints are validated separately from the other fields
+            json_data = {**json_data, STREAMED_ARRAY_KEY: []}
 
         try:
-            jsonschema.validate(instance=json_data, schema=schema)
+            _get_schema_validator().validate(json_data)
         except jsonschema.ValidationError as e:
             raise ImportExportError(
                 f"Provided json data does not match the napytau json schema: {e}"
             )
 
+        if isinstance(datapoints, list):
+            for index, raw_datapoint in enumerate(datapoints):
+                NapytauFormatJsonService.validate_datapoint(
+                    raw_datapoint, index, validation_mode
+                )
+
         return True
 
+    @staticmethod
+    def validate_datapoint(
+        raw_datapoint: Any, index: int, validation_mode: str = VALIDATION_MODE_FULL
+    ) -> None:
+        """
+        Validates the datapoint at the given index of the datapoints array, unless
+        it is skipped by the validation mode.
+        """
+        if validation_mode == VALIDATION_MODE_NONE or (
+            validation_mode == VALIDATION_MODE_SAMPLE
+            and index % VALIDATION_SAMPLE_INTERVAL != 0
+        ):
+            return
+
+        error_message = _get_datapoint_validator()(raw_datapoint)
+        if error_message is not None:
+            raise ImportExportError(
+                f"Provided datapoint {index} does not match the napytau json schema: "
+                f"{error_message}"
+            )
+
+    @staticmethod
+    def stream_json_data(
+        json_stream: TextIO,
+        datapoint_consumer: Callable[[dict], None],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        validation_mode: str = VALIDATION_MODE_FULL,
+    ) -> dict:
+        """
+        Parses json data from the provided stream chunk by chunk. Every record of
+        the datapoints array is validated against the datapoint schema and passed
+        to the consumer as soon as it is parsed, so neither the whole text nor all
+        records are held in memory at once. The other top level fields are
+        validated against the napytau json schema and returned, the datapoints
+        array is returned empty.
+        """
+        decoder = _JsonStreamDecoder(json_stream, chunk_size)
+        json_data: dict = {}
+
+        decoder.expect("{")
+        while decoder.peek() != "}":
+            if len(json_data) > 0:
+                decoder.expect(",")
+
+            key = decoder.decode_value()
+            if not isinstance(key, str):
+                raise ImportExportError(
+                    f"Provided json data could not be parsed: invalid key {key}"
+                )
+            decoder.expect(":")
+
+            if key == STREAMED_ARRAY_KEY and decoder.peek() == "[":
+                decoder.expect("[")
+                index = 0
+                while decoder.peek() != "]":
+                    if index > 0:
+                        decoder.expect(",")
+
+                    raw_datapoint = decoder.decode_value()
+                    NapytauFormatJsonService.validate_datapoint(
+                        raw_datapoint, index, validation_mode
+                    )
+                    datapoint_consumer(raw_datapoint)
+                    index += 1
+                decoder.expect("]")
+                json_data[key] = []
+            else:
+                json_data[key] = decoder.decode_value()
+        decoder.expect("}")
+
+        NapytauFormatJsonService.validate_against_schema(json_data)
+
+        return json_data
+
     @staticmethod
     def create_calculation_data_json_string(dataset: DataSet) -> str:
         """
@@ -221,55 +388,57 @@ class NapytauFormatJsonService:
                     ).error,  # noqa E501
                     "datapoints": list(
                         map(
-                            lambda datapoint: {
-                                "distance": datapoint.distance.value,
-                                "distanceError": datapoint.distance.error,
-                                "tau": coalesce(datapoint.tau).value,
-                                "tauError": coalesce(datapoint.tau).error,
-                                "shiftedIntensity": coalesce(
-                                    datapoint.shifted_intensity
-                                ).value,  # noqa E501
-                                "shiftedIntensityError": coalesce(
-                                    datapoint.shifted_intensity
-                                ).error,  # noqa E501
-                                "unshiftedIntensity": coalesce(
-                                    datapoint.unshifted_intensity
-                                ).value,  # noqa E501
-                                "unshiftedIntensityError": coalesce(
-                                    datapoint.unshifted_intensity
-                                ).error,  # noqa E501
-                            }
-                            if datapoint.feeding_shifted_intensity is None
-                            else {
-                                "distance": datapoint.distance.value,
-                                "distanceError": datapoint.distance.error,
-                                "tau": coalesce(datapoint.tau).value,
-                                "tauError": coalesce(datapoint.tau).error,
-                                "shiftedIntensity": coalesce(
-                                    datapoint.shifted_intensity
-                                ).value,  # noqa E501
-                                "shiftedIntensityError": coalesce(
-                                    datapoint.shifted_intensity
-                                ).error,  # noqa E501
-                                "unshiftedIntensity": coalesce(
-                                    datapoint.unshifted_intensity
-                                ).value,  # noqa E501
-                                "unshiftedIntensityError": coalesce(
-                                    datapoint.unshifted_intensity
-                                ).error,  # noqa E501
-                                "feedingShiftedIntensity": coalesce(
-                                    datapoint.feeding_shifted_intensity
-                                ).value,  # noqa E501
-                                "feedingShiftedIntensityError": coalesce(
-                                    datapoint.feeding_shifted_intensity
-                                ).error,  # noqa E501
-                                "feedingUnshiftedIntensity": coalesce(
-                                    datapoint.feeding_unshifted_intensity
-                                ).value,  # noqa E501
-                                "feedingUnshiftedIntensityError": coalesce(
-                                    datapoint.feeding_unshifted_intensity
-                                ).error,  # noqa E501
-                            },
+                            lambda datapoint: (
+                                {
+                                    "distance": datapoint.distance.value,
+                                    "distanceError": datapoint.distance.error,
+                                    "tau": coalesce(datapoint.tau).value,
+                                    "tauError": coalesce(datapoint.tau).error,
+                                    "shiftedIntensity": coalesce(
+                                        datapoint.shifted_intensity
+                                    ).value,  # noqa E501
+                                    "shiftedIntensityError": coalesce(
+                                        datapoint.shifted_intensity
+                                    ).error,  # noqa E501
+                                    "unshiftedIntensity": coalesce(
+                                        datapoint.unshifted_intensity
+                                    ).value,  # noqa E501
+                                    "unshiftedIntensityError": coalesce(
+                                        datapoint.unshifted_intensity
+                                    ).error,  # noqa E501
+                                }
+                                if datapoint.feeding_shifted_intensity is None
+                                else {
+                                    "distance": datapoint.distance.value,
+                                    "distanceError": datapoint.distance.error,
+                                    "tau": coalesce(datapoint.tau).value,
+                                    "tauError": coalesce(datapoint.tau).error,
+                                    "shiftedIntensity": coalesce(
+                                        datapoint.shifted_intensity
+                                    ).value,  # noqa E501
+                                    "shiftedIntensityError": coalesce(
+                                        datapoint.shifted_intensity
+                                    ).error,  # noqa E501
+                                    "unshiftedIntensity": coalesce(
+                                        datapoint.unshifted_intensity
+                                    ).value,  # noqa E501
+                                    "unshiftedIntensityError": coalesce(
+                                        datapoint.unshifted_intensity
+                                    ).error,  # noqa E501
+                                    "feedingShiftedIntensity": coalesce(
+                                        datapoint.feeding_shifted_intensity
+                                    ).value,  # noqa E501
+                                    "feedingShiftedIntensityError": coalesce(
+                                        datapoint.feeding_shifted_intensity
+                                    ).error,  # noqa E501
+                                    "feedingUnshiftedIntensity": coalesce(
+                                        datapoint.feeding_unshifted_intensity
+                                    ).value,  # noqa E501
+                                    "feedingUnshiftedIntensityError": coalesce(
+                                        datapoint.feeding_unshifted_intensity
+                                    ).error,  # noqa E501
+                                }
+                            ),
                             dataset.get_datapoints(),
                         ),
                     ),
@@ -291,3 +460,280 @@ class NapytauFormatJsonService:
             )
 
         return json_data
+
+    @staticmethod
+    def write_calculation_data_json(
+        dataset: DataSet, json_stream: TextIO, compact: bool = False
+    ) -> None:
+        """
+        Writes the same json as create_calculation_data_json_string to the stream,
+        but emits the datapoints one by one instead of building the whole document
+        in memory first. In compact mode, the json is written without indentation
+        and whitespace.
+        """
+        try:
+            fields = {
+                "tauFactor": coalesce(dataset.get_tau_factor()),
+                "weightedMeanTau": coalesce(dataset.get_weighted_mean_tau()).value,
+                "weightedMeanTauError": coalesce(dataset.get_weighted_mean_tau()).error,
+                "datapoints": _create_datapoint_records(dataset.get_datapoints()),
+                "samplingPoints": dataset.get_sampling_points(),
+                "polynomials": [
+                    {"coefficients": polynomial.coefficients}
+                    for polynomial in coalesce(dataset.get_polynomials())
+                ],
+            }
+            _write_json_object(
+                json_stream, fields, None if compact else CALCULATION_DATA_INDENT
+            )
+        except ValueError as e:
+            raise ImportExportError(
+                f"Provided dataset could not be converted to json: {e}"
+            )
+
+
+def _create_datapoint_records(datapoints: DatapointCollection) -> Iterator[dict]:
+    columns = datapoints.columns
+    fields = [field for field, _, _ in _CALCULATION_DATAPOINT_KEYS]
+
+    # The columns are converted batch by batch, so only a batch of the datapoints
+    # is held as Python objects at once
+    for start in range(0, columns.size, WRITE_BATCH_SIZE):
+        rows = slice(start, start + WRITE_BATCH_SIZE)
+        values = [columns.get_values(field)[rows].tolist() for field in fields]
+        errors = [columns.get_errors(field)[rows].tolist() for field in fields]
+        presence = [columns.get_presence(field)[rows].tolist() for field in fields]
+
+        for row in range(len(values[0])):
+            field_count = (
+                len(_CALCULATION_DATAPOINT_KEYS)
+                if presence[_FEEDING_KEYS_START][row]
+                else _FEEDING_KEYS_START
+            )
+            record = {}
+            for index in range(field_count):
+                (_, value_key, error_key) = _CALCULATION_DATAPOINT_KEYS[index]
+                if not presence[index][row]:
+                    raise ValueError(
+                        f"Datapoint with distance {values[0][row]} has no {value_key}"
+                    )
+                record[value_key] = values[index][row]
+                record[error_key] = errors[index][row]
+
+            yield record
+
+
+def _write_json_object(
+    json_stream: TextIO, fields: Dict[str, Any], indent: Optional[int]
+) -> None:
+    """
+    Writes the fields as a json object to the stream, formatted like json.dumps
+    with the given indent. Iterator values are written as arrays in batches of
+    WRITE_BATCH_SIZE items.
+    """
+    if indent is None:
+        encoder = json.JSONEncoder(separators=(",", ":"))
+        (key_separator, field_prefix, closing_prefix) = (":", "", "")
+    else:
+        encoder = json.JSONEncoder(indent=indent)
+        (key_separator, field_prefix, closing_prefix) = (
+            ": ",
+            "\n" + " " * indent,
+            "\n",
+        )
+
+    def encode(value: Any) -> str:
+        # Nested values are indented relative to the level of the fields
+        return encoder.encode(value).replace("\n", field_prefix)
+
+    json_stream.write("{")
+    for field_index, (key, value) in enumerate(fields.items()):
+        if field_index > 0:
+            json_stream.write(",")
+        json_stream.write(field_prefix + encode(key) + key_separator)
+
+        if not isinstance(value, Iterator):
+            json_stream.write(encode(value))
+            continue
+
+        json_stream.write("[")
+        is_empty = True
+        while batch := list(islice(value, WRITE_BATCH_SIZE)):
+            if not is_empty:
+                json_stream.write(",")
+            # Encoding a batch is much cheaper than encoding its items one by one,
+            # only the brackets of the batch have to be stripped
+            json_stream.write(encode(batch)[1 : -len(field_prefix) - 1])
+            is_empty = False
+        json_stream.write(("" if is_empty else field_prefix) + "]")
+    json_stream.write(closing_prefix + "}")
+
+
+@lru_cache(maxsize=None)
+def _load_schema() -> dict:
+    return dict(json.loads(_SCHEMA))
+
+
+@lru_cache(maxsize=None)
+def _get_schema_validator() -> Any:
+    schema = _load_schema()
+
+    return jsonschema.validators.validator_for(schema)(schema)
+
+
+@lru_cache(maxsize=None)
+def _get_datapoint_validator() -> Callable[[Any], Optional[str]]:
+    datapoint_schema = (
+        _load_schema()
+        .get("properties", {})
+        .get(STREAMED_ARRAY_KEY, {})
+        .get("items", {})
+    )
+
+    return _compile_datapoint_validator(datapoint_schema)
+
+
+def _compile_datapoint_validator(
+    datapoint_schema: dict,
+) -> Callable[[Any], Optional[str]]:
+    """
+    Compiles a validator for flat objects of bounded numbers, such as the datapoint
+    records, from their schema. The validator returns an error message or None.
+    Schemas using other keywords fall back to a compiled jsonschema validator.
+    """
+    properties = datapoint_schema.get("properties", {})
+    required_keys: List[str] = datapoint_schema.get("required", [])
+    number_checks = [
+        (key, keyword, bound, _NUMBER_BOUND_CHECKS[keyword])
+        for key, property_schema in properties.items()
+        for keyword, bound in property_schema.items()
+        if keyword in _NUMBER_BOUND_CHECKS
+    ]
+    is_specialisable = set(datapoint_schema) <= {
+        "type",
+        "properties",
+        "required",
+        *_ANNOTATION_KEYWORDS,
+    } and all(
+        property_schema.get("type") == "number"
+        and set(property_schema)
+        <= {"type", *_NUMBER_BOUND_CHECKS, *_ANNOTATION_KEYWORDS}
+        for property_schema in properties.values()
+    )
+
+    if not is_specialisable or datapoint_schema.get("type", "object") != "object":
+        validator = jsonschema.validators.validator_for(datapoint_schema)(
+            datapoint_schema
+        )
+
+        def validate_generically(raw_datapoint: Any) -> Optional[str]:
+            error = jsonschema.exceptions.best_match(
+                validator.iter_errors(raw_datapoint)
+            )
+
+            return None if error is None else str(error.message)
+
+        return validate_generically
+
+    def validate_datapoint(raw_datapoint: Any) -> Optional[str]:
+        if not isinstance(raw_datapoint, dict):
+            return f"{raw_datapoint!r} is not of type 'object'"
+
+        for key in required_keys:
+            if key not in raw_datapoint:
+                return f"'{key}' is a required property"
+
+        for key in properties:
+            value = raw_datapoint.get(key)
+            if key in raw_datapoint and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                return f"{value!r} is not of type 'number'"
+
+        for key, keyword, bound, check in number_checks:
+            if key in raw_datapoint and not check(raw_datapoint[key], bound):
+                return f"{raw_datapoint[key]!r} violates {keyword} {bound} of '{key}'"
+
+        return None
+
+    return validate_datapoint
+
+
+class _JsonStreamDecoder:
+    """
+    Decodes json values one after another from a text stream. Only the part of
+    the stream which has not been decoded yet is buffered.
+    """
+
+    def __init__(self, json_stream: TextIO, chunk_size: int):
+        self._json_stream = json_stream
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+        self._decoder = json.JSONDecoder()
+
+    def _read(self, size: int) -> bool:
+        if self._exhausted:
+            return False
+
+        chunk = self._json_stream.read(size)
+        if chunk == "":
+            self._exhausted = True
+            return False
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or an empty string at the
+        end of the stream.
+        """
+        while True:
+            whitespace = _JSON_WHITESPACE.match(self._buffer, self._position)
+            if whitespace is not None:
+                self._position = whitespace.end()
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._read(self._chunk_size):
+                return ""
+
+    def expect(self, character: str) -> None:
+        next_character = self.peek()
+        if next_character != character:
+            raise ImportExportError(
+                f"Provided json data could not be parsed: expected '{character}' "
+                f"but got '{next_character}'"
+            )
+
+        self._position += 1
+
+    def decode_value(self) -> Any:
+        self.peek()
+        read_size = self._chunk_size
+        while True:
+            try:
+                (value, end) = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as e:
+                # The value might be incomplete, the reads grow to keep retries rare
+                if self._read(read_size):
+                    read_size *= 2
+                    continue
+
+                raise ImportExportError(f"Provided json data could not be parsed: {e}")
+
+            # A value ending with the buffer, or followed only by characters which
+            # might continue a number, might continue in the next chunk
+            if _JSON_NUMBER_CONTINUATION.fullmatch(
+                self._buffer, end
+            ) is not None and self._read(read_size):
+                continue
+
+            self._position = end
+
+            return value
@@ -1,20 +1,56 @@
-from typing import List
+from typing import List, TextIO, Tuple
+
+import numpy as np
 
 from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+    VALIDATION_MODE_FULL,
     NapytauFormatJsonService,
 )
 from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+    find_rows_of_unique_distances,
+)
 from napytau.import_export.model.dataset import DataSet
 from napytau.import_export.model.relative_velocity import RelativeVelocity
 from napytau.util.coalesce import coalesce
 from napytau.util.model.value_error_pair import ValueErrorPair
 
+DATAPOINT_FIELD_KEYS: List[Tuple[DatapointField, str, str]] = [
+    (DatapointField.DISTANCE, "distance", "distanceError"),
+    (DatapointField.CALIBRATION, "calibration", "calibrationError"),
+    (DatapointField.SHIFTED_INTENSITY, "shiftedIntensity", "shiftedIntensityError"),
+    (
+        DatapointField.UNSHIFTED_INTENSITY,
+        "unshiftedIntensity",
+        "unshiftedIntensityError",
+    ),
+    (
+        DatapointField.FEEDING_SHIFTED_INTENSITY,
+        "feedingShiftedIntensity",
+        "feedingShiftedIntensityError",
+    ),
+    (
+        DatapointField.FEEDING_UNSHIFTED_INTENSITY,
+        "feedingUnshiftedIntensity",
+        "feedingUnshiftedIntensityError",
+    ),
+]
+"""The keys of the value and the error of every field in a raw datapoint."""
+
+DATAPOINT_BUFFER_BATCH_SIZE = 4096
+
 
 class NapyTauFactory:
     @staticmethod
-    def create_dataset(raw_json_data: dict) -> DataSet:
-        NapytauFormatJsonService.validate_against_schema(raw_json_data)
+    def create_dataset(
+        raw_json_data: dict, validation_mode: str = VALIDATION_MODE_FULL
+    ) -> DataSet:
+        NapytauFormatJsonService.validate_against_schema(
+            raw_json_data, validation_mode=validation_mode
+        )
 
         return DataSet(
             ValueErrorPair(
@@ -24,6 +60,33 @@ class NapyTauFactory:
             NapyTauFactory._parse_datapoints(raw_json_data["datapoints"]),
         )
 
+    @staticmethod
+    def create_dataset_from_stream(
+        json_stream: TextIO, validation_mode: str = VALIDATION_MODE_FULL
+    ) -> Tuple[DataSet, dict]:
+        """
+        Creates a dataset from json data read chunk by chunk from the stream. The
+        datapoints are written into compact columnar buffers while they are parsed,
+        no object is kept per datapoint. Returns the dataset together with the
+        other top level fields of the json data, e.g. the setups. The validation
+        mode decides which datapoints are validated.
+        """
+        datapoint_buffer = _DatapointBuffer()
+        raw_json_data = NapytauFormatJsonService.stream_json_data(
+            json_stream, datapoint_buffer.append, validation_mode=validation_mode
+        )
+
+        return (
+            DataSet(
+                ValueErrorPair(
+                    RelativeVelocity(raw_json_data["relativeVelocity"]),
+                    RelativeVelocity(raw_json_data["relativeVelocityError"]),
+                ),
+                datapoint_buffer.create_datapoints(),
+            ),
+            raw_json_data,
+        )
+
     @staticmethod
     def _parse_datapoints(
         raw_datapoints: List[dict[str, float]],
@@ -87,3 +150,74 @@ class NapyTauFactory:
             datapoint.set_active(datapoint_setup["active"])
 
         return dataset
+
+
+class _DatapointBuffer:
+    """
+    Collects raw datapoints in small batches and converts every batch into arrays of
+    values and errors, which take a fraction of the memory of the parsed json
+    objects. Absent values are stored as NaN.
+    """
+
+    def __init__(self) -> None:
+        self._pending_datapoints: List[dict] = []
+        self._value_batches: List[np.ndarray] = []
+        self._error_batches: List[np.ndarray] = []
+
+    def append(self, raw_datapoint: dict) -> None:
+        self._pending_datapoints.append(raw_datapoint)
+        if len(self._pending_datapoints) == DATAPOINT_BUFFER_BATCH_SIZE:
+            self._convert_pending_datapoints()
+
+    def _convert_pending_datapoints(self) -> None:
+        # NumPy converts the None of absent keys to NaN
+        values = np.array(
+            [
+                [
+                    raw_datapoint.get(value_key)
+                    for raw_datapoint in self._pending_datapoints
+                ]
+                for _, value_key, _ in DATAPOINT_FIELD_KEYS
+            ],
+            dtype=float,
+        ).reshape(len(DATAPOINT_FIELD_KEYS), -1)
+        errors = np.array(
+            [
+                [
+                    raw_datapoint.get(error_key)
+                    for raw_datapoint in self._pending_datapoints
+                ]
+                for _, _, error_key in DATAPOINT_FIELD_KEYS
+            ],
+            dtype=float,
+        ).reshape(len(DATAPOINT_FIELD_KEYS), -1)
+
+        if np.any(np.isnan(errors) & ~np.isnan(values)):
+            raise ValueError("Every value of a datapoint requires an error.")
+
+        self._value_batches.append(values)
+        self._error_batches.append(errors)
+        self._pending_datapoints = []
+
+    def create_datapoints(self) -> DatapointCollection:
+        self._convert_pending_datapoints()
+        buffered_values = np.concatenate(self._value_batches, axis=1)
+        buffered_errors = np.concatenate(self._error_batches, axis=1)
+
+        buffered_fields = [field for field, _, _ in DATAPOINT_FIELD_KEYS]
+        shape = (len(DatapointField), buffered_values.shape[1])
+        values = np.full(shape, np.nan)
+        errors = np.full(shape, np.nan)
+        values[buffered_fields] = buffered_values
+        errors[buffered_fields] = buffered_errors
+        present = ~np.isnan(values)
+
+        # Repeated distances describe the same datapoint, the last one replaces the
+        # earlier ones like in NapyTauFactory.create_dataset
+        unique_rows = find_rows_of_unique_distances(values[DatapointField.DISTANCE])
+
+        return DatapointCollection.from_columns(
+            DatapointColumns.from_arrays(
+                values[:, unique_rows], errors[:, unique_rows], present[:, unique_rows]
+            )
+        )
@@ -1,7 +1,11 @@
 from pathlib import PurePath
 from re import compile as compile_regex
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 
+from napytau.import_export.factory.binary.binary_factory import BinaryFactory
+from napytau.import_export.factory.binary.binary_format_service import (
+    BinaryFormatService,
+)
 from napytau.import_export.factory.legacy.legacy_factory import (
     LegacyFactory,
 )
@@ -12,6 +16,9 @@ from napytau.import_export.factory.legacy.raw_legacy_setup_data import (
     RawLegacySetupData,
 )
 from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+    VALIDATION_MODE_FULL,
+    VALIDATION_MODE_NONE,
+    VALIDATION_MODE_TRUSTED,
     NapytauFormatJsonService,
 )
 from napytau.import_export.factory.napytau.napytau_factory import NapyTauFactory
@@ -22,8 +29,11 @@ from napytau.import_export.writer.file_writer import FileWriter
 
 IMPORT_FORMAT_LEGACY = "legacy"
 IMPORT_FORMAT_NAPYTAU = "napytau"
+IMPORT_FORMAT_BINARY = "binary"
+
+IMPORT_FORMATS = [IMPORT_FORMAT_LEGACY, IMPORT_FORMAT_NAPYTAU, IMPORT_FORMAT_BINARY]
 
-IMPORT_FORMATS = [IMPORT_FORMAT_LEGACY, IMPORT_FORMAT_NAPYTAU]
+CHECKSUM_FILE_SUFFIX = ".sha256"
 
 
 def import_legacy_format_from_files(
@@ -45,12 +55,58 @@ def import_legacy_format_from_files(
 
     setup_files: LegacySetupFiles = file_crawler.crawl(directory_path)
 
+    return _create_dataset_from_legacy_setup_files(setup_files)
+
+
+def import_legacy_format_from_directory_tree(
+    directory_path: PurePath, worker_count: Optional[int] = None
+) -> Iterator[Tuple[PurePath, DataSet]]:
+    """
+    Ingests every dataset in the Legacy format found in the directory tree below
+    the directory path, e.g. a whole experiment archive. Every directory containing
+    the following files is treated as a setup directory:
+    - v_c
+    - distances.dat
+    - norm.fac
+    - *.fit
+
+    The setup directories and their datasets are yielded as soon as they are found,
+    in no particular order. The worker count limits the number of threads scanning
+    the directories.
+    """
+
+    file_crawler = _configure_file_crawler_for_legacy_format(None)
+
+    for setup_files in file_crawler.crawl_recursively(directory_path, worker_count):
+        yield (
+            setup_files.distances_file.parent,
+            _create_dataset_from_legacy_setup_files(setup_files),
+        )
+
+
+def find_legacy_setup_directories(
+    directory_path: PurePath, worker_count: Optional[int] = None
+) -> Iterator[PurePath]:
+    """
+    Finds the setup directories in the Legacy format in the directory tree below
+    the directory path, the same directories import_legacy_format_from_directory_tree
+    imports, without reading their files. The directories are yielded as soon as
+    they are found, in no particular order.
+    """
+
+    file_crawler = _configure_file_crawler_for_legacy_format(None)
+
+    for setup_files in file_crawler.crawl_recursively(directory_path, worker_count):
+        yield setup_files.distances_file.parent
+
+
+def _create_dataset_from_legacy_setup_files(setup_files: LegacySetupFiles) -> DataSet:
     return LegacyFactory.create_dataset(
         RawLegacyData(
-            FileReader.read_rows(setup_files.velocity_file),
-            FileReader.read_rows(setup_files.distances_file),
-            FileReader.read_rows(setup_files.fit_file),
-            FileReader.read_rows(setup_files.calibration_file),
+            FileReader.iterate_rows(setup_files.velocity_file),
+            FileReader.iterate_rows(setup_files.distances_file),
+            FileReader.iterate_rows(setup_files.fit_file),
+            FileReader.iterate_rows(setup_files.calibration_file),
         )
     )
 
@@ -97,6 +153,7 @@ def read_legacy_setup_data_into_data_set(
 
 def import_napytau_format_from_file(
     file_path: PurePath,
+    validation_mode: str = VALIDATION_MODE_FULL,
 ) -> Tuple[DataSet, List[dict]]:
     """
     Ingests a dataset from the NapyTau format. The directory path will be
@@ -104,18 +161,91 @@ def import_napytau_format_from_file(
     - napytau.json
 
     :param directory_path: The directory path to search for the .napytau.json files
+    :param validation_mode: How thoroughly the datapoints are validated
 
     :return: A list of datasets and their corresponding raw setup data
     """
+    validation_mode = _resolve_validation_mode(file_path, validation_mode)
     json_data = NapytauFormatJsonService.parse_json_data(
         FileReader.read_text(file_path)
     )
     return (
-        NapyTauFactory.create_dataset(json_data),
+        NapyTauFactory.create_dataset(json_data, validation_mode=validation_mode),
         json_data["setups"],
     )
 
 
+def stream_napytau_format_from_file(
+    file_path: PurePath,
+    validation_mode: str = VALIDATION_MODE_FULL,
+) -> Tuple[DataSet, List[dict]]:
+    """
+    Ingests a dataset from a file in the NapyTau format like
+    import_napytau_format_from_file, but streams the file instead of reading
+    and parsing it as a whole. The datapoints are validated record by record and
+    stored in columnar buffers while the file is read, so memory stays bounded
+    for large files.
+
+    :param file_path: The path of the .napytau.json file
+    :param validation_mode: How thoroughly the datapoints are validated
+
+    :return: The dataset and its corresponding raw setup data
+    """
+    validation_mode = _resolve_validation_mode(file_path, validation_mode)
+    with FileReader.open_text(file_path) as json_stream:
+        (dataset, json_data) = NapyTauFactory.create_dataset_from_stream(
+            json_stream, validation_mode=validation_mode
+        )
+
+    return dataset, json_data["setups"]
+
+
+def _resolve_validation_mode(file_path: PurePath, validation_mode: str) -> str:
+    """
+    Files are trusted if a checksum file next to them, e.g. data.json.sha256 for
+    data.json, contains their SHA-256 checksum in the format of sha256sum.
+    The datapoints of trusted files are not validated, the datapoints of all
+    other files are fully validated.
+    """
+    if validation_mode != VALIDATION_MODE_TRUSTED:
+        return validation_mode
+
+    try:
+        expected_checksum = FileReader.read_text(
+            PurePath(f"{file_path}{CHECKSUM_FILE_SUFFIX}")
+        ).split()
+    except FileNotFoundError:
+        return VALIDATION_MODE_FULL
+
+    if len(expected_checksum) > 0 and expected_checksum[
+        0
+    ].lower() == FileReader.calculate_checksum(file_path):
+        return VALIDATION_MODE_NONE
+
+    return VALIDATION_MODE_FULL
+
+
+def import_binary_format_from_file(file_path: PurePath) -> Tuple[DataSet, List[dict]]:
+    """
+    Ingests a dataset from a file in the binary format. The file is memory-mapped
+    and the datapoints are used in place, so only the pages which are accessed are
+    read from the disk.
+
+    :param file_path: The path of the binary format file
+
+    :return: The dataset and its corresponding raw setup data, which can be read
+    into the dataset with read_napytau_setup_data_into_data_set
+    """
+    try:
+        buffer = FileReader.map_bytes(file_path)
+    except ValueError as e:
+        raise ImportExportError(f"Binary format file {file_path} is empty.") from e
+
+    (metadata, arrays) = BinaryFormatService.parse_binary_data(memoryview(buffer))
+
+    return BinaryFactory.create_dataset(metadata, arrays), metadata.get("setups", [])
+
+
 def read_napytau_setup_data_into_data_set(
     dataset: DataSet, raw_setups_data: List[dict], setup_name: str
 ) -> DataSet:
@@ -146,12 +276,30 @@ def read_napytau_setup_data_into_data_set(
 
 
 def save_napytau_calculation_data_to_file(
-    dataset: DataSet, file_path: PurePath
+    dataset: DataSet, file_path: PurePath, compact: bool = False
 ) -> None:
     """
-    Saves the dataset to a file in the NapyTau format
+    Saves the dataset to a file in the NapyTau format. The datapoints are written
+    incrementally, and the file is only replaced once it was written completely.
+    If compact is set, the json is written without indentation.
     """
 
-    json_data = NapytauFormatJsonService.create_calculation_data_json_string(dataset)
+    with FileWriter.open_text_atomically(file_path) as json_stream:
+        NapytauFormatJsonService.write_calculation_data_json(
+            dataset, json_stream, compact
+        )
+
 
-    FileWriter.write_text(file_path, json_data)
+def save_binary_format_to_file(
+    dataset: DataSet, file_path: PurePath, raw_setups: Optional[List[dict]] = None
+) -> None:
+    """
+    Saves the dataset and optionally its raw setup data, e.g. as imported from a
+    NapyTau format file, to a file in the binary format
+    """
+
+    (metadata, arrays) = BinaryFactory.create_metadata_and_arrays(dataset, raw_setups)
+
+    FileWriter.write_bytes(
+        file_path, BinaryFormatService.create_binary_data(metadata, arrays)
+    )
@@ -1,29 +1,262 @@
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from __future__ import annotations
 
+from typing import List, Optional, Tuple
+from weakref import ref, ReferenceType
+
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
+from napytau.util.coalesce import coalesce
 from napytau.util.model.value_error_pair import ValueErrorPair
 
 
-@dataclass
 class Datapoint:
     """
     A class to represent a single datapoint in a dataset.
     Distance acts as a key, identifying the datapoint, therefore it is required.
     All other attributes are optional and can be set later.
 
+    Once a datapoint is part of a DatapointCollection, it is a view on a row of the
+    collection's column storage: reads come from the columns and writes go through
+    to them. A datapoint that was added to several collections writes through to
+    all of them. Datapoints that are not part of any collection hold their data
+    themselves.
+
     As this class sits at the core of the entire system, it is important to take care
     when modifying it. Any changes to this class will have a ripple effect on the entire
     system.
     """
 
-    distance: ValueErrorPair[float]
-    calibration: Optional[ValueErrorPair[float]] = None
-    shifted_intensity: Optional[ValueErrorPair[float]] = None
-    unshifted_intensity: Optional[ValueErrorPair[float]] = None
-    feeding_shifted_intensity: Optional[ValueErrorPair[float]] = None
-    feeding_unshifted_intensity: Optional[ValueErrorPair[float]] = None
-    tau: Optional[ValueErrorPair[float]] = None
-    active: bool = True
+    _columns: Optional[DatapointColumns]
+    _row: int
+    _mirrors: List[Tuple[ReferenceType[DatapointColumns], int]]
+    _detached_fields: List[Optional[ValueErrorPair[float]]]
+    _detached_active: bool
+
+    def __init__(
+        self,
+        distance: ValueErrorPair[float],
+        calibration: Optional[ValueErrorPair[float]] = None,
+        shifted_intensity: Optional[ValueErrorPair[float]] = None,
+        unshifted_intensity: Optional[ValueErrorPair[float]] = None,
+        feeding_shifted_intensity: Optional[ValueErrorPair[float]] = None,
+        feeding_unshifted_intensity: Optional[ValueErrorPair[float]] = None,
+        tau: Optional[ValueErrorPair[float]] = None,
+        active: bool = True,
+    ):
+        self._columns = None
+        self._row = -1
+        self._mirrors = []
+        self._detached_fields = [
+            distance,
+            calibration,
+            shifted_intensity,
+            unshifted_intensity,
+            feeding_shifted_intensity,
+            feeding_unshifted_intensity,
+            tau,
+        ]
+        self._detached_active = active
+
+    @staticmethod
+    def create_view(columns: DatapointColumns, row: int) -> Datapoint:
+        """
+        Creates a datapoint reading from and writing to the given row of the columns.
+        """
+        datapoint = Datapoint.__new__(Datapoint)
+        datapoint._columns = columns
+        datapoint._row = row
+        datapoint._mirrors = []
+        datapoint._detached_fields = []
+        datapoint._detached_active = True
+
+        return datapoint
+
+    def bind(self, columns: DatapointColumns, row: int) -> None:
+        """
+        Binds the datapoint to a row of the provided columns, which must already
+        contain the data of the datapoint. The first binding becomes the storage
+        of the datapoint, further bindings are kept up to date on writes.
+        """
+        if self._columns is None:
+            self._columns = columns
+            self._row = row
+            self._detached_fields = []
+        elif not self._is_bound_to(columns, row):
+            self._mirrors.append((ref(columns), row))
+
+    def unbind(self, columns: DatapointColumns, row: int) -> None:
+        """
+        Removes the binding to a row of the provided columns. If the row was the
+        storage of the datapoint, its data is copied into the datapoint first.
+        """
+        if self._columns is columns and self._row == row:
+            self._detached_fields = [
+                columns.get_value_error_pair(field, row) for field in DatapointField
+            ]
+            self._detached_active = columns.is_active(row)
+            self._columns = None
+            self._row = -1
+        else:
+            self._mirrors = [
+                (mirror, mirror_row)
+                for (mirror, mirror_row) in self._mirrors
+                if not (mirror() is columns and mirror_row == row)
+            ]
+
+    def get_storage(self) -> Optional[Tuple[DatapointColumns, int]]:
+        """
+        Returns the columns and row holding the data of the datapoint, or None if
+        the datapoint is not part of any collection.
+        """
+        if self._columns is None:
+            return None
+
+        return self._columns, self._row
+
+    def _is_bound_to(self, columns: DatapointColumns, row: int) -> bool:
+        if self._columns is columns and self._row == row:
+            return True
+
+        return any(
+            mirror() is columns and mirror_row == row
+            for (mirror, mirror_row) in self._mirrors
+        )
+
+    def _live_mirrors(self) -> List[Tuple[DatapointColumns, int]]:
+        live_mirrors = []
+        for mirror, mirror_row in self._mirrors:
+            columns = mirror()
+            if columns is not None:
+                live_mirrors.append((columns, mirror_row))
+
+        if len(live_mirrors) != len(self._mirrors):
+            self._mirrors = [
+                (ref(columns), mirror_row) for (columns, mirror_row) in live_mirrors
+            ]
+
+        return live_mirrors
+
+    def get_field(self, field: DatapointField) -> Optional[ValueErrorPair[float]]:
+        if self._columns is None:
+            return self._detached_fields[field]
+
+        return self._columns.get_value_error_pair(field, self._row)
+
+    def _write(
+        self, field: DatapointField, value_error_pair: Optional[ValueErrorPair[float]]
+    ) -> None:
+        if self._columns is None:
+            self._detached_fields[field] = value_error_pair
+            return
+
+        self._columns.set_value_error_pair(field, self._row, value_error_pair)
+        for columns, row in self._live_mirrors():
+            columns.set_value_error_pair(field, row, value_error_pair)
+
+    @property
+    def distance(self) -> ValueErrorPair[float]:
+        return coalesce(self.get_field(DatapointField.DISTANCE))
+
+    @distance.setter
+    def distance(self, distance: ValueErrorPair[float]) -> None:
+        self._write(DatapointField.DISTANCE, distance)
+
+    @property
+    def calibration(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.CALIBRATION)
+
+    @calibration.setter
+    def calibration(self, calibration: Optional[ValueErrorPair[float]]) -> None:
+        self._write(DatapointField.CALIBRATION, calibration)
+
+    @property
+    def shifted_intensity(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.SHIFTED_INTENSITY)
+
+    @shifted_intensity.setter
+    def shifted_intensity(
+        self, shifted_intensity: Optional[ValueErrorPair[float]]
+    ) -> None:
+        self._write(DatapointField.SHIFTED_INTENSITY, shifted_intensity)
+
+    @property
+    def unshifted_intensity(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.UNSHIFTED_INTENSITY)
+
+    @unshifted_intensity.setter
+    def unshifted_intensity(
+        self, unshifted_intensity: Optional[ValueErrorPair[float]]
+    ) -> None:
+        self._write(DatapointField.UNSHIFTED_INTENSITY, unshifted_intensity)
+
+    @property
+    def feeding_shifted_intensity(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.FEEDING_SHIFTED_INTENSITY)
+
+    @feeding_shifted_intensity.setter
+    def feeding_shifted_intensity(
+        self, feeding_shifted_intensity: Optional[ValueErrorPair[float]]
+    ) -> None:
+        self._write(DatapointField.FEEDING_SHIFTED_INTENSITY, feeding_shifted_intensity)
+
+    @property
+    def feeding_unshifted_intensity(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.FEEDING_UNSHIFTED_INTENSITY)
+
+    @feeding_unshifted_intensity.setter
+    def feeding_unshifted_intensity(
+        self, feeding_unshifted_intensity: Optional[ValueErrorPair[float]]
+    ) -> None:
+        self._write(
+            DatapointField.FEEDING_UNSHIFTED_INTENSITY, feeding_unshifted_intensity
+        )
+
+    @property
+    def tau(self) -> Optional[ValueErrorPair[float]]:
+        return self.get_field(DatapointField.TAU)
+
+    @tau.setter
+    def tau(self, tau: Optional[ValueErrorPair[float]]) -> None:
+        self._write(DatapointField.TAU, tau)
+
+    @property
+    def active(self) -> bool:
+        if self._columns is None:
+            return self._detached_active
+
+        return self._columns.is_active(self._row)
+
+    @active.setter
+    def active(self, active: bool) -> None:
+        if self._columns is None:
+            self._detached_active = active
+            return
+
+        self._columns.set_active(self._row, active)
+        for columns, row in self._live_mirrors():
+            columns.set_active(row, active)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Datapoint):
+            return NotImplemented
+
+        return (
+            all(
+                self.get_field(field) == other.get_field(field)
+                for field in DatapointField
+            )
+            and self.active == other.active
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field.name.lower()}={self.get_field(field)!r}"
+            for field in DatapointField
+        )
+
+        return f"Datapoint({fields}, active={self.active})"
 
     def get_distance(self) -> ValueErrorPair[float]:
         return self.distance
@@ -32,21 +265,24 @@ class Datapoint:
         self.distance = distance
 
     def get_calibration(self) -> ValueErrorPair[float]:
-        if self.calibration is None:
+        calibration = self.calibration
+        if calibration is None:
             raise ValueError("Calibration was accessed before initialization.")
 
-        return self.calibration
+        return calibration
 
     def set_calibration(self, calibration: ValueErrorPair[float]) -> None:
         self.calibration = calibration
 
     def get_intensity(self) -> Tuple[ValueErrorPair[float], ValueErrorPair[float]]:
-        if self.shifted_intensity is None or self.unshifted_intensity is None:
+        shifted_intensity = self.shifted_intensity
+        unshifted_intensity = self.unshifted_intensity
+        if shifted_intensity is None or unshifted_intensity is None:
             raise ValueError("Intensity was accessed before initialization.")
 
         return (
-            self.shifted_intensity,
-            self.unshifted_intensity,
+            shifted_intensity,
+            unshifted_intensity,
         )
 
     def set_intensity(
@@ -74,10 +310,11 @@ class Datapoint:
         self.feeding_unshifted_intensity = feeding_unshifted_intensity
 
     def get_tau(self) -> ValueErrorPair[float]:
-        if self.tau is None:
+        tau = self.tau
+        if tau is None:
             raise ValueError("Tau was accessed before initialization.")
 
-        return self.tau
+        return tau
 
     def set_tau(self, tau: ValueErrorPair[float]) -> None:
         self.tau = tau
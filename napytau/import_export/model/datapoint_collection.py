@@ -1,8 +1,13 @@
 from __future__ import annotations
-from typing import Dict, List, Callable, Iterator
+from typing import Dict, List, Callable, Iterator, Optional
+
+import numpy as np
 
 from napytau.import_export.model.datapoint import Datapoint
-from napytau.util.coalesce import coalesce
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
 from napytau.util.model.ValueErrorPairCollection import ValueErrorPairCollection
 
 
@@ -10,131 +15,155 @@ class DatapointCollection:
     """
     A class to represent a collection of datapoints.
     It provides convenience methods to filter, add, and retrieve datapoints.
-    Internally, it uses a dictionary to store the datapoints. The key is the hash
-    of the distance value of a given datapoint.
+    Internally, the numeric data of all datapoints is stored column-wise in a
+    DatapointColumns instance, so that retrieving e.g. all distances does not
+    iterate over the datapoints. Datapoints are identified by the hash of their
+    distance value, the datapoints handed out by the collection are views on the
+    rows of the columns.
 
     This class can be iterated over, and it provides a way to access the elements
     """
 
-    elements: Dict[int, Datapoint]
+    columns: DatapointColumns
+    _row_by_distance_hash: Dict[int, int]
+    _datapoints: List[Optional[Datapoint]]
 
     def __init__(self, raw_datapoints: List[Datapoint]):
-        self.elements = {}
+        self.columns = DatapointColumns(len(raw_datapoints))
+        self._row_by_distance_hash = {}
+        self._datapoints = []
         for datapoint in raw_datapoints:
-            self.elements[hash(datapoint.distance.value)] = datapoint
+            self.add_datapoint(datapoint)
+
+    @staticmethod
+    def from_columns(columns: DatapointColumns) -> DatapointCollection:
+        """
+        Creates a collection on top of already filled columns without creating a
+        datapoint per row. The distances of the rows have to be unique.
+        """
+        datapoints = DatapointCollection([])
+        datapoints.columns = columns
+        datapoints._row_by_distance_hash = {
+            hash(distance): row
+            for row, distance in enumerate(
+                columns.get_values(DatapointField.DISTANCE).tolist()
+            )
+        }
+        if len(datapoints._row_by_distance_hash) != columns.size:
+            raise ValueError("The distances of the datapoints are not unique.")
+        datapoints._datapoints = [None] * columns.size
+
+        return datapoints
 
     def __len__(self) -> int:
-        return len(self.elements)
+        return self.columns.size
 
     def __iter__(self) -> Iterator[Datapoint]:
-        return iter(self.elements.values())
+        return (self._get_datapoint_at_row(row) for row in range(len(self)))
 
     def __getitem__(self, key: int) -> Datapoint:
-        return list(self.elements.values())[key]
+        row = key + len(self) if key < 0 else key
+        if row < 0 or row >= len(self):
+            raise IndexError(f"Datapoint index {key} out of range.")
+
+        return self._get_datapoint_at_row(row)
+
+    @property
+    def elements(self) -> Dict[int, Datapoint]:
+        return {
+            distance_hash: self._get_datapoint_at_row(row)
+            for distance_hash, row in self._row_by_distance_hash.items()
+        }
 
     def as_dict(self) -> Dict[int, Datapoint]:
         """Return the collection as a dictionary. Keys are the hash of the distance value."""  # noqa E501
         return self.elements
 
     def filter(self, filter_func: Callable[[Datapoint], bool]) -> DatapointCollection:
-        return DatapointCollection(list(filter(filter_func, self.elements.values())))
+        return DatapointCollection(list(filter(filter_func, self)))
 
     def add_datapoint(self, datapoint: Datapoint) -> None:
-        self.elements[hash(datapoint.distance.value)] = datapoint
+        distance_hash = hash(datapoint.distance.value)
+        row = self._row_by_distance_hash.get(distance_hash)
+
+        if row is None:
+            row = self.columns.append_row()
+            self._row_by_distance_hash[distance_hash] = row
+            self._datapoints.append(None)
+        else:
+            previous_datapoint = self._datapoints[row]
+            if previous_datapoint is datapoint:
+                return
+            if previous_datapoint is not None:
+                previous_datapoint.unbind(self.columns, row)
+
+        self._write_datapoint_into_row(datapoint, row)
+        datapoint.bind(self.columns, row)
+        self._datapoints[row] = datapoint
+
+    def _write_datapoint_into_row(self, datapoint: Datapoint, row: int) -> None:
+        storage = datapoint.get_storage()
+        if storage is not None:
+            self.columns.copy_row(storage[0], storage[1], row)
+            return
+
+        for field in DatapointField:
+            self.columns.set_value_error_pair(field, row, datapoint.get_field(field))
+        self.columns.set_active(row, datapoint.active)
+
+    def _get_datapoint_at_row(self, row: int) -> Datapoint:
+        datapoint = self._datapoints[row]
+        if datapoint is None:
+            datapoint = Datapoint.create_view(self.columns, row)
+            self._datapoints[row] = datapoint
+
+        return datapoint
 
     def get_datapoint_by_distance(self, distance: float) -> Datapoint:
         """
         Get a datapoint by its distance.
         This function will raise an error if the datapoint is not found.
         """
-        if hash(distance) not in self.elements:
+        if hash(distance) not in self._row_by_distance_hash:
             raise ValueError(f'Datapoint with distance: "{distance}" not found.')
 
-        return self.elements[hash(distance)]
+        return self._get_datapoint_at_row(self._row_by_distance_hash[hash(distance)])
+
+    def _get_field(self, field: DatapointField) -> ValueErrorPairCollection[float]:
+        values = self.columns.get_values(field)
+        errors = self.columns.get_errors(field)
+
+        if self.columns.get_present_count(field) == len(self):
+            return ValueErrorPairCollection.from_arrays(values, errors)
+
+        presence = self.columns.get_presence(field)
+
+        return ValueErrorPairCollection.from_arrays(values[presence], errors[presence])
 
     def get_distances(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: datapoint.distance,
-                    self.elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.DISTANCE)
 
     def get_calibrations(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.calibration),
-                    self.filter(
-                        lambda datapoint: datapoint.calibration is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.CALIBRATION)
 
     def get_shifted_intensities(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.shifted_intensity),
-                    self.filter(
-                        lambda datapoint: datapoint.shifted_intensity is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.SHIFTED_INTENSITY)
 
     def get_unshifted_intensities(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.unshifted_intensity),
-                    self.filter(
-                        lambda datapoint: datapoint.unshifted_intensity is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.UNSHIFTED_INTENSITY)
 
     def get_feeding_shifted_intensities(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.feeding_shifted_intensity),
-                    self.filter(
-                        lambda datapoint: datapoint.feeding_shifted_intensity
-                        is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.FEEDING_SHIFTED_INTENSITY)
 
     def get_feeding_unshifted_intensities(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.feeding_unshifted_intensity),
-                    self.filter(
-                        lambda datapoint: datapoint.feeding_unshifted_intensity
-                        is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.FEEDING_UNSHIFTED_INTENSITY)
 
     def get_taus(self) -> ValueErrorPairCollection[float]:
-        return ValueErrorPairCollection(
-            list(
-                map(
-                    lambda datapoint: coalesce(datapoint.tau),
-                    self.filter(
-                        lambda datapoint: datapoint.tau is not None
-                    ).elements.values(),
-                )
-            )
-        )
+        return self._get_field(DatapointField.TAU)
+
+    def get_active_mask(self) -> np.ndarray:
+        """Returns a read-only boolean array with the active flag of every datapoint."""
+        return self.columns.get_active_mask()
 
     def get_active_datapoints(self) -> DatapointCollection:
         return self.filter(lambda datapoint: datapoint.active)
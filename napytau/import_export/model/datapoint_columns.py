@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import Optional
+
+import numpy as np
+
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+class DatapointField(IntEnum):
+    """
+    The value error pair fields of a datapoint. The value of each member is the row
+    of the field in the arrays of a DatapointColumns instance.
+    """
+
+    DISTANCE = 0
+    CALIBRATION = 1
+    SHIFTED_INTENSITY = 2
+    UNSHIFTED_INTENSITY = 3
+    FEEDING_SHIFTED_INTENSITY = 4
+    FEEDING_UNSHIFTED_INTENSITY = 5
+    TAU = 6
+
+
+class DatapointColumns:
+    """
+    Column-wise storage for the numeric data of a set of datapoints.
+    Values and errors of every field are kept in contiguous float64 arrays, which
+    allows handing out all values of a field without iterating over the datapoints.
+    Optional fields which are not set for a datapoint are marked as absent in a
+    separate presence mask, their values and errors are NaN.
+
+    The arrays are over-allocated and grow geometrically, only the first `size`
+    entries of each column are valid.
+
+    Every write to a field increments the revision of that field, which allows
+    consumers to cache values derived from a column and detect when it changed.
+    """
+
+    values: np.ndarray
+    errors: np.ndarray
+    present: np.ndarray
+    present_counts: np.ndarray
+    revisions: np.ndarray
+    active: np.ndarray
+    size: int
+
+    def __init__(self, capacity: int = 0):
+        field_count = len(DatapointField)
+        self.values = np.full((field_count, capacity), np.nan, dtype=np.float64)
+        self.errors = np.full((field_count, capacity), np.nan, dtype=np.float64)
+        self.present = np.zeros((field_count, capacity), dtype=bool)
+        self.present_counts = np.zeros(field_count, dtype=np.int64)
+        self.revisions = np.zeros(field_count, dtype=np.int64)
+        self.active = np.ones(capacity, dtype=bool)
+        self.size = 0
+
+    @staticmethod
+    def from_arrays(
+        values: np.ndarray, errors: np.ndarray, present: np.ndarray
+    ) -> DatapointColumns:
+        """
+        Creates columns from arrays of shape (number of fields, number of rows),
+        e.g. when parsing whole files at once. The arrays are copied, all rows are
+        active.
+        """
+        columns = DatapointColumns()
+        columns.present = np.array(present, dtype=bool)
+        columns.values = np.where(columns.present, values, np.nan).astype(np.float64)
+        columns.errors = np.where(columns.present, errors, np.nan).astype(np.float64)
+        columns.present_counts = columns.present.sum(axis=1).astype(np.int64)
+        columns.size = columns.present.shape[1]
+        columns.active = np.ones(columns.size, dtype=bool)
+
+        return columns
+
+    @staticmethod
+    def wrap_arrays(
+        values: np.ndarray,
+        errors: np.ndarray,
+        present: np.ndarray,
+        active: np.ndarray,
+    ) -> DatapointColumns:
+        """
+        Creates columns on top of existing arrays of shape (number of fields,
+        number of rows) and an active mask of shape (number of rows,), e.g. arrays
+        mapped from a file. Arrays of the right dtype are used as they are, without
+        copying them, so the values of absent fields have to be NaN already.
+        """
+        field_count = len(DatapointField)
+        if (
+            np.ndim(values) != 2
+            or np.shape(values)[0] != field_count
+            or np.shape(values) != np.shape(errors)
+            or np.shape(values) != np.shape(present)
+            or np.shape(active) != np.shape(values)[1:]
+        ):
+            raise ValueError(
+                f"The arrays do not match the shape ({field_count}, number of rows)."
+            )
+
+        columns = DatapointColumns()
+        columns.values = np.asarray(values, dtype=np.float64)
+        columns.errors = np.asarray(errors, dtype=np.float64)
+        columns.present = np.asarray(present, dtype=bool)
+        columns.active = np.asarray(active, dtype=bool)
+        columns.present_counts = columns.present.sum(axis=1).astype(np.int64)
+        columns.size = columns.present.shape[1]
+
+        return columns
+
+    def select_rows(self, mask: np.ndarray) -> DatapointColumns:
+        """
+        Creates columns holding a copy of the rows selected by a boolean mask of
+        shape (size,), e.g. the active rows.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.size,):
+            raise ValueError(
+                f"The mask of shape {mask.shape} does not match the {self.size} rows."
+            )
+
+        return DatapointColumns.wrap_arrays(
+            self.values[:, : self.size][:, mask],
+            self.errors[:, : self.size][:, mask],
+            self.present[:, : self.size][:, mask],
+            self.active[: self.size][mask],
+        )
+
+    def append_row(self) -> int:
+        """
+        Appends an empty, active row and returns its index.
+        """
+        if self.size == self.values.shape[1]:
+            self._reserve(max(8, 2 * self.size))
+
+        row = self.size
+        self.size += 1
+
+        return row
+
+    def _reserve(self, capacity: int) -> None:
+        field_count = len(DatapointField)
+        size = self.size
+
+        values = np.full((field_count, capacity), np.nan, dtype=np.float64)
+        errors = np.full((field_count, capacity), np.nan, dtype=np.float64)
+        present = np.zeros((field_count, capacity), dtype=bool)
+        active = np.ones(capacity, dtype=bool)
+
+        values[:, :size] = self.values[:, :size]
+        errors[:, :size] = self.errors[:, :size]
+        present[:, :size] = self.present[:, :size]
+        active[:size] = self.active[:size]
+
+        self.values = values
+        self.errors = errors
+        self.present = present
+        self.active = active
+
+    def get_value_error_pair(
+        self, field: DatapointField, row: int
+    ) -> Optional[ValueErrorPair[float]]:
+        if not self.present[field, row]:
+            return None
+
+        return ValueErrorPair(
+            float(self.values[field, row]), float(self.errors[field, row])
+        )
+
+    def set_value_error_pair(
+        self,
+        field: DatapointField,
+        row: int,
+        value_error_pair: Optional[ValueErrorPair[float]],
+    ) -> None:
+        was_present = bool(self.present[field, row])
+        self.revisions[field] += 1
+
+        if value_error_pair is None:
+            self.values[field, row] = np.nan
+            self.errors[field, row] = np.nan
+            self.present[field, row] = False
+            self.present_counts[field] -= int(was_present)
+        else:
+            self.values[field, row] = value_error_pair.value
+            self.errors[field, row] = value_error_pair.error
+            self.present[field, row] = True
+            self.present_counts[field] += int(not was_present)
+
+    def is_active(self, row: int) -> bool:
+        return bool(self.active[row])
+
+    def set_active(self, row: int, active: bool) -> None:
+        self.active[row] = active
+
+    def copy_row(self, source: DatapointColumns, source_row: int, row: int) -> None:
+        """
+        Copies a row of another DatapointColumns instance into the given row.
+        """
+        self.revisions += 1
+        self.present_counts -= self.present[:, row]
+        self.values[:, row] = source.values[:, source_row]
+        self.errors[:, row] = source.errors[:, source_row]
+        self.present[:, row] = source.present[:, source_row]
+        self.present_counts += self.present[:, row]
+        self.active[row] = source.active[source_row]
+
+    def get_values(self, field: DatapointField) -> np.ndarray:
+        """Returns a read-only view on the values of the given field."""
+        return _read_only(self.values[field, : self.size])
+
+    def get_errors(self, field: DatapointField) -> np.ndarray:
+        """Returns a read-only view on the errors of the given field."""
+        return _read_only(self.errors[field, : self.size])
+
+    def get_presence(self, field: DatapointField) -> np.ndarray:
+        """Returns a read-only mask of the rows in which the given field is set."""
+        return _read_only(self.present[field, : self.size])
+
+    def get_present_count(self, field: DatapointField) -> int:
+        return int(self.present_counts[field])
+
+    def get_revision(self, field: DatapointField) -> int:
+        return int(self.revisions[field])
+
+    def get_active_mask(self) -> np.ndarray:
+        """Returns a read-only view on the active flags of all rows."""
+        return _read_only(self.active[: self.size])
+
+
+def find_rows_of_unique_distances(distances: np.ndarray) -> np.ndarray:
+    """
+    Returns one row for every distance, like DatapointCollection.add_datapoint
+    resolves repeated distances: the rows are in the order in which the distances
+    first occur, but a repeated distance is described by its last row.
+    """
+    distances = np.asarray(distances)
+    (_, first_rows) = np.unique(distances, return_index=True)
+    (_, reversed_last_rows) = np.unique(distances[::-1], return_index=True)
+    last_rows = len(distances) - 1 - reversed_last_rows
+    # np.unique sorts by distance, both index arrays refer to the same distances
+    rows: np.ndarray = last_rows[np.argsort(first_rows)]
+
+    return rows
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+
+    return view
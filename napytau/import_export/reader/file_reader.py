@@ -1,6 +1,11 @@
+from hashlib import sha256
+from mmap import ACCESS_COPY, mmap
 from os.path import isfile
 from pathlib import PurePath
-from typing import List
+from typing import Iterator, List, TextIO
+
+CHECKSUM_CHUNK_SIZE = 1 << 20
+ROW_CHUNK_SIZE = 1 << 20
 
 
 class FileReader:
@@ -12,12 +17,25 @@ class FileReader:
         with open(file_path) as file:
             rows = file.readlines()
 
-        return list(
-            map(
-                lambda row: str(row),
-                rows,
-            )
-        )
+        return rows
+
+    @staticmethod
+    def iterate_rows(file_path: PurePath) -> Iterator[str]:
+        """
+        Iterates over the rows of the file like read_rows, but lazily: the file is
+        memory-mapped and every row is only decoded when it is requested, so the
+        rows are never held in memory all at once.
+        """
+        if not isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        try:
+            buffer = FileReader.map_bytes(file_path)
+        except ValueError:
+            # Empty files can not be mapped
+            return iter([])
+
+        return _iterate_mapped_rows(buffer)
 
     @staticmethod
     def read_text(file_path: PurePath) -> str:
@@ -28,3 +46,54 @@ class FileReader:
             text = file.read()
 
         return text
+
+    @staticmethod
+    def calculate_checksum(file_path: PurePath) -> str:
+        """
+        Calculates the SHA-256 checksum of the file as a hexadecimal string.
+        """
+        if not isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        checksum = sha256()
+        with open(file_path, "rb") as file:
+            while chunk := file.read(CHECKSUM_CHUNK_SIZE):
+                checksum.update(chunk)
+
+        return checksum.hexdigest()
+
+    @staticmethod
+    def open_text(file_path: PurePath) -> TextIO:
+        """
+        Opens the file for reading its text incrementally. The caller has to close
+        the returned stream.
+        """
+        if not isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        return open(file_path)
+
+    @staticmethod
+    def map_bytes(file_path: PurePath) -> mmap:
+        """
+        Maps the file into memory, so its bytes are only read from the disk when
+        they are accessed. The mapping is copy-on-write, changes to it are not
+        written back to the file.
+        """
+        if not isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        with open(file_path, "rb") as file:
+            return mmap(file.fileno(), 0, access=ACCESS_COPY)
+
+
+def _iterate_mapped_rows(buffer: mmap) -> Iterator[str]:
+    try:
+        # The rows are decoded in chunks ending at a row boundary, which is much
+        # cheaper than decoding them one by one
+        while chunk := buffer.read(ROW_CHUNK_SIZE):
+            chunk += buffer.readline()
+            # Translate the newlines like files opened in text mode do
+            yield from chunk.replace(b"\r\n", b"\n").decode().splitlines(True)
+    finally:
+        buffer.close()
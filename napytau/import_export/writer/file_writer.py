@@ -1,4 +1,9 @@
+from contextlib import contextmanager
+from os import O_CREAT, O_EXCL, O_WRONLY, fsync, replace, unlink
+from os import open as os_open
 from pathlib import PurePath
+from typing import IO, Any, Iterable, Iterator, TextIO, cast
+from uuid import uuid4
 
 
 class FileWriter:
@@ -13,3 +18,43 @@ class FileWriter:
     def write_text(file_path: PurePath, text: str) -> None:
         with open(file_path, "w") as file:
             file.write(text)
+
+    @staticmethod
+    def write_bytes(file_path: PurePath, chunks: Iterable[bytes]) -> None:
+        """
+        Writes the chunks to a temporary file next to the file path, which then
+        replaces the file at the file path. The replaced file is never truncated,
+        so the chunks may be read from a memory-mapped import of that same file.
+        """
+        with _open_atomically(file_path, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+
+    @staticmethod
+    @contextmanager
+    def open_text_atomically(file_path: PurePath) -> Iterator[TextIO]:
+        """
+        Opens a temporary file next to the file path for writing text incrementally.
+        Once the block completes, the temporary file replaces the file at the file
+        path in one step. If the block raises, the temporary file is removed, so the
+        file at the file path is never left half-written.
+        """
+        with _open_atomically(file_path, "w") as file:
+            yield cast(TextIO, file)
+
+
+@contextmanager
+def _open_atomically(file_path: PurePath, mode: str) -> Iterator[IO[Any]]:
+    temporary_path = file_path.parent / f".{file_path.name}.{uuid4().hex}.tmp"
+    # Unlike tempfile.mkstemp, the temporary file is created with the mode of any
+    # other new file, which the umask is applied to, so it needs no chmod
+    descriptor = os_open(temporary_path, O_CREAT | O_EXCL | O_WRONLY, 0o666)
+    try:
+        with open(descriptor, mode) as file:
+            yield file
+            file.flush()
+            fsync(file.fileno())
+        replace(temporary_path, file_path)
+    except BaseException:
+        unlink(temporary_path)
+        raise
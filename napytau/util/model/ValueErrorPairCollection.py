@@ -1,31 +1,68 @@
+from __future__ import annotations
+
 from napytau.util.model.value_error_pair import ValueErrorPair
-from dataclasses import dataclass
 from typing import List, Iterator
 import numpy as np
 
 
-@dataclass
 class ValueErrorPairCollection[T]:
-    elements: List[ValueErrorPair[T]]
+    """
+    A collection of numeric value error pairs. Values and errors are kept in two
+    separate arrays, so that they can be handed out without copying.
+    """
+
+    values: np.ndarray
+    errors: np.ndarray
+
+    def __init__(self, elements: List[ValueErrorPair[T]]):
+        self.values = np.array(
+            [element.value for element in elements], dtype=float
+        ).reshape(-1)
+        self.errors = np.array(
+            [element.error for element in elements], dtype=float
+        ).reshape(-1)
+
+    @staticmethod
+    def from_arrays(values: np.ndarray, errors: np.ndarray) -> ValueErrorPairCollection:
+        """
+        Creates a collection from two arrays of the same length without copying them.
+        """
+        if values.shape != errors.shape:
+            raise ValueError("Values and errors must have the same shape.")
+
+        collection: ValueErrorPairCollection = ValueErrorPairCollection([])
+        collection.values = values
+        collection.errors = errors
+
+        return collection
+
+    @property
+    def elements(self) -> List[ValueErrorPair[T]]:
+        return [self[index] for index in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.values)
 
     def __getitem__(self, key: int) -> ValueErrorPair[T]:
-        return self.elements[key]
+        return ValueErrorPair(
+            float(self.values[key]),  # type: ignore
+            float(self.errors[key]),  # type: ignore
+        )
 
     def __iter__(self) -> Iterator[ValueErrorPair[T]]:
         return iter(self.elements)
 
-    def get_values(self) -> np.ndarray:
-        values: np.ndarray = np.ndarray(shape=len(self.elements), dtype=float)
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ValueErrorPairCollection):
+            return NotImplemented
 
-        for i in range(len(self.elements)):
-            values[i] = self.elements[i].value  # type: ignore
+        return bool(
+            np.array_equal(self.values, other.values)
+            and np.array_equal(self.errors, other.errors)
+        )
 
-        return values
+    def get_values(self) -> np.ndarray:
+        return self.values
 
     def get_errors(self) -> np.ndarray:
-        errors: np.ndarray = np.zeros(shape=len(self.elements), dtype=float)
-
-        for i in range(len(self.elements)):
-            errors[i] = self.elements[i].error  # type: ignore
-
-        return errors
+        return self.errors
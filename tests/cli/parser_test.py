@@ -29,7 +29,7 @@ class ParserUnitTest(unittest.TestCase):
             from napytau.cli.parser import parse_cli_arguments
 
             parse_cli_arguments()
-            self.assertEqual(len(argument_parser_mock.add_argument.mock_calls), 6)
+            self.assertEqual(len(argument_parser_mock.add_argument.mock_calls), 12)
             self.assertEqual(
                 argument_parser_mock.add_argument.mock_calls[0],
                 (
@@ -46,7 +46,7 @@ class ParserUnitTest(unittest.TestCase):
                         "default": "napytau",
                         "const": "napytau",
                         "nargs": "?",
-                        "choices": ["legacy", "napytau"],
+                        "choices": ["legacy", "napytau", "binary"],
                         "help": "Format of the dataset to ingest",
                     },
                 ),
@@ -99,6 +99,83 @@ class ParserUnitTest(unittest.TestCase):
                 ),
             )
 
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[6],
+                (
+                    ("--batch",),
+                    {
+                        "type": str,
+                        "help": """Path to a directory tree, NaPyTau format file or manifest file of
+        datasets to process in batch mode, only relevant for headless mode""",
+                    },
+                ),
+            )
+
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[7],
+                (
+                    ("--batch_output_file",),
+                    {
+                        "type": str,
+                        "help": """Path to the CSV file the batch results are written to, the results
+        are printed if omitted""",
+                    },
+                ),
+            )
+
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[8],
+                (
+                    ("--batch_worker_count",),
+                    {
+                        "type": int,
+                        "help": """Number of worker processes for batch mode, defaults to the number of
+        CPUs""",
+                    },
+                ),
+            )
+
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[9],
+                (
+                    ("--validation_mode",),
+                    {
+                        "type": str,
+                        "default": "full",
+                        "choices": ["full", "sample", "trusted", "none"],
+                        "help": """How thoroughly the datapoints of NaPyTau format files are validated:
+        all of them, only a sample, none for files with a matching .sha256 checksum
+        file (trusted), or none at all""",
+                    },
+                ),
+            )
+
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[10],
+                (
+                    ("--cache_directory",),
+                    {
+                        "type": str,
+                        "help": """Path to a directory in which calculation results are cached, so they
+        are not recalculated for unchanged datasets, only relevant for headless mode""",
+                    },
+                ),
+            )
+
+            self.assertEqual(
+                argument_parser_mock.add_argument.mock_calls[11],
+                (
+                    ("--fit_mode",),
+                    {
+                        "type": str,
+                        "default": "unweighted",
+                        "choices": ["unweighted", "weighted"],
+                        "help": """Whether the shifted intensities are fitted with equal weights or
+        weighted with their errors, only relevant for headless mode""",
+                    },
+                ),
+            )
+
     def test_returnsACLIArgumentsInstanceFromTheParsedArguments(self):
         """Returns a CLIArguments instance from the parsed arguments"""
         argparse_module_mock, argument_parser_mock, cli_arguments_module_mock = (
@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+
+from napytau.core.active_datapoints import select_active_datapoints
+from napytau.core.time import (
+    calculate_powers_of_times,
+    calculate_times_from_distances_and_relative_velocity,
+)
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _get_dataset_stub() -> DataSet:
+    return DataSet(
+        ValueErrorPair(RelativeVelocity(0.5), RelativeVelocity(0)),
+        DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(float(distance), 0.1),
+                    None,
+                    ValueErrorPair(10.0 * distance, 1.0),
+                    ValueErrorPair(20.0 * distance, 1.0),
+                )
+                for distance in range(1, 5)
+            ]
+        ),
+    )
+
+
+class ActiveDatapointsUnitTest(unittest.TestCase):
+    def test_selectsTheActiveDatapoints(self):
+        """Selects the datapoints of the active mask"""
+        dataset = _get_dataset_stub()
+
+        selected_dataset = select_active_datapoints(
+            dataset, np.array([True, False, True, False])
+        )
+
+        np.testing.assert_array_equal(
+            selected_dataset.get_datapoints().get_distances().get_values(),
+            [1.0, 3.0],
+        )
+        np.testing.assert_array_equal(
+            selected_dataset.get_datapoints().get_unshifted_intensities().get_values(),
+            [20.0, 60.0],
+        )
+        self.assertIs(
+            selected_dataset.get_relative_velocity(), dataset.get_relative_velocity()
+        )
+
+    def test_returnsTheDatasetIfAllDatapointsAreActive(self):
+        """Returns the dataset itself if all datapoints are active"""
+        dataset = _get_dataset_stub()
+
+        self.assertIs(
+            select_active_datapoints(dataset, np.ones(4, dtype=bool)), dataset
+        )
+
+    def test_reusesTheSelectionWhileTheMaskAndDatasetAreUnchanged(self):
+        """Reuses the selection while the mask and the dataset are unchanged"""
+        dataset = _get_dataset_stub()
+        active_mask = np.array([True, False, True, True])
+
+        selected_dataset = select_active_datapoints(dataset, active_mask)
+
+        self.assertIs(
+            select_active_datapoints(dataset, active_mask.copy()), selected_dataset
+        )
+        self.assertIsNot(
+            select_active_datapoints(dataset, np.array([False, True, True, True])),
+            selected_dataset,
+        )
+
+        dataset.get_datapoints()[0].set_distance(ValueErrorPair(1.5, 0.1))
+        reselected_dataset = select_active_datapoints(dataset, active_mask)
+
+        np.testing.assert_array_equal(
+            reselected_dataset.get_datapoints().get_distances().get_values(),
+            [1.5, 3.0, 4.0],
+        )
+
+    def test_indexesTheCachedFlightTimes(self):
+        """Indexes the cached flight times and their powers with the mask"""
+        dataset = _get_dataset_stub()
+        active_mask = np.array([False, True, True, True])
+        times = calculate_times_from_distances_and_relative_velocity(dataset)
+        powers = calculate_powers_of_times(dataset, 2)
+
+        selected_dataset = select_active_datapoints(dataset, active_mask)
+
+        np.testing.assert_array_equal(
+            calculate_times_from_distances_and_relative_velocity(selected_dataset),
+            times[active_mask],
+        )
+        np.testing.assert_array_equal(
+            calculate_powers_of_times(selected_dataset, 2), powers[active_mask]
+        )
+
+    def test_raisesAnErrorIfTheMaskDoesNotMatchTheDatapoints(self):
+        """Raises an error if the mask does not match the datapoints"""
+        with self.assertRaises(ValueError):
+            select_active_datapoints(_get_dataset_stub(), np.ones(3, dtype=bool))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -844,7 +844,10 @@ class ChiUnitTest(unittest.TestCase):
                 "numpy": numpy_module_mock,
             },
         ):
-            from napytau.core.chi import optimize_tau_factor
+            from napytau.core.chi import (
+                optimize_tau_factor,
+                TAU_FACTOR_OPTIMIZATION_NUMERIC,
+            )
 
             initial_coefficients: np.ndarray = np.array([1, 1, 1])
             datapoints = DatapointCollection(
@@ -873,6 +876,7 @@ class ChiUnitTest(unittest.TestCase):
                 weight_factor,
                 initial_coefficients,
                 t_hyp_range,
+                TAU_FACTOR_OPTIMIZATION_NUMERIC,
             )
 
             self.assertEqual(actual_t_hyp, expected_t_hyp)
@@ -903,3 +907,141 @@ class ChiUnitTest(unittest.TestCase):
             self.assertEqual(len(numpy_module_mock.mean.mock_calls), 1)
 
             self.assertEqual(numpy_module_mock.mean.mock_calls[0].args[0], (-5, 5))
+
+    def test_CanCalculateTheOptimalTHypValueAnalytically(self):
+        """Can calculate the optimal t_hyp value analytically"""
+        polynomials_mock, _, _ = set_up_mocks()
+        polynomials_mock.evaluate_differentiated_polynomial_at_measuring_times.return_value = np.array(
+            [1.0, 2.0, 4.0]
+        )
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.polynomials": polynomials_mock,
+            },
+        ):
+            from napytau.core.chi import optimize_tau_factor
+
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(0.0, 0.16),
+                        None,
+                        ValueErrorPair(2, 1),
+                        ValueErrorPair(3, 1),
+                    ),
+                    Datapoint(
+                        ValueErrorPair(1.0, 0.16),
+                        None,
+                        ValueErrorPair(6, 1),
+                        ValueErrorPair(4, 2),
+                    ),
+                    Datapoint(
+                        ValueErrorPair(2.0, 0.16),
+                        None,
+                        ValueErrorPair(7, 1),
+                        ValueErrorPair(10, 1),
+                    ),
+                ]
+            )
+            dataset = _get_dataset_stub(datapoints)
+            coefficients = np.array([1, 1, 1])
+
+            actual_t_hyp = optimize_tau_factor(dataset, 1.0, coefficients, (-5, 5))
+            clipped_t_hyp = optimize_tau_factor(dataset, 1.0, coefficients, (-5, 1))
+
+        # sum(I_us * P' / s^2) / sum(P'^2 / s^2) = (3 + 2 + 40) / (1 + 1 + 16)
+        self.assertAlmostEqual(actual_t_hyp, 2.5)
+        self.assertEqual(clipped_t_hyp, 1.0)
+
+    def test_ReturnsTheMeanOfTheRangeIfTHypHasNoInfluence(self):
+        """Returns the mean of the range if t_hyp has no influence"""
+        polynomials_mock, _, _ = set_up_mocks()
+        polynomials_mock.evaluate_differentiated_polynomial_at_measuring_times.return_value = np.array(
+            [1.0, 2.0]
+        )
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.polynomials": polynomials_mock,
+            },
+        ):
+            from napytau.core.chi import optimize_tau_factor
+
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(0.0, 0.16),
+                        None,
+                        ValueErrorPair(2, 1),
+                        ValueErrorPair(3, 1),
+                    ),
+                    Datapoint(
+                        ValueErrorPair(1.0, 0.16),
+                        None,
+                        ValueErrorPair(6, 1),
+                        ValueErrorPair(4, 2),
+                    ),
+                ]
+            )
+
+            actual_t_hyp = optimize_tau_factor(
+                _get_dataset_stub(datapoints), 0.0, np.array([1, 1]), (-2, 6)
+            )
+
+        self.assertEqual(actual_t_hyp, 2.0)
+
+    def test_CanOptimizeTHypValueAndCoefficientsJointly(self):
+        """Can optimize the t_hyp value and the coefficients jointly"""
+        with patch.dict("sys.modules"):
+            from napytau.core.chi import (
+                calculate_chi_squared,
+                optimize_tau_factor_and_coefficients,
+            )
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_chi_squared,
+            )
+
+        datapoints = DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(distance, 0.16),
+                    None,
+                    ValueErrorPair(shifted, 0.5),
+                    ValueErrorPair(unshifted, 0.5),
+                )
+                for distance, shifted, unshifted in [
+                    (1.0, 10.2, 1.1),
+                    (2.0, 7.9, 0.8),
+                    (3.0, 6.1, 0.7),
+                    (4.0, 5.2, 0.4),
+                    (5.0, 4.1, 0.5),
+                ]
+            ]
+        )
+        dataset = _get_dataset_stub(datapoints)
+
+        t_hyp, coefficients = optimize_tau_factor_and_coefficients(
+            dataset, 1.0, 2, (-10, 0)
+        )
+
+        # No other t_hyp value with its optimal coefficients is better
+        minimal_chi_squared = calculate_chi_squared(dataset, coefficients, t_hyp, 1.0)
+        for other_t_hyp in np.linspace(-10, 0, 41):
+            self.assertLessEqual(
+                minimal_chi_squared,
+                calculate_chi_squared(
+                    dataset,
+                    calculate_polynomial_coefficients_for_chi_squared(
+                        dataset, other_t_hyp, 1.0, 2
+                    ),
+                    other_t_hyp,
+                    1.0,
+                )
+                + 1e-6,
+            )
+        self.assertEqual(len(coefficients), 3)
+        self.assertGreater(t_hyp, -10)
+        self.assertLess(t_hyp, 0)
@@ -174,3 +174,308 @@ class CoreUnitTest(unittest.TestCase):
                 tau_final_mock.calculate_tau_final.mock_calls[0].args[1],
                 np.array([0.6, 0.2]),
             )
+
+    def test_ReturnsTheCachedLifetimeIfACacheIsGiven(self):
+        """Returns the cached lifetime if a cache is given"""
+        chi_mock, tau_mock, delta_tau_mock, tau_final_mock, polynomial_mock = (
+            set_up_mocks()
+        )
+        cache_mock = MagicMock()
+        cache_mock.get_or_calculate.return_value = (1.8, 0.18973666)
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.chi": chi_mock,
+                "napytau.core.tau": tau_mock,
+                "napytau.core.delta_tau": delta_tau_mock,
+                "napytau.core.tau_final": tau_final_mock,
+                "napytau.core.polynomials": polynomial_mock,
+            },
+        ):
+            from napytau.core.core import calculate_lifetime_for_custom_tau_factor
+
+            dataset = _get_dataset_stub(DatapointCollection([]))
+
+            actual_result = calculate_lifetime_for_custom_tau_factor(
+                dataset, 1.0, 2, cache=cache_mock
+            )
+
+            self.assertEqual(actual_result, (1.8, 0.18973666))
+            self.assertEqual(len(cache_mock.get_or_calculate.mock_calls), 1)
+            self.assertEqual(
+                cache_mock.get_or_calculate.mock_calls[0].args[:3],
+                ("lifetime_for_custom_tau_factor", dataset, (1.0, 2)),
+            )
+            self.assertEqual(len(tau_final_mock.calculate_tau_final.mock_calls), 0)
+
+    def test_UsesOnlyTheDatapointsOfTheActiveMask(self):
+        """Uses only the datapoints of the active mask"""
+        chi_mock, tau_mock, delta_tau_mock, tau_final_mock, polynomial_mock = (
+            set_up_mocks()
+        )
+        polynomial_mock.calculate_polynomial_coefficients_for_tau_factor.return_value = np.array(
+            [1, 1, 1]
+        )
+        tau_final_mock.calculate_tau_final.return_value = (1.8, 0.18973666)
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.chi": chi_mock,
+                "napytau.core.tau": tau_mock,
+                "napytau.core.delta_tau": delta_tau_mock,
+                "napytau.core.tau_final": tau_final_mock,
+                "napytau.core.polynomials": polynomial_mock,
+            },
+        ):
+            from napytau.core.core import calculate_lifetime_for_custom_tau_factor
+
+            dataset = _get_dataset_stub(
+                DatapointCollection(
+                    [
+                        Datapoint(ValueErrorPair(0.0, 0.16)),
+                        Datapoint(ValueErrorPair(1.0, 0.16)),
+                        Datapoint(ValueErrorPair(2.0, 0.16)),
+                    ]
+                )
+            )
+
+            calculate_lifetime_for_custom_tau_factor(
+                dataset, 1.0, 2, active_mask=np.array([True, False, True])
+            )
+
+            selected_dataset = polynomial_mock.calculate_polynomial_coefficients_for_tau_factor.mock_calls[
+                0
+            ].args[0]
+            np.testing.assert_array_equal(
+                selected_dataset.get_datapoints().get_distances().get_values(),
+                [0.0, 2.0],
+            )
+            self.assertIs(
+                tau_mock.calculate_tau_i_values.mock_calls[0].args[0], selected_dataset
+            )
+
+    def test_PassesTheCovarianceMatrixOfAWeightedFitToTheErrorPropagation(self):
+        """Passes the covariance matrix of a weighted fit to the error propagation"""
+        chi_mock, tau_mock, delta_tau_mock, tau_final_mock, polynomial_mock = (
+            set_up_mocks()
+        )
+        polynomial_mock.FIT_MODE_UNWEIGHTED = "unweighted"
+        polynomial_mock.FIT_MODE_WEIGHTED = "weighted"
+        covariance_matrix = np.array([[1.0, 0.1], [0.1, 2.0]])
+        polynomial_mock.calculate_weighted_polynomial_fit.return_value = (
+            np.array([2.0, 3.0]),
+            covariance_matrix,
+        )
+        tau_final_mock.calculate_tau_final.return_value = (1.8, 0.18973666)
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.chi": chi_mock,
+                "napytau.core.tau": tau_mock,
+                "napytau.core.delta_tau": delta_tau_mock,
+                "napytau.core.tau_final": tau_final_mock,
+                "napytau.core.polynomials": polynomial_mock,
+            },
+        ):
+            from napytau.core.core import calculate_lifetime_for_fit
+
+            dataset = _get_dataset_stub(DatapointCollection([]))
+
+            actual_result = calculate_lifetime_for_fit(dataset, 1, fit_mode="weighted")
+
+            self.assertEqual(actual_result, (1.8, 0.18973666))
+            self.assertEqual(
+                len(
+                    polynomial_mock.calculate_polynomial_coefficients_for_fit.mock_calls
+                ),
+                0,
+            )
+            np.testing.assert_array_equal(
+                tau_mock.calculate_tau_i_values.mock_calls[0].args[1],
+                np.array([2.0, 3.0]),
+            )
+            self.assertIs(
+                delta_tau_mock.calculate_error_propagation_terms.mock_calls[0].kwargs[
+                    "covariance_matrix"
+                ],
+                covariance_matrix,
+            )
+
+    def test_CanCalculateLifetimesForAnArrayOfTauFactors(self):
+        """Can calculate lifetimes for an array of tau factors"""
+        with patch.dict("sys.modules"):
+            from napytau.core.chi import calculate_chi_squared
+            from napytau.core.core import (
+                calculate_lifetime_for_custom_tau_factor,
+                calculate_lifetimes_for_tau_factors,
+            )
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+            )
+
+        dataset = _get_dataset_stub(
+            DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(distance, 0.1),
+                        None,
+                        ValueErrorPair(shifted, 0.5),
+                        ValueErrorPair(unshifted, 0.3),
+                    )
+                    for distance, shifted, unshifted in [
+                        (1.0, 10.0, 1.1),
+                        (2.0, 8.0, 0.9),
+                        (3.0, 6.5, 0.7),
+                        (4.0, 5.1, 0.5),
+                    ]
+                ]
+            )
+        )
+        tau_factors = np.array([0.5, 2.0, 5.0])
+
+        taus, delta_taus, chi_squared_values = calculate_lifetimes_for_tau_factors(
+            dataset, tau_factors, 3
+        )
+
+        self.assertEqual(len(taus), 3)
+        for index, tau_factor in enumerate(tau_factors):
+            expected_tau, expected_delta_tau = calculate_lifetime_for_custom_tau_factor(
+                dataset, tau_factor, 3
+            )
+            expected_chi_squared = calculate_chi_squared(
+                dataset,
+                calculate_polynomial_coefficients_for_tau_factor(
+                    dataset, tau_factor, 3
+                ),
+                tau_factor,
+                1.0,
+            )
+
+            self.assertAlmostEqual(taus[index], expected_tau)
+            self.assertAlmostEqual(delta_taus[index], expected_delta_tau)
+            self.assertAlmostEqual(chi_squared_values[index], expected_chi_squared)
+
+    def test_CalculatesTheChiSquaredOfPolynomialsInIncreasingOrderOfDegree(self):
+        """Evaluates the coefficients of the tau factors from the lowest power up"""
+        with patch.dict("sys.modules"):
+            from napytau.core.chi import calculate_chi_squared
+            from napytau.core.core import calculate_lifetimes_for_tau_factors
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+            )
+
+        distances = np.array([1.0, 2.0, 3.0, 4.0])
+        shifted_intensities = np.array([10.0, 8.0, 6.5, 5.1])
+        unshifted_intensities = np.array([1.1, 0.9, 0.7, 0.5])
+        dataset = _get_dataset_stub(
+            DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(distance, 0.1),
+                        None,
+                        ValueErrorPair(shifted, 0.5),
+                        ValueErrorPair(unshifted, 0.3),
+                    )
+                    for distance, shifted, unshifted in zip(
+                        distances, shifted_intensities, unshifted_intensities
+                    )
+                ]
+            )
+        )
+        tau_factors = np.array([0.5, 2.0])
+
+        (_, _, chi_squared_values) = calculate_lifetimes_for_tau_factors(
+            dataset, tau_factors, 3
+        )
+
+        for index, tau_factor in enumerate(tau_factors):
+            coefficients = calculate_polynomial_coefficients_for_tau_factor(
+                dataset, tau_factor, 3
+            )
+            # The times equal the distances for the velocity of the dataset stub
+            expected_chi_squared = np.sum(
+                np.power(
+                    (
+                        shifted_intensities
+                        - np.polynomial.polynomial.polyval(distances, coefficients)
+                    )
+                    / 0.5,
+                    2,
+                )
+                + np.power(
+                    (
+                        unshifted_intensities
+                        - tau_factor
+                        * np.polynomial.polynomial.polyval(
+                            distances, np.polynomial.polynomial.polyder(coefficients)
+                        )
+                    )
+                    / 0.3,
+                    2,
+                )
+            )
+
+            self.assertAlmostEqual(
+                calculate_chi_squared(dataset, coefficients, tau_factor, 1.0)
+                / expected_chi_squared,
+                1.0,
+            )
+            self.assertAlmostEqual(
+                chi_squared_values[index] / expected_chi_squared, 1.0
+            )
+
+    def test_CanScanTheLifetimesOfSortedTauFactors(self):
+        """Can scan the lifetimes of tau factors in increasing order"""
+        with patch.dict("sys.modules"):
+            from napytau.core.chi import calculate_chi_squared
+            from napytau.core.core import (
+                calculate_lifetime_for_custom_tau_factor,
+                scan_lifetimes_for_tau_factors,
+            )
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+            )
+
+        dataset = _get_dataset_stub(
+            DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(distance, 0.1),
+                        None,
+                        ValueErrorPair(shifted, 0.5),
+                        ValueErrorPair(unshifted, 0.3),
+                    )
+                    for distance, shifted, unshifted in [
+                        (1.0, 10.0, 1.1),
+                        (2.0, 8.0, 0.9),
+                        (3.0, 6.5, 0.7),
+                        (4.0, 5.1, 0.5),
+                    ]
+                ]
+            )
+        )
+
+        results = list(
+            scan_lifetimes_for_tau_factors(dataset, np.array([5.0, 0.5, 2.0]), 3)
+        )
+
+        self.assertEqual([result[0] for result in results], [0.5, 2.0, 5.0])
+        for tau_factor, tau, delta_tau, chi_squared in results:
+            expected_tau, expected_delta_tau = calculate_lifetime_for_custom_tau_factor(
+                dataset, tau_factor, 3
+            )
+            expected_chi_squared = calculate_chi_squared(
+                dataset,
+                calculate_polynomial_coefficients_for_tau_factor(
+                    dataset, tau_factor, 3
+                ),
+                tau_factor,
+                1.0,
+            )
+
+            self.assertAlmostEqual(tau / expected_tau, 1.0, places=4)
+            self.assertAlmostEqual(delta_tau / expected_delta_tau, 1.0, places=4)
+            self.assertAlmostEqual(chi_squared / expected_chi_squared, 1.0, places=4)
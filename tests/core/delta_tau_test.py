@@ -30,6 +30,18 @@ def set_up_mocks() -> (MagicMock, MagicMock, MagicMock, MagicMock):
     return polynomial_module_mock, zeros_mock, numpy_module_mock
 
 
+def set_up_time_module_mock(times: np.ndarray) -> MagicMock:
+    time_module_mock = MagicMock()
+    time_module_mock.calculate_powers_of_times = MagicMock()
+    time_module_mock.calculate_powers_of_times.side_effect = (
+        lambda dataset, max_exponent: np.vander(
+            times, max_exponent + 1, increasing=True
+        )
+    )
+
+    return time_module_mock
+
+
 def _get_dataset_stub(datapoints: DatapointCollection) -> DataSet:
     return DataSet(
         ValueErrorPair(RelativeVelocity(1 / 299792458), RelativeVelocity(0)),
@@ -39,26 +51,29 @@ def _get_dataset_stub(datapoints: DatapointCollection) -> DataSet:
 
 class DeltaTauUnitTests(unittest.TestCase):
     @staticmethod
-    def test_canCalculateAJacobianMatrixFromDistancesAndCoefficients():
-        """Can calculate a Jacobian matrix from distances and coefficients."""
+    def test_canCalculateAJacobianMatrixWithFiniteDifferences():
+        """Can calculate a Jacobian matrix with finite differences."""
         polynomial_module_mock, zeros_mock, numpy_module_mock = set_up_mocks()
 
         zeros_mock.return_value = np.array([[0, 0], [0, 0], [0, 0]])
         polynomial_module_mock.evaluate_polynomial_at_measuring_times.side_effect = [
-            6,
-            3,
-            2,
             1,
+            4,
+            2,
         ]
 
         with patch.dict(
             "sys.modules",
             {
                 "napytau.core.polynomials": polynomial_module_mock,
+                "napytau.core.time": set_up_time_module_mock(np.array([])),
                 "numpy": numpy_module_mock,
             },
         ):
-            from napytau.core.delta_tau import calculate_jacobian_matrix
+            from napytau.core.delta_tau import (
+                calculate_jacobian_matrix,
+                JACOBIAN_METHOD_FINITE_DIFFERENCES,
+            )
 
             coefficients = np.array([5, 4])
             datapoints = DatapointCollection(
@@ -74,31 +89,101 @@ class DeltaTauUnitTests(unittest.TestCase):
             )
 
             np.testing.assert_array_equal(
-                calculate_jacobian_matrix(_get_dataset_stub(datapoints), coefficients),
+                calculate_jacobian_matrix(
+                    _get_dataset_stub(datapoints),
+                    coefficients,
+                    JACOBIAN_METHOD_FINITE_DIFFERENCES,
+                ),
                 jacobian_matrix,
             )
 
-    def test_canCalculateACovarianceMatrixFromTimesAndCoefficients(self):
-        """Can calculate a Covariance matrix from times and coefficients."""
-        polynomial_module_mock, zeros_mock, numpy_module_mock = set_up_mocks()
+    def test_canCalculateAJacobianMatrixAnalyticallyFromTheTimes(self):
+        """Can calculate a Jacobian matrix analytically from the times."""
+        polynomial_module_mock, _, _ = set_up_mocks()
+        time_module_mock = set_up_time_module_mock(np.array([1.0, 2.0, 3.0]))
 
-        zeros_mock.return_value = np.array([[0, 0], [0, 0], [0, 0]])
-        polynomial_module_mock.evaluate_polynomial_at_measuring_times.side_effect = (
-            lambda datapoints, coefficients: (np.array([6, 3, 2]))
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.polynomials": polynomial_module_mock,
+                "napytau.core.time": time_module_mock,
+            },
+        ):
+            from napytau.core.delta_tau import calculate_jacobian_matrix
+
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(ValueErrorPair(1, 0.16)),
+                    Datapoint(ValueErrorPair(2, 0.16)),
+                    Datapoint(ValueErrorPair(3, 0.16)),
+                ]
+            )
+            dataset = _get_dataset_stub(datapoints)
+
+            jacobian_matrix = calculate_jacobian_matrix(
+                dataset, np.array([5.0, 4.0, 3.0])
+            )
+
+        np.testing.assert_array_equal(
+            jacobian_matrix,
+            np.array([[1, 1, 1], [1, 2, 4], [1, 3, 9]]),
+        )
+        self.assertEqual(
+            time_module_mock.calculate_powers_of_times.mock_calls[0].args,
+            (dataset, 2),
         )
-        numpy_module_mock.power.return_value = np.array([4, 9, 16])
-        numpy_module_mock.diag.return_value = np.array(
-            [[1 / 4, 0, 0], [0, 1 / 9, 0], [0, 0, 1 / 16]]
+        polynomial_module_mock.evaluate_polynomial_at_measuring_times.assert_not_called()
+
+    def test_analyticJacobianMatrixMatchesFiniteDifferences(self):
+        """The analytic Jacobian matrix matches the finite differences one."""
+        # the module is imported freshly and dropped again to not leak into the
+        # tests mocking its dependencies
+        with patch.dict("sys.modules"):
+            from napytau.core.delta_tau import (
+                calculate_jacobian_matrix,
+                JACOBIAN_METHOD_FINITE_DIFFERENCES,
+            )
+
+        datapoints = DatapointCollection(
+            [
+                Datapoint(ValueErrorPair(1.0, 0.16)),
+                Datapoint(ValueErrorPair(2.0, 0.16)),
+                Datapoint(ValueErrorPair(3.0, 0.16)),
+            ]
         )
-        numpy_module_mock.linalg.inv.return_value = np.array(
-            [[-0.13826047, 0.41478141], [0.41478141, -1.24434423]]
+        dataset = _get_dataset_stub(datapoints)
+        coefficients = np.array([5.0, 4.0, 3.0])
+
+        np.testing.assert_allclose(
+            calculate_jacobian_matrix(dataset, coefficients),
+            calculate_jacobian_matrix(
+                dataset, coefficients, JACOBIAN_METHOD_FINITE_DIFFERENCES
+            ),
+            rtol=1e-4,
         )
 
+    def test_raisesAnErrorForAnUnknownJacobianMethod(self):
+        """Raises an error for an unknown Jacobian method."""
+        with patch.dict("sys.modules"):
+            from napytau.core.delta_tau import calculate_jacobian_matrix
+
+        datapoints = DatapointCollection([Datapoint(ValueErrorPair(1.0, 0.16))])
+
+        with self.assertRaises(ValueError):
+            calculate_jacobian_matrix(
+                _get_dataset_stub(datapoints), np.array([1.0]), "unknown"
+            )
+
+    def test_canCalculateACovarianceMatrixFromTimesAndCoefficients(self):
+        """Can calculate a Covariance matrix from times and coefficients."""
+        polynomial_module_mock, _, _ = set_up_mocks()
+        time_module_mock = set_up_time_module_mock(np.array([0, 1, 2]))
+
         with patch.dict(
             "sys.modules",
             {
                 "napytau.core.polynomials": polynomial_module_mock,
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.delta_tau import calculate_covariance_matrix
@@ -112,71 +197,85 @@ class DeltaTauUnitTests(unittest.TestCase):
             )
             coefficients = np.array([5, 4])
 
-            np.testing.assert_array_equal(
-                calculate_covariance_matrix(
-                    _get_dataset_stub(datapoints), coefficients
-                ),
-                np.array([[-0.13826047, 0.41478141], [0.41478141, -1.24434423]]),
+            covariance_matrix = calculate_covariance_matrix(
+                _get_dataset_stub(datapoints), coefficients
             )
 
-            self.assertEqual(zeros_mock.mock_calls[0].args[0], (3, 2))
+        # J^T W J with W = diag(1/4, 1/9, 1/16)
+        np.testing.assert_allclose(
+            covariance_matrix,
+            np.linalg.inv(np.array([[61 / 144, 34 / 144], [34 / 144, 52 / 144]])),
+        )
 
-            self.assertIsInstance(
-                polynomial_module_mock.evaluate_polynomial_at_measuring_times.mock_calls[
-                    0
-                ].args[0],
-                DataSet,
+        self.assertIsInstance(
+            time_module_mock.calculate_powers_of_times.mock_calls[0].args[0],
+            DataSet,
+        )
+        self.assertEqual(
+            time_module_mock.calculate_powers_of_times.mock_calls[0].args[1], 1
+        )
+        polynomial_module_mock.evaluate_polynomial_at_measuring_times.assert_not_called()
+
+    def test_reportsTheConditionNumberOfTheWeightedJacobianMatrix(self):
+        """Reports the condition number of the weighted jacobian matrix."""
+        times = np.linspace(0.0, 1.0, 20)
+        errors = np.linspace(1.0, 2.0, 20)
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.polynomials": MagicMock(),
+                "napytau.core.time": set_up_time_module_mock(times),
+            },
+        ):
+            from napytau.core.delta_tau import (
+                calculate_covariance_matrix_and_condition_number,
             )
-            np.testing.assert_array_equal(
-                polynomial_module_mock.evaluate_polynomial_at_measuring_times.mock_calls[
-                    0
+
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(time, 0.16), None, ValueErrorPair(0, error)
+                    )
+                    for (time, error) in zip(times, errors)
                 ]
-                .args[0]
-                .get_datapoints()
-                .get_distances()
-                .get_values(),
-                np.array([0, 1, 2]),
             )
 
-    def test_CanCalculateTheErrorPropagation(self):
-        """Can calculate the error propagation"""
-        polynomial_module_mock, zeros_mock, numpy_module_mock = set_up_mocks()
+            (
+                covariance_matrix,
+                condition_number,
+            ) = calculate_covariance_matrix_and_condition_number(
+                _get_dataset_stub(datapoints), np.zeros(6)
+            )
 
-        zeros_mock.side_effect = [
-            np.array([0, 0, 0]),
-            np.array([[0, 0], [0, 0], [0, 0]]),
-        ]
-        polynomial_module_mock.evaluate_polynomial_at_measuring_times.side_effect = [
-            6,
-            3,
-            2,
-            1,
-        ]
-        numpy_module_mock.power.return_value = np.array([4, 9, 16])
-        numpy_module_mock.diag.return_value = np.array(
-            [[1 / 4, 0, 0], [0, 1 / 9, 0], [0, 0, 1 / 16]]
+        weighted_jacobian_matrix = (
+            np.vander(times, 6, increasing=True) / errors[:, np.newaxis]
+        )
+        np.testing.assert_allclose(
+            covariance_matrix,
+            np.linalg.inv(weighted_jacobian_matrix.T @ weighted_jacobian_matrix),
+            rtol=1e-6,
         )
-        numpy_module_mock.linalg.inv.return_value = np.array(
-            [[-0.13826047, 0.41478141], [0.41478141, -1.24434423]]
+        self.assertAlmostEqual(
+            condition_number,
+            np.linalg.cond(
+                weighted_jacobian_matrix
+                / np.linalg.norm(weighted_jacobian_matrix, axis=0)
+            ),
+            delta=1e-6 * condition_number,
         )
 
-        numpy_module_mock.power.side_effect = [
-            np.array([25, 36, 49]),
-            np.array([16, 16, 16]),
-            np.array([4, 9, 16]),
-            np.array([1, 1, 1]),
-            np.array([1, 1, 1]),
-            np.array([1, 1, 1]),
-            np.array([0, 1, 2]),
-            np.array([0, 1, 2]),
-            np.array([1, 1, 1]),
-            np.array([0, 1, 2]),
-            np.array([0, 1, 2]),
-            np.array([16, 25, 36]),
-            np.array([256, 256, 256]),
-            np.array([2.60475853e26, 2.60475853e26, 2.60475853e26]),
-            np.array([64, 64, 64]),
-        ]
+    def test_CanCalculateTheErrorPropagation(self):
+        """Can calculate the error propagation"""
+        polynomial_module_mock, zeros_mock, numpy_module_mock = set_up_mocks()
+
+        # used actual implementation for the vectorised calculations
+        numpy_module_mock.zeros = np.zeros
+        numpy_module_mock.diag = np.diag
+        numpy_module_mock.power = np.power
+        numpy_module_mock.sum = np.sum
+        numpy_module_mock.einsum = np.einsum
+        numpy_module_mock.vander = np.vander
 
         polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.return_value = np.array(
             [4, 4, 4]
@@ -186,6 +285,7 @@ class DeltaTauUnitTests(unittest.TestCase):
             "sys.modules",
             {
                 "napytau.core.polynomials": polynomial_module_mock,
+                "napytau.core.time": set_up_time_module_mock(np.array([0, 1, 2])),
                 "numpy": numpy_module_mock,
             },
         ):
@@ -222,154 +322,90 @@ class DeltaTauUnitTests(unittest.TestCase):
                 _get_dataset_stub(datapoints),
                 coefficients,
                 taufactor,
+                covariance_matrix=np.array(
+                    [[-0.13826047, 0.41478141], [0.41478141, -1.24434423]]
+                ),
             )
 
-            self.assertEqual(
-                polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.mock_calls[
-                    0
-                ].args[0],
-                _get_dataset_stub(datapoints),
-            )
-            np.testing.assert_array_equal(
-                polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.mock_calls[
-                    0
-                ].args[1],
-                np.array([5, 4]),
-            )
+        self.assertEqual(
+            polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.mock_calls[
+                0
+            ].args[0],
+            _get_dataset_stub(datapoints),
+        )
+        np.testing.assert_array_equal(
+            polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.mock_calls[
+                0
+            ].args[1],
+            np.array([5, 4]),
+        )
 
-            self.assertEqual(
-                len(numpy_module_mock.power.mock_calls),
-                15,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[0].args[0],
-                np.array([5, 6, 7]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[0].args[1],
-                2,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[1].args[0],
-                np.array([4, 4, 4]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[1].args[1],
-                2,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[2].args[0],
-                np.array([2, 3, 4]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[2].args[1],
-                2,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[3].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[3].args[1],
-                0,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[4].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[4].args[1],
-                0,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[5].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[5].args[1],
-                0,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[6].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[6].args[1],
-                1,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[7].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[7].args[1],
-                1,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[8].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[8].args[1],
-                0,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[9].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[9].args[1],
-                1,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[10].args[0],
-                np.array([0, 1, 2]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[10].args[1],
-                1,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[11].args[0],
-                np.array([4, 5, 6]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[11].args[1],
-                2,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[12].args[0],
-                np.array([4, 4, 4]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[12].args[1],
-                4,
-            )
-            np.testing.assert_allclose(
-                numpy_module_mock.power.mock_calls[13].args[0],
-                np.array([-0.13826, -0.553042, -3.456512]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[13].args[1],
-                2,
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[14].args[0],
-                np.array([4, 4, 4]),
-            )
-            np.testing.assert_array_equal(
-                numpy_module_mock.power.mock_calls[14].args[1],
-                3,
+        # delta_p_j_i_squared = sum_k sum_l d^k * d^l * cov[k, l]
+        # = [-0.13826047, -0.55304188, -3.45651175]
+        # errors = dI_us^2 / P'^2 + I_us^2 / P'^4 * delta_p^4
+        # + I_us * taufactor * delta_p^2 / P'^3
+        gaussian_error_propagation_terms = np.array(
+            [1.56023824, 2.26258612, 4.61299427]
+        )
+
+        np.testing.assert_allclose(
+            calculated_error_propagation_terms,
+            gaussian_error_propagation_terms,
+        )
+
+    def test_CanCalculateTheContributionsToTheErrorPropagation(self):
+        """Can calculate the contributions to the error propagation separately"""
+        polynomial_module_mock, _, _ = set_up_mocks()
+        polynomial_module_mock.evaluate_differentiated_polynomial_at_measuring_times.return_value = np.array(
+            [4.0, 4.0, 4.0]
+        )
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.polynomials": polynomial_module_mock,
+                "napytau.core.time": set_up_time_module_mock(np.array([0, 1, 2])),
+            },
+        ):
+            from napytau.core.delta_tau import (
+                calculate_error_propagation_term_breakdown,
+                calculate_error_propagation_terms,
             )
 
-            gaussian_error_propagation_terms = np.array(
-                [1.627974e25, 2.543710e25, 3.662942e25]
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(float(distance), 0.16),
+                        None,
+                        ValueErrorPair(0, 2),
+                        ValueErrorPair(4, 2),
+                    )
+                    for distance in range(3)
+                ]
             )
+            covariance_matrix = np.array([[1.0, 0.5], [0.5, 2.0]])
 
-            np.testing.assert_allclose(
-                calculated_error_propagation_terms,
-                gaussian_error_propagation_terms,
+            breakdown = calculate_error_propagation_term_breakdown(
+                _get_dataset_stub(datapoints),
+                np.array([5, 4]),
+                0.5,
+                covariance_matrix,
             )
+            total = calculate_error_propagation_terms(
+                _get_dataset_stub(datapoints),
+                np.array([5, 4]),
+                0.5,
+                covariance_matrix,
+            )
+
+        # delta_p^2 = cov[0, 0] + 2 * d * cov[0, 1] + d^2 * cov[1, 1]
+        np.testing.assert_allclose(breakdown.polynomial_variances, [1.0, 4.0, 11.0])
+        np.testing.assert_allclose(breakdown.unshifted_intensity_terms, [0.25] * 3)
+        np.testing.assert_allclose(
+            breakdown.polynomial_uncertainty_terms, [1 / 16, 1.0, 121 / 16]
+        )
+        np.testing.assert_allclose(breakdown.covariance_terms, [1 / 32, 1 / 8, 11 / 32])
+        np.testing.assert_allclose(breakdown.get_total(), total)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import unittest
+
+import numpy as np
+
+from napytau.core.errors.polynomial_coefficient_error import (
+    PolynomialCoefficientError,
+)
+from napytau.core.incremental_fit import (
+    INCREMENTAL_FIT_REFACTORIZATION_INTERVAL,
+    IncrementalPolynomialFit,
+)
+
+
+def _get_points_stub() -> (np.ndarray, np.ndarray, np.ndarray):
+    x = np.linspace(10.0, 5000.0, 50)
+    y = 100 * np.exp(-x / 1000) + np.sin(x)
+    weights = 1 / (1 + np.cos(x) ** 2)
+
+    return x, y, weights
+
+
+class IncrementalPolynomialFitUnitTest(unittest.TestCase):
+    def test_fitsThePolynomialToAllPoints(self):
+        """Fits the polynomial to all points"""
+        x, y, weights = _get_points_stub()
+
+        polynomial_fit = IncrementalPolynomialFit(x, y, 3, weights)
+
+        np.testing.assert_allclose(
+            polynomial_fit.get_coefficients(),
+            np.polynomial.Polynomial.fit(x, y, 3, w=weights).convert().coef,
+        )
+
+    def test_updatesTheFitWhenPointsAreToggled(self):
+        """Updates the fit when single points are toggled"""
+        x, y, weights = _get_points_stub()
+        polynomial_fit = IncrementalPolynomialFit(x, y, 3, weights)
+        active_mask = np.ones(len(x), dtype=bool)
+
+        for row in [3, 7, 3, 20, 49, 0, 7]:
+            active_mask[row] = not active_mask[row]
+            polynomial_fit.set_active(row, bool(active_mask[row]))
+
+            np.testing.assert_allclose(
+                polynomial_fit.evaluate(x),
+                np.polyval(
+                    np.polyfit(
+                        x[active_mask], y[active_mask], 3, w=weights[active_mask]
+                    ),
+                    x,
+                ),
+            )
+
+    def test_appliesTheChangedPointsOfAMask(self):
+        """Applies the points changed by a mask"""
+        x, y, weights = _get_points_stub()
+        polynomial_fit = IncrementalPolynomialFit(x, y, 2, weights)
+        active_mask = np.arange(len(x)) % 7 != 0
+
+        polynomial_fit.set_active_mask(active_mask)
+
+        np.testing.assert_array_equal(polynomial_fit.get_active_mask(), active_mask)
+        np.testing.assert_allclose(
+            polynomial_fit.get_coefficients(),
+            IncrementalPolynomialFit(x, y, 2, weights, active_mask).get_coefficients(),
+        )
+
+    def test_staysAccurateOverManyUpdates(self):
+        """Stays accurate over more updates than the refactorization interval"""
+        x, y, weights = _get_points_stub()
+        polynomial_fit = IncrementalPolynomialFit(x, y, 4, weights)
+        active_mask = np.ones(len(x), dtype=bool)
+        rows = np.random.default_rng(0).integers(
+            len(x), size=2 * INCREMENTAL_FIT_REFACTORIZATION_INTERVAL + 1
+        )
+
+        for row in rows:
+            active_mask[row] = not active_mask[row]
+            polynomial_fit.set_active(int(row), bool(active_mask[row]))
+
+        np.testing.assert_allclose(
+            polynomial_fit.evaluate(x),
+            np.polyval(
+                np.polyfit(x[active_mask], y[active_mask], 4, w=weights[active_mask]),
+                x,
+            ),
+        )
+
+    def test_interpolatesIfTooFewPointsAreActive(self):
+        """Interpolates the active points if they do not determine the polynomial"""
+        x, y, weights = _get_points_stub()
+        active_mask = np.zeros(len(x), dtype=bool)
+        active_mask[[4, 9]] = True
+
+        polynomial_fit = IncrementalPolynomialFit(x, y, 3, weights, active_mask)
+
+        np.testing.assert_allclose(polynomial_fit.evaluate(x[[4, 9]]), y[[4, 9]])
+
+    def test_raisesAnErrorIfNoPointIsActive(self):
+        """Raises an error if no point is active"""
+        x, y, weights = _get_points_stub()
+
+        polynomial_fit = IncrementalPolynomialFit(
+            x, y, 3, weights, np.zeros(len(x), dtype=bool)
+        )
+
+        with self.assertRaises(PolynomialCoefficientError):
+            polynomial_fit.get_coefficients()
+
+    def test_raisesAnErrorIfTheMaskDoesNotMatchThePoints(self):
+        """Raises an error if the mask does not match the points"""
+        x, y, weights = _get_points_stub()
+        polynomial_fit = IncrementalPolynomialFit(x, y, 3, weights)
+
+        with self.assertRaises(ValueError):
+            polynomial_fit.set_active_mask(np.ones(3, dtype=bool))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import patch
+
+# Kept loaded for the forked workers, which can not import numpy and scipy again
+import concurrent.futures.process  # noqa: F401
+import numpy as np
+import scipy.optimize  # noqa: F401
+
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _get_dataset_stub(
+    distance_error: float,
+    shifted_intensity_error: float,
+    unshifted_intensity_error: float,
+) -> DataSet:
+    return DataSet(
+        ValueErrorPair(RelativeVelocity(1 / 299792458), RelativeVelocity(0)),
+        DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(distance, distance_error),
+                    None,
+                    ValueErrorPair(10.0 - 2.0 * distance, shifted_intensity_error),
+                    ValueErrorPair(1.0, unshifted_intensity_error),
+                )
+                for distance in [1.0, 2.0, 3.0, 4.0, 5.0]
+            ]
+        ),
+    )
+
+
+class MonteCarloUnitTest(unittest.TestCase):
+    def test_CalculatesTheLifetimeOfTheFitForEveryReplica(self):
+        """Calculates the lifetime of the fit for replicas without noise"""
+        with patch.dict("sys.modules"):
+            from napytau.core.core import calculate_lifetime_for_fit
+            from napytau.core.monte_carlo import calculate_lifetime_distribution
+
+            dataset = _get_dataset_stub(1e-12, 1e-12, 1e-12)
+            expected_lifetimes = [
+                calculate_lifetime_for_fit(dataset, 2, fit_mode=fit_mode)[0]
+                for fit_mode in ["unweighted", "weighted"]
+            ]
+
+            distributions = [
+                calculate_lifetime_distribution(
+                    dataset, 2, replica_count=10, fit_mode=fit_mode, seed=0
+                )
+                for fit_mode in ["unweighted", "weighted"]
+            ]
+
+        for distribution, expected_lifetime in zip(distributions, expected_lifetimes):
+            self.assertEqual(distribution.lifetimes.shape, (10,))
+            self.assertAlmostEqual(distribution.nominal_lifetime, expected_lifetime)
+            np.testing.assert_allclose(distribution.lifetimes, expected_lifetime)
+
+    def test_DistributesTheLifetimesAccordingToTheErrors(self):
+        """Spreads the lifetimes according to the errors of the datapoints"""
+        with patch.dict("sys.modules"):
+            from napytau.core.monte_carlo import calculate_lifetime_distribution
+
+            distribution = calculate_lifetime_distribution(
+                _get_dataset_stub(0.0, 1e-9, 0.1), 1, replica_count=8192, seed=0
+            )
+
+        # With a linear polynomial of slope -2 and equal weights, the lifetime is
+        # the mean of the unshifted intensities divided by the slope
+        self.assertAlmostEqual(distribution.nominal_lifetime, -0.5)
+        self.assertAlmostEqual(distribution.get_mean(), -0.5, delta=0.002)
+        self.assertAlmostEqual(
+            distribution.get_standard_deviation(),
+            0.1 / np.sqrt(5) / 2,
+            delta=0.001,
+        )
+        (lower, median, upper) = distribution.get_percentiles()
+        self.assertAlmostEqual(median, -0.5, delta=0.002)
+        self.assertAlmostEqual(upper - lower, 2 * 0.1 / np.sqrt(5) / 2, delta=0.002)
+
+    def test_DrawsTheSameReplicasForAnyNumberOfWorkers(self):
+        """Draws the same replicas for a seed, no matter how many workers are used"""
+        with patch.dict("sys.modules"):
+            from napytau.core.monte_carlo import calculate_lifetime_distribution
+
+            dataset = _get_dataset_stub(0.01, 0.1, 0.1)
+
+            sequential_distribution = calculate_lifetime_distribution(
+                dataset, 2, replica_count=50, seed=3, chunk_size=16
+            )
+            parallel_distribution = calculate_lifetime_distribution(
+                dataset, 2, replica_count=50, seed=3, chunk_size=16, worker_count=2
+            )
+            other_distribution = calculate_lifetime_distribution(
+                dataset, 2, replica_count=50, seed=4, chunk_size=16
+            )
+
+        np.testing.assert_array_equal(
+            sequential_distribution.lifetimes, parallel_distribution.lifetimes
+        )
+        self.assertFalse(
+            np.array_equal(
+                sequential_distribution.lifetimes, other_distribution.lifetimes
+            )
+        )
+
+    def test_IgnoresReplicasWithoutALifetime(self):
+        """Ignores replicas without a lifetime in the statistics"""
+        with patch.dict("sys.modules"):
+            from napytau.core.monte_carlo import LifetimeDistribution
+
+            distribution = LifetimeDistribution(
+                np.array([1.0, np.nan, 2.0, 3.0]), 2.0, 0.5
+            )
+
+        self.assertEqual(distribution.get_mean(), 2.0)
+        self.assertEqual(distribution.get_standard_deviation(), 1.0)
+        np.testing.assert_allclose(
+            distribution.get_percentiles([0, 50, 100]), [1, 2, 3]
+        )
+
+    def test_RaisesAnErrorForAnUnknownFitMode(self):
+        """Raises an error for an unknown fit mode"""
+        with patch.dict("sys.modules"):
+            from napytau.core.monte_carlo import calculate_lifetime_distribution
+
+            with self.assertRaises(ValueError):
+                calculate_lifetime_distribution(
+                    _get_dataset_stub(0.01, 0.1, 0.1), 2, fit_mode="unknown"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
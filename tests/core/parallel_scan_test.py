@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+# Kept loaded for the forked workers, which can not import numpy and scipy again
+import concurrent.futures.process  # noqa: F401
+import numpy as np
+import scipy.optimize  # noqa: F401
+
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _get_dataset_stub() -> DataSet:
+    return DataSet(
+        ValueErrorPair(RelativeVelocity(1 / 299792458), RelativeVelocity(0)),
+        DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(distance, 0.1),
+                    None,
+                    ValueErrorPair(shifted, 0.5),
+                    ValueErrorPair(unshifted, 0.3),
+                )
+                for distance, shifted, unshifted in [
+                    (1.0, 10.0, 1.1),
+                    (2.0, 8.0, 0.9),
+                    (3.0, 6.5, 0.7),
+                    (4.0, 5.1, 0.5),
+                    (5.0, 4.2, 0.4),
+                ]
+            ]
+        ),
+    )
+
+
+class ParallelScanUnitTest(unittest.TestCase):
+    def test_CalculatesTheSameLifetimesAsTheSequentialScan(self):
+        """Calculates the same lifetimes in worker processes as in the current one"""
+        with patch.dict("sys.modules"):
+            from napytau.core.core import calculate_lifetimes_for_tau_factors
+            from napytau.core.parallel_scan import (
+                calculate_lifetimes_for_tau_factors_in_parallel,
+            )
+
+            dataset = _get_dataset_stub()
+            tau_factors = np.linspace(0.5, 5.0, 7)
+
+            results = calculate_lifetimes_for_tau_factors_in_parallel(
+                dataset, tau_factors, 2, worker_count=2, chunk_size=3
+            )
+            expected_results = calculate_lifetimes_for_tau_factors(
+                dataset, tau_factors, 2
+            )
+
+        self.assertEqual(results.shape, (3, 7))
+        self.assertTrue(np.all(np.isfinite(results)))
+        np.testing.assert_allclose(results, np.array(expected_results))
+
+    def test_CalculatesTheLifetimesOfTheActiveDatapoints(self):
+        """Calculates the lifetimes of the active datapoints in the current process"""
+        with patch.dict("sys.modules"):
+            from napytau.core.active_datapoints import select_active_datapoints
+            from napytau.core.core import calculate_lifetimes_for_tau_factors
+            from napytau.core.parallel_scan import (
+                calculate_lifetimes_for_tau_factors_in_parallel,
+            )
+
+            dataset = _get_dataset_stub()
+            active_mask = np.array([True, True, False, True, True])
+            tau_factors = np.array([1.0, 2.0, 3.0])
+
+            results = calculate_lifetimes_for_tau_factors_in_parallel(
+                dataset, tau_factors, 2, active_mask=active_mask, worker_count=1
+            )
+            expected_results = calculate_lifetimes_for_tau_factors(
+                select_active_datapoints(dataset, active_mask), tau_factors, 2
+            )
+
+        self.assertEqual(results.shape, (3, 3))
+        self.assertTrue(np.all(np.isfinite(results)))
+        np.testing.assert_allclose(results, np.array(expected_results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+
+import numpy as np
+
+from napytau.core.errors.polynomial_coefficient_error import (
+    PolynomialCoefficientError,
+)
+from napytau.core.polynomial_evaluation import (
+    calculate_condition_number_for_decomposition,
+    calculate_covariance_matrix_for_decomposition,
+    calculate_derivative_basis,
+    calculate_derivative_coefficients,
+    decompose_weighted_basis,
+    evaluate_differentiated_polynomial,
+    evaluate_differentiated_polynomial_for_basis,
+    evaluate_polynomial,
+    evaluate_polynomial_for_basis,
+    evaluate_quadratic_form_for_basis,
+)
+
+
+class PolynomialEvaluationUnitTest(unittest.TestCase):
+    def test_CanCalculateTheCoefficientsOfTheDerivative(self):
+        """Can calculate the coefficients of the derivative."""
+        # 2 + 3x + 4x^2 -> 3 + 8x
+        np.testing.assert_array_equal(
+            calculate_derivative_coefficients(np.array([2, 3, 4])),
+            np.array([3, 8]),
+        )
+        np.testing.assert_array_equal(
+            calculate_derivative_coefficients(np.array([5])),
+            np.array([0]),
+        )
+
+    def test_CanEvaluateAPolynomialWithHornersMethod(self):
+        """Can evaluate a polynomial with Horner's method."""
+        times = np.array([1, 2, 3])
+
+        # 2 + 3x + 4x^2
+        np.testing.assert_array_equal(
+            evaluate_polynomial(times, np.array([2, 3, 4])),
+            np.array([9, 24, 47]),
+        )
+        np.testing.assert_array_equal(
+            evaluate_differentiated_polynomial(times, np.array([2, 3, 4])),
+            np.array([11, 19, 27]),
+        )
+
+    def test_CanEvaluateAPolynomialForABasis(self):
+        """Can evaluate a polynomial for a Vandermonde basis."""
+        basis = np.vander(np.array([1, 2, 3]), 4, increasing=True)
+
+        np.testing.assert_array_equal(
+            evaluate_polynomial_for_basis(basis, np.array([2, 3, 4])),
+            np.array([9, 24, 47]),
+        )
+        np.testing.assert_array_equal(
+            evaluate_differentiated_polynomial_for_basis(basis, np.array([2, 3, 4])),
+            np.array([11, 19, 27]),
+        )
+
+    def test_CanEvaluateAQuadraticFormForABasis(self):
+        """Can evaluate a quadratic form for a basis."""
+        times = np.array([0.0, 1.0, 2.0])
+        basis = np.vander(times, 2, increasing=True)
+        covariance_matrix = np.array([[1.0, 0.5], [0.5, 2.0]])
+
+        expected_result = np.array(
+            [
+                sum(
+                    times[i] ** k * times[i] ** l * covariance_matrix[k, l]
+                    for k in range(2)
+                    for l in range(2)  # noqa E741
+                )
+                for i in range(3)
+            ]
+        )
+
+        np.testing.assert_allclose(
+            evaluate_quadratic_form_for_basis(basis, covariance_matrix),
+            expected_result,
+        )
+
+    def test_CanCalculateTheDerivativeOfABasis(self):
+        """Can calculate the derivative of a Vandermonde basis."""
+        times = np.array([1.0, 2.0, 3.0])
+        coefficients = np.array([5.0, 4.0, 3.0])
+
+        derivative_basis = calculate_derivative_basis(
+            np.vander(times, 3, increasing=True)
+        )
+
+        np.testing.assert_array_equal(
+            derivative_basis, np.array([[0, 1, 2], [0, 1, 4], [0, 1, 6]])
+        )
+        np.testing.assert_allclose(
+            derivative_basis @ coefficients,
+            evaluate_differentiated_polynomial(times, coefficients),
+        )
+
+    def test_CanCalculateACovarianceMatrixFromADecompositionOfAWeightedBasis(self):
+        """Can calculate a covariance matrix from a decomposition of a weighted basis"""
+        basis = np.vander(np.array([0.0, 1e3, 2e3, 3e3]), 3, increasing=True)
+        weights = np.array([1.0, 0.5, 0.25, 2.0])
+
+        (q, r, column_scales) = decompose_weighted_basis(basis, weights)
+
+        np.testing.assert_allclose(
+            q @ r * column_scales, basis * weights[:, np.newaxis], atol=1e-6
+        )
+        np.testing.assert_allclose(
+            calculate_covariance_matrix_for_decomposition(r, column_scales),
+            np.linalg.inv(basis.T @ np.diag(weights**2) @ basis),
+        )
+        self.assertAlmostEqual(
+            calculate_condition_number_for_decomposition(r),
+            np.linalg.cond(basis * weights[:, np.newaxis] / column_scales),
+        )
+
+    def test_RaisesALinAlgErrorForABasisWithFewerRowsThanColumns(self):
+        """Raises a LinAlgError for a basis with fewer rows than columns."""
+        with self.assertRaises(np.linalg.LinAlgError):
+            decompose_weighted_basis(
+                np.vander(np.array([1.0, 2.0]), 3, increasing=True), np.ones(2)
+            )
+
+    def test_RaisesAPolynomialCoefficientErrorForAnEmptyCoefficientArray(self):
+        """Raises a polynomial coefficient error for an empty coefficient array."""
+        with self.assertRaises(PolynomialCoefficientError):
+            evaluate_polynomial(np.array([1, 2]), np.array([]))
+
+        with self.assertRaises(PolynomialCoefficientError):
+            evaluate_polynomial_for_basis(
+                np.vander(np.array([1, 2]), 1, increasing=True), np.array([])
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ from napytau.core.errors.polynomial_coefficient_error import (
 )
 
 import numpy as np
+import scipy as sp
 
 from napytau.import_export.model.datapoint_collection import DatapointCollection
 from napytau.util.model.value_error_pair import ValueErrorPair
@@ -13,12 +14,15 @@ from napytau.import_export.model.dataset import DataSet
 from napytau.import_export.model.relative_velocity import RelativeVelocity
 
 
-def set_up_mocks() -> MagicMock:
-    numpy_module_mock = MagicMock()
-    numpy_module_mock.power = MagicMock()
-    numpy_module_mock.zeros_like = MagicMock()
+def set_up_mocks(times: np.ndarray) -> MagicMock:
+    time_module_mock = MagicMock()
+    time_module_mock.calculate_powers_of_times = MagicMock(
+        side_effect=lambda dataset, max_exponent: np.vander(
+            times, max_exponent + 1, increasing=True
+        )
+    )
 
-    return numpy_module_mock
+    return time_module_mock
 
 
 def _get_dataset_stub(datapoints: DatapointCollection) -> DataSet:
@@ -32,20 +36,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateAValidPolynomialAtMeasuringDistances():
         """Can evaluate a valid polynomial at measuring distances."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [
-            np.array([1, 1, 1]),
-            np.array([1, 2, 3]),
-            np.array([1, 4, 9]),
-        ]
-        numpy_module_mock.zeros_like.return_value = np.array([0, 0, 0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([1, 2, 3]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -92,16 +89,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateAPolynomialAtMeasuringDistancesForEmptyDistanceInput():
         """Can evaluate a polynomial at measuring distances for empty distance input."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [np.array([]), np.array([]), np.array([])]
-        numpy_module_mock.zeros_like.return_value = np.array([])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -144,20 +138,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateAPolynomialAtMeasuringDistancesForASingleDistance():
         """Can evaluate a polynomial at measuring distances for a single distance."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [
-            np.array([1]),
-            np.array([2]),
-            np.array([4]),
-        ]
-        numpy_module_mock.zeros_like.return_value = np.array([0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([2]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -189,20 +176,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateAPolynomialOfDegreeZeroAtMeasuringDistances():
         """Can evaluate a polynomial of degree zero at measuring distances."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [
-            np.array([1, 1, 1]),
-            np.array([1, 2, 3]),
-            np.array([1, 4, 9]),
-        ]
-        numpy_module_mock.zeros_like.return_value = np.array([0, 0, 0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([1, 2, 3]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -280,16 +260,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateAValidDifferentiatedPolynomialAtMeasuringDistances():
         """Can evaluate a valid differentiated polynomial at measuring distances."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [np.array([1, 1, 1]), np.array([1, 2, 3])]
-        numpy_module_mock.zeros_like.return_value = np.array([0, 0, 0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([1, 2, 3]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -335,16 +312,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateADifferentiatedPolynomialAtMeasuringDistancesForEmptyDistanceInput():
         """Can evaluate a differentiated polynomial at measuring distances for empty distance input."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [np.array([]), np.array([])]
-        numpy_module_mock.zeros_like.return_value = np.array([])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -386,16 +360,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateADifferentiatedPolynomialAtMeasuringDistancesForSingleDistanceMeasurement():
         """Can evaluate a differentiated polynomial at measuring distances for single distance measurement."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [np.array([1]), np.array([2])]
-        numpy_module_mock.zeros_like.return_value = np.array([0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([2]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -426,16 +397,13 @@ class PolynomialsUnitTest(unittest.TestCase):
     @staticmethod
     def test_CanEvaluateADifferentiatedPolynomialOfDegreeZeroAtMeasuringDistances():
         """Can evaluate a differentiated polynomial of degree zero at measuring distances."""
-        numpy_module_mock = set_up_mocks()
-
-        # Mocked return values of called functions
-        numpy_module_mock.power.side_effect = [np.array([1, 1, 1]), np.array([1, 2, 3])]
-        numpy_module_mock.zeros_like.return_value = np.array([0, 0, 0])
+        # Measuring times of the datapoints
+        time_module_mock = set_up_mocks(np.array([1, 2, 3]))
 
         with patch.dict(
             "sys.modules",
             {
-                "numpy": numpy_module_mock,
+                "napytau.core.time": time_module_mock,
             },
         ):
             from napytau.core.polynomials import (
@@ -507,6 +475,246 @@ class PolynomialsUnitTest(unittest.TestCase):
                 _get_dataset_stub(datapoints), coefficients
             )
 
+    def test_CanCalculateAWeightedFitTogetherWithItsCovarianceMatrix(self):
+        """Can calculate a weighted fit together with its covariance matrix."""
+        times = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        time_module_mock = set_up_mocks(times)
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.time": time_module_mock,
+            },
+        ):
+            from napytau.core.polynomials import (
+                FIT_MODE_WEIGHTED,
+                calculate_polynomial_coefficients_for_fit,
+                calculate_weighted_polynomial_fit,
+            )
+
+            shifted_intensities = np.array([3.0, 8.5, 18.0, 32.0, 49.0])
+            shifted_intensity_errors = np.array([0.5, 1.0, 2.0, 1.0, 4.0])
+            dataset = _get_dataset_stub(
+                DatapointCollection(
+                    [
+                        Datapoint(
+                            ValueErrorPair(float(index), 0.16),
+                            None,
+                            ValueErrorPair(value, error),
+                            ValueErrorPair(1.0, 1.0),
+                        )
+                        for index, (value, error) in enumerate(
+                            zip(shifted_intensities, shifted_intensity_errors)
+                        )
+                    ]
+                )
+            )
+
+            (coefficients, covariance_matrix) = calculate_weighted_polynomial_fit(
+                dataset, 2
+            )
+
+            weighted_basis = (
+                np.vander(times, 3, increasing=True)
+                / shifted_intensity_errors[:, np.newaxis]
+            )
+            np.testing.assert_allclose(
+                coefficients,
+                np.polyfit(
+                    times, shifted_intensities, 2, w=1 / shifted_intensity_errors
+                )[::-1],
+            )
+            np.testing.assert_allclose(
+                covariance_matrix, np.linalg.inv(weighted_basis.T @ weighted_basis)
+            )
+            np.testing.assert_allclose(
+                calculate_polynomial_coefficients_for_fit(
+                    dataset, 2, FIT_MODE_WEIGHTED
+                ),
+                coefficients,
+            )
+
+    def test_WeightedFitRaisesAPolynomialCoefficientErrorForTooFewDatapoints(self):
+        """Weighted fit raises a polynomial coefficient error for too few datapoints."""
+        time_module_mock = set_up_mocks(np.array([1.0, 2.0]))
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.time": time_module_mock,
+            },
+        ):
+            from napytau.core.polynomials import calculate_weighted_polynomial_fit
+
+            datapoints = DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(1, 0.16),
+                        None,
+                        ValueErrorPair(2, 3),
+                        ValueErrorPair(5, 6),
+                    ),
+                    Datapoint(
+                        ValueErrorPair(2, 0.16),
+                        None,
+                        ValueErrorPair(3, 4),
+                        ValueErrorPair(6, 7),
+                    ),
+                ]
+            )
+
+            with self.assertRaises(PolynomialCoefficientError):
+                calculate_weighted_polynomial_fit(_get_dataset_stub(datapoints), 2)
+
+    def test_FitRaisesAValueErrorForAnUnknownFitMode(self):
+        """Fit raises a value error for an unknown fit mode."""
+        from napytau.core.polynomials import calculate_polynomial_coefficients_for_fit
+
+        with self.assertRaises(ValueError):
+            calculate_polynomial_coefficients_for_fit(
+                _get_dataset_stub(DatapointCollection([])), 2, "unknown"
+            )
+
+    def test_TauFactorFitDoesNotDependOnTheInitialGuess(self):
+        """The fit for a tau factor does not depend on the initial guess."""
+        times = np.array([0.5, 1.0, 1.5, 2.0, 2.5, 3.0])
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.time": set_up_mocks(times),
+            },
+        ):
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+            )
+
+            dataset = _get_dataset_stub(
+                DatapointCollection(
+                    [
+                        Datapoint(
+                            ValueErrorPair(time, 0.16),
+                            None,
+                            ValueErrorPair(10 * np.exp(-time), 0.5),
+                            ValueErrorPair(1.0, 0.3),
+                        )
+                        for time in times
+                    ]
+                )
+            )
+
+            coefficients = calculate_polynomial_coefficients_for_tau_factor(
+                dataset, 2.0, 3
+            )
+            warm_started_coefficients = (
+                calculate_polynomial_coefficients_for_tau_factor(
+                    dataset, 2.0, 3, np.array([1.0, 1.0, 1.0])
+                )
+            )
+
+        np.testing.assert_allclose(coefficients, warm_started_coefficients, rtol=1e-4)
+
+        # The shape of the polynomial is the one of a fit started from ones with
+        # numeric derivatives, only the scale and the order of the coefficients
+        # differ
+        reference_coefficients = sp.optimize.least_squares(
+            lambda c: np.poly1d(c)(times) / np.polyder(np.poly1d(c))(times) - 2.0,
+            np.ones(3),
+        ).x[::-1]
+        np.testing.assert_allclose(
+            coefficients / np.linalg.norm(coefficients),
+            reference_coefficients / np.linalg.norm(reference_coefficients),
+            rtol=1e-4,
+        )
+
+    def test_TauFactorFitIsScaledToTheShiftedIntensities(self):
+        """The fit for a tau factor is scaled to fit the shifted intensities."""
+        times = np.array([0.5, 1.0, 1.5, 2.0])
+        shifted_intensities = np.array([8.0, 6.0, 4.5, 3.5])
+        shifted_intensity_errors = np.array([0.5, 1.0, 0.5, 2.0])
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.time": set_up_mocks(times),
+            },
+        ):
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+            )
+
+            dataset = _get_dataset_stub(
+                DatapointCollection(
+                    [
+                        Datapoint(
+                            ValueErrorPair(time, 0.16),
+                            None,
+                            ValueErrorPair(value, error),
+                            ValueErrorPair(1.0, 0.3),
+                        )
+                        for time, value, error in zip(
+                            times, shifted_intensities, shifted_intensity_errors
+                        )
+                    ]
+                )
+            )
+
+            coefficients = calculate_polynomial_coefficients_for_tau_factor(
+                dataset, 0.5, 2
+            )
+
+        # No other scale of the polynomial fits the shifted intensities better
+        polynomial = np.polynomial.polynomial.polyval(times, coefficients)
+        self.assertAlmostEqual(
+            np.sum(
+                polynomial
+                * (polynomial - shifted_intensities)
+                / shifted_intensity_errors**2
+            ),
+            0.0,
+        )
+
+    def test_CanScanTheCoefficientsOfASequenceOfTauFactors(self):
+        """Can scan the coefficients of a sequence of tau factors by continuation."""
+        times = np.array([0.5, 1.0, 1.5, 2.0, 2.5, 3.0])
+        # For smaller tau factors the derivative of the polynomials changes its sign
+        # between the times, separate fits can end in other local minima there
+        tau_factors = np.linspace(1.5, 5.0, 8)
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.core.time": set_up_mocks(times),
+            },
+        ):
+            from napytau.core.polynomials import (
+                calculate_polynomial_coefficients_for_tau_factor,
+                scan_polynomial_coefficients_for_tau_factors,
+            )
+
+            dataset = _get_dataset_stub(
+                DatapointCollection(
+                    [
+                        Datapoint(
+                            ValueErrorPair(time, 0.16),
+                            None,
+                            ValueErrorPair(10 * np.exp(-time), 0.5),
+                            ValueErrorPair(1.0, 0.3),
+                        )
+                        for time in times
+                    ]
+                )
+            )
+
+            scanned_coefficients = list(
+                scan_polynomial_coefficients_for_tau_factors(dataset, tau_factors, 3)
+            )
+
+            self.assertEqual(len(scanned_coefficients), len(tau_factors))
+            for tau_factor, coefficients in zip(tau_factors, scanned_coefficients):
+                np.testing.assert_allclose(
+                    coefficients,
+                    calculate_polynomial_coefficients_for_tau_factor(
+                        dataset, tau_factor, 3
+                    ),
+                    rtol=1e-4,
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
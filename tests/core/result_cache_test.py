@@ -0,0 +1,130 @@
+import unittest
+from pathlib import PurePath
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock, patch
+
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _get_dataset_stub() -> DataSet:
+    return DataSet(
+        ValueErrorPair(RelativeVelocity(0.4), RelativeVelocity(0.02)),
+        DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(0.0, 0.16),
+                    None,
+                    ValueErrorPair(2, 1),
+                    ValueErrorPair(6, 1),
+                ),
+                Datapoint(
+                    ValueErrorPair(1.0, 0.16),
+                    None,
+                    ValueErrorPair(6, 1),
+                    ValueErrorPair(10, 1),
+                ),
+            ]
+        ),
+    )
+
+
+class ResultCacheUnitTest(unittest.TestCase):
+    def test_returnsTheCachedResultForAnUnchangedDataset(self):
+        """Returns the cached result for an unchanged dataset"""
+        with patch.dict("sys.modules"):
+            from napytau.core.result_cache import ResultCache
+
+            cache = ResultCache()
+            calculate = MagicMock(return_value=(1.8, 0.2))
+
+            first_result = cache.get_or_calculate(
+                "lifetime", _get_dataset_stub(), (2,), calculate
+            )
+            second_result = cache.get_or_calculate(
+                "lifetime", _get_dataset_stub(), (2,), calculate
+            )
+
+            self.assertEqual(first_result, (1.8, 0.2))
+            self.assertEqual(second_result, (1.8, 0.2))
+            self.assertEqual(len(calculate.mock_calls), 1)
+
+    def test_recalculatesTheResultForChangedParametersOrCalculations(self):
+        """Recalculates the result for changed parameters or calculations"""
+        with patch.dict("sys.modules"):
+            from napytau.core.result_cache import ResultCache
+
+            cache = ResultCache()
+            dataset = _get_dataset_stub()
+            calculate = MagicMock(return_value=1.0)
+
+            cache.get_or_calculate("lifetime", dataset, (2,), calculate)
+            cache.get_or_calculate("lifetime", dataset, (3,), calculate)
+            cache.get_or_calculate("tau_factor", dataset, (3,), calculate)
+
+            self.assertEqual(len(calculate.mock_calls), 3)
+
+    def test_recalculatesTheResultForAChangedDataset(self):
+        """Recalculates the result after a datapoint or its active flag changed"""
+        with patch.dict("sys.modules"):
+            from napytau.core.result_cache import create_result_key
+
+            dataset = _get_dataset_stub()
+            original_key = create_result_key("lifetime", dataset, (2,))
+
+            dataset.get_datapoints()[0].set_active(False)
+            deactivated_key = create_result_key("lifetime", dataset, (2,))
+
+            dataset.get_datapoints()[0].set_active(True)
+            dataset.get_datapoints()[1].set_distance(ValueErrorPair(2.0, 0.16))
+            changed_key = create_result_key("lifetime", dataset, (2,))
+
+            self.assertNotEqual(original_key, deactivated_key)
+            self.assertNotEqual(original_key, changed_key)
+            self.assertNotEqual(deactivated_key, changed_key)
+
+    def test_evictsTheLeastRecentlyUsedResult(self):
+        """Evicts the least recently used result once the capacity is exceeded"""
+        with patch.dict("sys.modules"):
+            from napytau.core.result_cache import ResultCache
+
+            cache = ResultCache(capacity=2)
+            dataset = _get_dataset_stub()
+
+            cache.get_or_calculate("lifetime", dataset, (1,), lambda: 1.0)
+            cache.get_or_calculate("lifetime", dataset, (2,), lambda: 2.0)
+            cache.get_or_calculate("lifetime", dataset, (1,), lambda: -1.0)
+            cache.get_or_calculate("lifetime", dataset, (3,), lambda: 3.0)
+
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(
+                cache.get_or_calculate("lifetime", dataset, (1,), lambda: -1.0), 1.0
+            )
+            self.assertEqual(
+                cache.get_or_calculate("lifetime", dataset, (2,), lambda: -2.0), -2.0
+            )
+
+    def test_persistsResultsInTheCacheDirectory(self):
+        """Persists results in the cache directory, so other caches can read them"""
+        with patch.dict("sys.modules"):
+            from napytau.core.result_cache import ResultCache
+
+            with TemporaryDirectory() as directory:
+                ResultCache(directory_path=PurePath(directory)).get_or_calculate(
+                    "lifetime", _get_dataset_stub(), (2,), lambda: (1.8, 0.2)
+                )
+                calculate = MagicMock(return_value=(0.0, 0.0))
+
+                result = ResultCache(
+                    directory_path=PurePath(directory)
+                ).get_or_calculate("lifetime", _get_dataset_stub(), (2,), calculate)
+
+            self.assertEqual(result, (1.8, 0.2))
+            self.assertEqual(len(calculate.mock_calls), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -93,3 +93,33 @@ class TauFinalUnitTest(unittest.TestCase):
 
             self.assertEqual(tau_final[0], expected_tau_final)
             self.assertEqual(tau_final[1], expected_uncertainty)
+
+    def test_calculateTauFinalsForSeveralFits(self):
+        """Calculate tau_final for several fits at once."""
+        with patch.dict("sys.modules"):
+            from napytau.core.tau_final import (
+                calculate_tau_final,
+                calculate_tau_finals,
+            )
+
+        tau_i = np.array([[2.0, 4.0], [1.0, 3.0], [5.0, 5.0]])
+        delta_tau_i = np.array([[1.0, 2.0], [0.5, 1.0], [2.0, 4.0]])
+
+        tau_finals, uncertainties = calculate_tau_finals(tau_i, delta_tau_i)
+
+        for index in range(3):
+            expected = calculate_tau_final(tau_i[index], delta_tau_i[index])
+            self.assertAlmostEqual(tau_finals[index], expected[0])
+            self.assertAlmostEqual(uncertainties[index], expected[1])
+
+    def test_calculateTauFinalsForEmptyInput(self):
+        """Calculate tau_final for several fits without datapoints."""
+        with patch.dict("sys.modules"):
+            from napytau.core.tau_final import calculate_tau_finals
+
+        tau_finals, uncertainties = calculate_tau_finals(
+            np.zeros((2, 0)), np.zeros((2, 0))
+        )
+
+        np.testing.assert_array_equal(tau_finals, np.array([-1, -1]))
+        np.testing.assert_array_equal(uncertainties, np.array([-1, -1]))
@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+import scipy as sp
+
+from napytau.core.time import (
+    calculate_powers_of_times,
+    calculate_times_from_distances_and_relative_velocity,
+)
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _get_dataset_stub(velocity: float) -> DataSet:
+    return DataSet(
+        ValueErrorPair(RelativeVelocity(velocity), RelativeVelocity(0)),
+        DatapointCollection(
+            [
+                Datapoint(ValueErrorPair(1.0, 0.1)),
+                Datapoint(ValueErrorPair(2.0, 0.1)),
+                Datapoint(ValueErrorPair(3.0, 0.1)),
+            ]
+        ),
+    )
+
+
+class TimeUnitTest(unittest.TestCase):
+    def test_CanCalculateTimesFromDistancesAndRelativeVelocity(self):
+        """Can calculate times from distances and relative velocity"""
+        dataset = _get_dataset_stub(0.5)
+
+        np.testing.assert_allclose(
+            calculate_times_from_distances_and_relative_velocity(dataset),
+            np.array([1.0, 2.0, 3.0]) / (0.5 * sp.constants.speed_of_light),
+        )
+
+    def test_ReusesTheTimesWhileTheDatasetIsUnchanged(self):
+        """Reuses the times while the dataset is unchanged"""
+        dataset = _get_dataset_stub(0.5)
+
+        times = calculate_times_from_distances_and_relative_velocity(dataset)
+
+        self.assertIs(
+            calculate_times_from_distances_and_relative_velocity(dataset), times
+        )
+        self.assertFalse(times.flags.writeable)
+
+    def test_RecalculatesTheTimesIfADistanceChanges(self):
+        """Recalculates the times if a distance changes"""
+        dataset = _get_dataset_stub(0.5)
+        calculate_times_from_distances_and_relative_velocity(dataset)
+
+        dataset.get_datapoints()[0].set_distance(ValueErrorPair(4.0, 0.1))
+
+        np.testing.assert_allclose(
+            calculate_times_from_distances_and_relative_velocity(dataset),
+            np.array([4.0, 2.0, 3.0]) / (0.5 * sp.constants.speed_of_light),
+        )
+
+    def test_RecalculatesTheTimesIfTheRelativeVelocityChanges(self):
+        """Recalculates the times if the relative velocity changes"""
+        dataset = _get_dataset_stub(0.5)
+        calculate_times_from_distances_and_relative_velocity(dataset)
+
+        dataset.relative_velocity = ValueErrorPair(
+            RelativeVelocity(0.25), RelativeVelocity(0)
+        )
+
+        np.testing.assert_allclose(
+            calculate_times_from_distances_and_relative_velocity(dataset),
+            np.array([1.0, 2.0, 3.0]) / (0.25 * sp.constants.speed_of_light),
+        )
+
+    def test_KeepsTheTimesIfAnUnrelatedFieldChanges(self):
+        """Keeps the times if an unrelated field changes"""
+        dataset = _get_dataset_stub(0.5)
+        times = calculate_times_from_distances_and_relative_velocity(dataset)
+
+        dataset.get_datapoints()[0].set_tau(ValueErrorPair(1.0, 0.1))
+        dataset.get_datapoints()[1].set_active(False)
+
+        self.assertIs(
+            calculate_times_from_distances_and_relative_velocity(dataset), times
+        )
+
+    def test_CanCalculatePowersOfTheTimes(self):
+        """Can calculate powers of the times"""
+        dataset = _get_dataset_stub(1 / sp.constants.speed_of_light)
+
+        np.testing.assert_allclose(
+            calculate_powers_of_times(dataset, 2),
+            np.array([[1.0, 1.0, 1.0], [1.0, 2.0, 4.0], [1.0, 3.0, 9.0]]),
+        )
+        np.testing.assert_allclose(
+            calculate_powers_of_times(dataset, 1),
+            np.array([[1.0, 1.0], [1.0, 2.0], [1.0, 3.0]]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import tempfile
+import unittest
+from pathlib import PurePath
+from unittest.mock import patch
+
+# numpy can not be imported twice per process and the process pool pickles its
+# own classes, so both have to be loaded before the modules are isolated below
+import concurrent.futures.process  # noqa: F401
+import numpy  # noqa: F401
+
+from napytau.import_export.import_export_error import ImportExportError
+
+
+def _write_file(path: str, rows: list) -> None:
+    with open(path, "w") as file:
+        file.write("\n".join(rows) + "\n")
+
+
+def _write_legacy_directory(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
+    _write_file(os.path.join(path, "v_c"), ["0.03 0.001"])
+    _write_file(
+        os.path.join(path, "distances.dat"),
+        ["a 1.0 0.1", "b 2.0 0.1", "c 3.0 0.1", "d 4.0 0.1"],
+    )
+    _write_file(
+        os.path.join(path, "norm.fac"),
+        ["1.0 1.0 0.01", "2.0 1.0 0.01", "3.0 1.0 0.01", "4.0 1.0 0.01"],
+    )
+    _write_file(
+        os.path.join(path, "transition.fit"),
+        [
+            "1.0 10.0 0.5 1.1 0.3",
+            "2.0 8.0 0.5 0.9 0.3",
+            "3.0 6.5 0.5 0.7 0.3",
+            "4.0 5.1 0.5 0.5 0.3",
+        ],
+    )
+
+
+class BatchUnitTest(unittest.TestCase):
+    def setUp(self):
+        # The batch module and the modules it imports are dropped again after each
+        # test, so they do not leak into the tests mocking them
+        self.modules_patcher = patch.dict("sys.modules")
+        self.modules_patcher.start()
+        import napytau.headless.batch as batch
+
+        self.batch = batch
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.base_path = self.temporary_directory.name
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+        self.modules_patcher.stop()
+
+    def test_collectsLegacyDirectoriesAndNapytauFilesFromADirectoryTree(self):
+        """Collects legacy directories and NaPyTau files from a directory tree."""
+        _write_legacy_directory(os.path.join(self.base_path, "b", "legacy"))
+        _write_legacy_directory(os.path.join(self.base_path, "a"))
+        _write_file(os.path.join(self.base_path, "b", "data.json"), ["{}"])
+        _write_file(os.path.join(self.base_path, "b", "notes.txt"), ["notes"])
+
+        jobs = self.batch.collect_batch_jobs(PurePath(self.base_path))
+
+        self.assertEqual(
+            jobs,
+            [
+                self.batch.BatchJob(PurePath(self.base_path, "a"), "legacy"),
+                self.batch.BatchJob(
+                    PurePath(self.base_path, "b", "data.json"), "napytau"
+                ),
+                self.batch.BatchJob(PurePath(self.base_path, "b", "legacy"), "legacy"),
+            ],
+        )
+
+    def test_skipsDirectoriesWithoutAllLegacySetupFiles(self):
+        """Skips directories which do not hold all files of a legacy setup."""
+        _write_legacy_directory(os.path.join(self.base_path, "complete"))
+        incomplete_path = os.path.join(self.base_path, "incomplete")
+        os.makedirs(incomplete_path)
+        _write_file(os.path.join(incomplete_path, "v_c"), ["0.03 0.001"])
+        _write_file(os.path.join(incomplete_path, "distances.dat"), ["a 1.0 0.1"])
+
+        jobs = self.batch.collect_batch_jobs(PurePath(self.base_path))
+
+        self.assertEqual(
+            jobs,
+            [self.batch.BatchJob(PurePath(self.base_path, "complete"), "legacy")],
+        )
+
+    def test_collectsJobsFromAManifest(self):
+        """Collects jobs from a manifest."""
+        _write_legacy_directory(os.path.join(self.base_path, "legacy"))
+        _write_file(
+            os.path.join(self.base_path, "manifest.txt"),
+            [
+                "# Beam time 1",
+                "legacy\tnapsetup",
+                "",
+                "data.json\tsetup 1",
+                "other.json",
+            ],
+        )
+
+        jobs = self.batch.collect_batch_jobs(PurePath(self.base_path, "manifest.txt"))
+
+        self.assertEqual(
+            jobs,
+            [
+                self.batch.BatchJob(
+                    PurePath(self.base_path, "legacy"), "legacy", "napsetup"
+                ),
+                self.batch.BatchJob(
+                    PurePath(self.base_path, "data.json"), "napytau", "setup 1"
+                ),
+                self.batch.BatchJob(PurePath(self.base_path, "other.json"), "napytau"),
+            ],
+        )
+
+    def test_raisesAnErrorForAnInvalidManifestEntry(self):
+        """Raises an error for an invalid manifest entry."""
+        _write_file(os.path.join(self.base_path, "manifest.txt"), ["missing.dat"])
+
+        with self.assertRaises(ImportExportError):
+            self.batch.collect_batch_jobs(PurePath(self.base_path, "manifest.txt"))
+
+    def test_recordsTheErrorOfAFailingJob(self):
+        """Records the error of a failing job instead of raising it."""
+        _write_file(os.path.join(self.base_path, "broken.json"), ["{}"])
+
+        result = self.batch.run_batch_job(
+            self.batch.BatchJob(PurePath(self.base_path, "broken.json"), "napytau"),
+            None,
+        )
+
+        self.assertFalse(result.is_successful())
+        self.assertTrue(result.error.startswith("ImportExportError: "))
+        self.assertNotIn("\n", result.error)
+        self.assertIsNone(result.tau_fit)
+
+    def test_returnsTheSameResultsInAProcessPoolAsInProcess(self):
+        """Returns the same results in a process pool as in the current process."""
+        _write_legacy_directory(os.path.join(self.base_path, "first"))
+        _write_legacy_directory(os.path.join(self.base_path, "second"))
+        jobs = self.batch.collect_batch_jobs(PurePath(self.base_path))
+
+        results_in_process = self.batch.run_batch(jobs, 0.5, 1)
+        results_in_pool = self.batch.run_batch(jobs, 0.5, 2)
+
+        self.assertTrue(all(result.is_successful() for result in results_in_pool))
+        self.assertEqual(
+            [result.to_row() for result in results_in_process],
+            [result.to_row() for result in results_in_pool],
+        )
+        self.assertEqual(results_in_pool[0].tau_factor, 0.5)
+
+    def test_collectsBinaryFormatFilesFromADirectoryTreeAndAManifest(self):
+        """Collects binary format files from a directory tree and a manifest."""
+        _write_file(os.path.join(self.base_path, "data.napybin"), [""])
+        _write_file(os.path.join(self.base_path, "manifest.txt"), ["data.napybin"])
+
+        self.assertEqual(
+            self.batch.collect_batch_jobs(PurePath(self.base_path)),
+            [self.batch.BatchJob(PurePath(self.base_path, "data.napybin"), "binary")],
+        )
+        self.assertEqual(
+            self.batch.collect_batch_jobs(PurePath(self.base_path, "manifest.txt")),
+            [self.batch.BatchJob(PurePath(self.base_path, "data.napybin"), "binary")],
+        )
+
+    def test_createsAConsolidatedResultTable(self):
+        """Creates a consolidated result table."""
+        results = [
+            self.batch.BatchResult(
+                self.batch.BatchJob(PurePath("a"), "legacy"),
+                1.0,
+                0.1,
+                0.5,
+                2.0,
+                0.2,
+                None,
+            ),
+            self.batch.BatchResult(
+                self.batch.BatchJob(PurePath("b.json"), "napytau", "setup"),
+                error="ValueError: broken, really",
+            ),
+        ]
+
+        self.assertEqual(
+            self.batch.create_result_table(results),
+            "path,format,setup,tau_fit,tau_fit_error,tau_factor,tau_custom,"
+            "tau_custom_error,error\n"
+            "a,legacy,,1.0,0.1,0.5,2.0,0.2,\n"
+            'b.json,napytau,setup,,,,,,"ValueError: broken, really"\n',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from pathlib import PurePath
 from re import compile
@@ -118,6 +120,63 @@ class FileCrawlerUnitTest(unittest.TestCase):
                 factory_mock.mock_calls[0].args, ([PurePath("some/directory/file2")],)
             )
 
+    def test_yieldsEveryDirectoryOfTheTreeContainingFilesForAllPatterns(self):
+        """Yields every directory of the tree containing files for all patterns"""
+        with tempfile.TemporaryDirectory() as base_path:
+            for directory, files in [
+                ("", ["a.dat", "b.dat"]),
+                ("first", ["a.dat", "notes.txt"]),
+                ("first/nested/deeper", ["a.dat", "b.dat", "c.dat"]),
+                ("second", ["b.dat"]),
+                ("third", ["b.dat", "a.dat"]),
+            ]:
+                os.makedirs(os.path.join(base_path, directory), exist_ok=True)
+                for file in files:
+                    open(os.path.join(base_path, directory, file), "w").close()
+
+            # The real modules are only imported in isolation, so they do not leak
+            # into the tests mocking os and re
+            with patch.dict("sys.modules"):
+                from napytau.import_export.crawler.file_crawler import FileCrawler
+
+                file_crawler = FileCrawler([compile("a"), compile("b")], lambda x: x)
+                crawled_files = list(
+                    file_crawler.crawl_recursively(PurePath(base_path), 2)
+                )
+
+            self.assertEqual(
+                sorted(crawled_files),
+                [
+                    [PurePath(base_path, "a.dat"), PurePath(base_path, "b.dat")],
+                    [
+                        PurePath(base_path, "first/nested/deeper/a.dat"),
+                        PurePath(base_path, "first/nested/deeper/b.dat"),
+                    ],
+                    [
+                        PurePath(base_path, "third/a.dat"),
+                        PurePath(base_path, "third/b.dat"),
+                    ],
+                ],
+            )
+
+    def test_raisesErrorIfTheRecursivelyCrawledPathIsNotADirectory(self):
+        """Raises an error if the recursively crawled path is not a directory"""
+        os_module_mock, re_module_mock, _, path_mock, isdir_mock, _ = set_up_mocks()
+        isdir_mock.return_value = False
+        with patch.dict(
+            "sys.modules",
+            {
+                "os": os_module_mock,
+                "re": re_module_mock,
+                "os.path": path_mock,
+            },
+        ):
+            from napytau.import_export.crawler.file_crawler import FileCrawler
+
+            file_crawler = FileCrawler([], lambda x: x)
+            with self.assertRaises(ValueError):
+                next(file_crawler.crawl_recursively(PurePath("not_a_directory")))
+
 
 if __name__ == "__main__":
     unittest.main()
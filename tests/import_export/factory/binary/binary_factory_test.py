@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.datapoint import Datapoint
+from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.polynomial import Polynomial
+from napytau.import_export.model.relative_velocity import RelativeVelocity
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+def _create_dataset() -> DataSet:
+    dataset = DataSet(
+        ValueErrorPair(RelativeVelocity(0.03), RelativeVelocity(0.001)),
+        DatapointCollection(
+            [
+                Datapoint(
+                    ValueErrorPair(1.0, 0.1),
+                    calibration=ValueErrorPair(2.0, 0.2),
+                    shifted_intensity=ValueErrorPair(3.0, 0.3),
+                    unshifted_intensity=ValueErrorPair(4.0, 0.4),
+                ),
+                Datapoint(ValueErrorPair(5.0, 0.5), tau=ValueErrorPair(6.0, 0.6)),
+            ]
+        ),
+    )
+    dataset.get_datapoints()[1].set_active(False)
+    dataset.set_tau_factor(0.5)
+    dataset.set_weighted_mean_tau(ValueErrorPair(7.0, 0.7))
+    dataset.set_polynomials([Polynomial([1.0, 2.0]), Polynomial([3.0])])
+
+    return dataset
+
+
+class BinaryFactoryUnitTest(unittest.TestCase):
+    def test_recreatesTheDatasetFromItsMetadataAndArrays(self):
+        """Recreates the dataset from its metadata and arrays."""
+        dataset = _create_dataset()
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_factory import (
+                BinaryFactory,
+            )
+
+            (metadata, arrays) = BinaryFactory.create_metadata_and_arrays(
+                dataset, [{"name": "setup"}]
+            )
+            recreated_dataset = BinaryFactory.create_dataset(metadata, arrays)
+
+        self.assertEqual(metadata["setups"], [{"name": "setup"}])
+        self.assertEqual(
+            recreated_dataset.get_relative_velocity(),
+            dataset.get_relative_velocity(),
+        )
+        self.assertEqual(
+            list(recreated_dataset.get_datapoints()),
+            list(dataset.get_datapoints()),
+        )
+        self.assertFalse(recreated_dataset.get_datapoints()[1].is_active())
+        self.assertEqual(recreated_dataset.get_tau_factor(), 0.5)
+        self.assertEqual(
+            recreated_dataset.get_weighted_mean_tau(), ValueErrorPair(7.0, 0.7)
+        )
+        self.assertEqual(
+            recreated_dataset.get_polynomials(),
+            [Polynomial([1.0, 2.0]), Polynomial([3.0])],
+        )
+        self.assertIsNone(recreated_dataset.get_sampling_points())
+
+    def test_usesTheArraysWithoutCopyingThem(self):
+        """Uses the arrays without copying them."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_factory import (
+                BinaryFactory,
+            )
+
+            (metadata, arrays) = BinaryFactory.create_metadata_and_arrays(
+                _create_dataset()
+            )
+            values = np.array(arrays["values"])
+            arrays["values"] = values
+            recreated_dataset = BinaryFactory.create_dataset(metadata, arrays)
+
+        self.assertTrue(
+            np.shares_memory(recreated_dataset.get_datapoints().columns.values, values)
+        )
+
+    def test_raisesAnErrorIfTheFieldsDoNotMatch(self):
+        """Raises an error if the stored fields do not match the datapoint fields."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_factory import (
+                BinaryFactory,
+            )
+
+            (metadata, arrays) = BinaryFactory.create_metadata_and_arrays(
+                _create_dataset()
+            )
+            metadata["fields"] = list(reversed(metadata["fields"]))
+
+            with self.assertRaises(ImportExportError):
+                BinaryFactory.create_dataset(metadata, arrays)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from napytau.import_export.import_export_error import ImportExportError
+
+
+class BinaryFormatServiceUnitTest(unittest.TestCase):
+    def test_parsesTheMetadataAndArraysItCreated(self):
+        """Parses the metadata and arrays it created."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_format_service import (
+                BINARY_FORMAT_ALIGNMENT,
+                BinaryFormatService,
+            )
+
+            values = np.arange(21, dtype=float).reshape(7, 3)
+            present = np.array([True, False, True])
+            binary_data = b"".join(
+                BinaryFormatService.create_binary_data(
+                    {"name": "test"}, {"values": values, "present": present}
+                )
+            )
+            (metadata, arrays) = BinaryFormatService.parse_binary_data(
+                memoryview(binary_data)
+            )
+
+        self.assertEqual(len(binary_data) % BINARY_FORMAT_ALIGNMENT, 0)
+        self.assertEqual(metadata, {"name": "test"})
+        np.testing.assert_array_equal(arrays["values"], values)
+        np.testing.assert_array_equal(arrays["present"], present)
+
+    def test_createsViewsOnTheBufferInsteadOfCopies(self):
+        """Creates views on the buffer instead of copying the arrays."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_format_service import (
+                BinaryFormatService,
+            )
+
+            buffer = bytearray(
+                b"".join(
+                    BinaryFormatService.create_binary_data({}, {"values": np.zeros(4)})
+                )
+            )
+            (_, arrays) = BinaryFormatService.parse_binary_data(memoryview(buffer))
+
+        arrays["values"][0] = 1.0
+        (_, reparsed_arrays) = BinaryFormatService.parse_binary_data(memoryview(buffer))
+        self.assertEqual(reparsed_arrays["values"][0], 1.0)
+
+    def test_raisesAnErrorForDataInAnotherFormat(self):
+        """Raises an error for data in another format."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_format_service import (
+                BinaryFormatService,
+            )
+
+            with self.assertRaises(ImportExportError):
+                BinaryFormatService.parse_binary_data(memoryview(b"{}" * 16))
+
+    def test_raisesAnErrorForTruncatedData(self):
+        """Raises an error for truncated data."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.binary.binary_format_service import (
+                BinaryFormatService,
+            )
+
+            binary_data = b"".join(
+                BinaryFormatService.create_binary_data({}, {"values": np.zeros(64)})
+            )
+
+            with self.assertRaises(ImportExportError):
+                BinaryFormatService.parse_binary_data(memoryview(binary_data[:-8]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -244,6 +244,121 @@ class LegacyFactoryUnitTest(unittest.TestCase):
         self.assertEqual(dataset.relative_velocity.error.get_velocity(), 1)
         self.assertEqual(len(dataset.datapoints.as_dict()), 1)
 
+    def test_skipsCommentsAndToleratesRepeatedWhitespace(self):
+        """Skips comments and tolerates repeated whitespace"""
+        dataset = LegacyFactory.create_dataset(
+            RawLegacyData(
+                ["1"],
+                [
+                    "# label distance error\n",
+                    "a  1.5\t0.1\n",
+                    "\n",
+                    "b 2.5 0.2 # end\n",
+                ],
+                ["# fit\n", "1.5  10 1 20 2\n", "2.5 30 3 40 4\n"],
+                ["  1.5 0.9 0.01\n", "2.5   0.8 0.02\n"],
+            )
+        )
+
+        self.assertEqual(len(dataset.datapoints), 2)
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(2.5).distance,
+            ValueErrorPair(2.5, 0.2),
+        )
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(2.5).calibration,
+            ValueErrorPair(0.8, 0.02),
+        )
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(1.5).unshifted_intensity,
+            ValueErrorPair(20.0, 2.0),
+        )
+
+    def test_joinsCalibrationAndFitRowsWithTheDistancesInAnyOrder(self):
+        """Joins calibration and fit rows with the distances in any order"""
+        dataset = LegacyFactory.create_dataset(
+            RawLegacyData(
+                ["1"],
+                ["a 3 0.1", "b 1 0.1", "c 2 0.1"],
+                ["2 20 1 21 1", "3 30 1 31 1", "1 10 1 11 1"],
+                ["1 0.1 0.01", "3 0.3 0.01", "2 0.2 0.01"],
+            )
+        )
+
+        self.assertEqual(
+            dataset.datapoints.get_distances().get_values().tolist(), [3, 1, 2]
+        )
+        self.assertEqual(
+            dataset.datapoints.get_calibrations().get_values().tolist(),
+            [0.3, 0.1, 0.2],
+        )
+        self.assertEqual(
+            dataset.datapoints.get_shifted_intensities().get_values().tolist(),
+            [30, 10, 20],
+        )
+        self.assertIsNone(dataset.datapoints[0].feeding_shifted_intensity)
+
+    def test_keepsTheLastRowOfARepeatedDistance(self):
+        """Keeps the last row of a repeated distance, like the datapoints do"""
+        dataset = LegacyFactory.create_dataset(
+            RawLegacyData(
+                ["1"],
+                ["a 1 0.1", "b 2 0.2", "c 1 0.3"],
+                ["1 10 1 11 1", "2 20 1 21 1", "1 12 2 13 2"],
+                ["1 0.1 0.01", "2 0.2 0.01", "1 0.4 0.04"],
+            )
+        )
+
+        self.assertEqual(
+            dataset.datapoints.get_distances().get_values().tolist(), [1, 2]
+        )
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(1).distance,
+            ValueErrorPair(1.0, 0.3),
+        )
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(1).calibration,
+            ValueErrorPair(0.4, 0.04),
+        )
+        self.assertEqual(
+            dataset.datapoints.get_datapoint_by_distance(1).shifted_intensity,
+            ValueErrorPair(12.0, 2.0),
+        )
+
+    def test_createsADatasetFromLazyRowIterators(self):
+        """Creates a dataset from lazy row iterators"""
+        dataset = LegacyFactory.create_dataset(
+            RawLegacyData(
+                iter(["1\n"]),
+                (
+                    f"{label} {distance} 0.1\n"
+                    for label, distance in [("a", 1), ("b", 2)]
+                ),
+                iter(["# distance\n", "1 10 1 11 1\r\n", "2 20 1 21 1\n"]),
+                iter(["1 0.1 0.01\n", "2 0.2 0.01\n"]),
+            )
+        )
+
+        self.assertEqual(
+            dataset.datapoints.get_distances().get_values().tolist(), [1, 2]
+        )
+        self.assertEqual(
+            dataset.datapoints.get_unshifted_intensities().get_values().tolist(),
+            [11, 21],
+        )
+
+    def test_raisesAnExceptionIfAFitRowReferencesAnUnknownDistance(self):
+        """Raises an exception if a fit row references an unknown distance"""
+        with self.assertRaises(ValueError):
+            LegacyFactory.create_dataset(
+                RawLegacyData(
+                    ["1"],
+                    ["a 1 0.1"],
+                    ["2 1 1 1 1"],
+                    ["1 1 1"],
+                )
+            )
+
     def test_raisesAnErrorIfTheProvidedSetupDataIsInvalidWhenEnrichingADataSet(self):
         """Raises an error if the provided setup data is invalid when enriching a dataset"""
         dataset = create_dummy_dataset()
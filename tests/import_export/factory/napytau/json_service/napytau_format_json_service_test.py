@@ -1,9 +1,14 @@
+import io
+import json
 import unittest
-from unittest.mock import MagicMock, patch
+from typing import Optional, Tuple
+from unittest.mock import MagicMock, call, patch
 
 from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
 from napytau.import_export.model.dataset import DataSet
+from napytau.import_export.model.polynomial import Polynomial
 from napytau.import_export.model.relative_velocity import RelativeVelocity
 from napytau.util.model.value_error_pair import ValueErrorPair
 
@@ -19,6 +24,53 @@ def set_up_mocks() -> (MagicMock, MagicMock):
     return json_module_mock, jsonschema_module_mock
 
 
+def _get_streamed_document() -> Tuple[str, dict, list]:
+    """
+    Returns a compact document whose numbers have fractions and signed exponents,
+    with the relative velocity written after the datapoints, together with the
+    fields and datapoints streaming it should yield.
+    """
+    datapoint = {
+        "distance": 12.5,
+        "distanceError": 2.5e-05,
+        "calibration": 1.75,
+        "calibrationError": 0.1,
+        "shiftedIntensity": 1000.125,
+        "shiftedIntensityError": 1e-07,
+        "unshiftedIntensity": 1,
+        "unshiftedIntensityError": 0.1,
+    }
+    datapoints = [datapoint, {**datapoint, "distance": 13.5, "calibration": 120}]
+    json_data = {
+        "datapoints": datapoints,
+        "relativeVelocity": 0.03125,
+        "relativeVelocityError": 1.5e-03,
+        "setups": [],
+    }
+
+    return (
+        json.dumps(json_data, sort_keys=True, separators=(",", ":")),
+        {**json_data, "datapoints": []},
+        datapoints,
+    )
+
+
+class _SplitStream(io.StringIO):
+    """A text stream whose first read ends at the given offset."""
+
+    def __init__(self, text: str, offset: int):
+        super().__init__(text)
+        self._offset: Optional[int] = offset
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if self._offset is None:
+            return super().read(size)
+
+        (offset, self._offset) = (self._offset, None)
+
+        return super().read(offset)
+
+
 class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
     def test_raisesAnImportExportErrorWhenTheRawDataCanNotBeParsed(self):
         """Raises an ImportExportError when the raw data can not be parsed."""
@@ -61,8 +113,8 @@ class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
 
             self.assertEqual(data, {})
 
-    def test_usesTheJsonModuleToLoadTheSchema(self):
-        """Uses the json module to load the schema."""
+    def test_usesTheJsonModuleToLoadTheSchemaOnlyOnce(self):
+        """Uses the json module to load the schema only once."""
         json_module_mock, jsonschema_module_mock = set_up_mocks()
 
         json_module_mock.loads.return_value = {}
@@ -79,13 +131,17 @@ class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
                 _SCHEMA,
             )  # noqa E501
 
+            NapytauFormatJsonService.validate_against_schema({})
             NapytauFormatJsonService.validate_against_schema({})
             json_module_mock.loads.assert_called_once_with(_SCHEMA)
 
     def test_raisesAnImportExportErrorWhenTheRawDataDoesNotMatchTheSchema(self):
         """Raises an ImportExportError when the raw data does not match the schema."""
         json_module_mock, jsonschema_module_mock = set_up_mocks()
-        jsonschema_module_mock.validate.side_effect = BaseException("error")
+        validator_mock = (
+            jsonschema_module_mock.validators.validator_for.return_value.return_value
+        )
+        validator_mock.validate.side_effect = BaseException("error")
 
         with patch.dict(
             "sys.modules",
@@ -101,12 +157,14 @@ class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
             with self.assertRaises(ImportExportError):
                 NapytauFormatJsonService.validate_against_schema({})
 
-    def test_usesTheJsonSchemaModuleToValidateTheRawData(self):
-        """Uses the json schema module to validate the raw data."""
+    def test_usesACompiledJsonSchemaValidatorToValidateTheRawData(self):
+        """Uses a compiled json schema validator to validate the raw data."""
         json_module_mock, jsonschema_module_mock = set_up_mocks()
 
         json_module_mock.loads.return_value = {}
-        jsonschema_module_mock.validate.return_value = None
+        validator_class_mock = (
+            jsonschema_module_mock.validators.validator_for.return_value
+        )
 
         with patch.dict(
             "sys.modules",
@@ -120,9 +178,12 @@ class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
             )  # noqa E501
 
             self.assertTrue(NapytauFormatJsonService.validate_against_schema({}))
-            jsonschema_module_mock.validate.assert_called_once_with(
-                instance={},
-                schema={},
+            self.assertTrue(NapytauFormatJsonService.validate_against_schema({}))
+            jsonschema_module_mock.validators.validator_for.assert_called_once_with({})
+            validator_class_mock.assert_called_once_with({})
+            self.assertEqual(
+                validator_class_mock.return_value.validate.mock_calls,
+                [call({}), call({})],
             )
 
     def test_raisesAnImportExportErrorWhenTheProvidedDatasetCanNotBeConvertedToJSON(
@@ -193,6 +254,289 @@ class NapytauFormatJsonServiceUnitTest(unittest.TestCase):
                 indent=2,
             )
 
+    def test_writesTheSameJsonAsTheCalculationDataStringUnlessCompact(self):
+        """Writes the same json as the calculation data string unless compact."""
+        dataset = DataSet(
+            relative_velocity=ValueErrorPair(
+                RelativeVelocity(0.1), RelativeVelocity(0)
+            ),
+            datapoints=DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(1.0, 0.1),
+                        shifted_intensity=ValueErrorPair(2.0, 0.2),
+                        unshifted_intensity=ValueErrorPair(3.0, 0.3),
+                        tau=ValueErrorPair(4.0, 0.4),
+                    ),
+                    Datapoint(
+                        ValueErrorPair(5.0, 0.5),
+                        shifted_intensity=ValueErrorPair(6.0, 0.6),
+                        unshifted_intensity=ValueErrorPair(7.0, 0.7),
+                        feeding_shifted_intensity=ValueErrorPair(8.0, 0.8),
+                        feeding_unshifted_intensity=ValueErrorPair(9.0, 0.9),
+                        tau=ValueErrorPair(10.0, 1.0),
+                    ),
+                ]
+            ),
+            tau_factor=1.0,
+            weighted_mean_tau=ValueErrorPair(2.0, 1.1),
+            sampling_points=[1.0, 2.0],
+            polynomial_count=1,
+            polynomials=[Polynomial([1.0, 2.0])],
+        )
+
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (
+                NapytauFormatJsonService,
+            )
+
+            json_string = NapytauFormatJsonService.create_calculation_data_json_string(
+                dataset
+            )
+            indented_stream = io.StringIO()
+            compact_stream = io.StringIO()
+            # Write every datapoint in its own batch to cover the batch boundaries
+            with patch(
+                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service.WRITE_BATCH_SIZE",
+                1,
+            ):
+                NapytauFormatJsonService.write_calculation_data_json(
+                    dataset, indented_stream
+                )
+                NapytauFormatJsonService.write_calculation_data_json(
+                    dataset, compact_stream, compact=True
+                )
+
+        self.assertEqual(indented_stream.getvalue(), json_string)
+        self.assertEqual(
+            compact_stream.getvalue(),
+            json.dumps(json.loads(json_string), separators=(",", ":")),
+        )
+
+    def test_raisesAnImportExportErrorWhenAWrittenDatapointHasNoTau(self):
+        """Raises an ImportExportError when a written datapoint has no tau."""
+        dataset = DataSet(
+            relative_velocity=ValueErrorPair(
+                RelativeVelocity(0.1), RelativeVelocity(0)
+            ),
+            datapoints=DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(1.0, 0.1),
+                        shifted_intensity=ValueErrorPair(2.0, 0.2),
+                        unshifted_intensity=ValueErrorPair(3.0, 0.3),
+                    ),
+                ]
+            ),
+            tau_factor=1.0,
+            weighted_mean_tau=ValueErrorPair(2.0, 1.1),
+            polynomials=[],
+        )
+
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (
+                NapytauFormatJsonService,
+            )
+
+            with self.assertRaises(ImportExportError):
+                NapytauFormatJsonService.write_calculation_data_json(
+                    dataset, io.StringIO()
+                )
+
+    def test_streamsTheDatapointsToTheConsumerAndReturnsTheOtherFields(self):
+        """Streams the datapoints to the consumer and returns the other fields."""
+        datapoint = {
+            "distance": 12.5,
+            "distanceError": 0.25,
+            "calibration": 1,
+            "calibrationError": 0.1,
+            "shiftedIntensity": 1000.125,
+            "shiftedIntensityError": 0.1,
+            "unshiftedIntensity": 1,
+            "unshiftedIntensityError": 0.1,
+        }
+        json_string = json.dumps(
+            {
+                "relativeVelocity": 0.03125,
+                "datapoints": [datapoint, {**datapoint, "distance": 13.5}],
+                "relativeVelocityError": 0.001,
+                "setups": [],
+            },
+            indent=2,
+        )
+        streamed_datapoints = []
+
+        # The real modules are only imported in isolation, so they do not leak
+        # into the tests mocking json and jsonschema
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+            )
+
+            # A small chunk size splits numbers, keys and records between chunks
+            json_data = NapytauFormatJsonService.stream_json_data(
+                io.StringIO(json_string), streamed_datapoints.append, 3
+            )
+
+        self.assertEqual(
+            json_data,
+            {
+                "relativeVelocity": 0.03125,
+                "datapoints": [],
+                "relativeVelocityError": 0.001,
+                "setups": [],
+            },
+        )
+        self.assertEqual(
+            streamed_datapoints, [datapoint, {**datapoint, "distance": 13.5}]
+        )
+
+    def test_streamsADocumentSplitBetweenChunksAtAnyOffset(self):
+        """Streams a document split between two chunks at any offset."""
+        (json_string, expected_json_data, expected_datapoints) = (
+            _get_streamed_document()
+        )
+
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+            )
+
+            for offset in range(1, len(json_string)):
+                streamed_datapoints: list = []
+                json_data = NapytauFormatJsonService.stream_json_data(
+                    _SplitStream(json_string, offset), streamed_datapoints.append
+                )
+
+                self.assertEqual(json_data, expected_json_data, f"offset {offset}")
+                self.assertEqual(
+                    streamed_datapoints, expected_datapoints, f"offset {offset}"
+                )
+
+    def test_streamsADocumentReadInChunksOfAnySize(self):
+        """Streams a document read in chunks of any size."""
+        (json_string, expected_json_data, expected_datapoints) = (
+            _get_streamed_document()
+        )
+
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+            )
+
+            for chunk_size in range(1, len(json_string) + 1):
+                streamed_datapoints: list = []
+                json_data = NapytauFormatJsonService.stream_json_data(
+                    io.StringIO(json_string), streamed_datapoints.append, chunk_size
+                )
+
+                self.assertEqual(
+                    json_data, expected_json_data, f"chunk size {chunk_size}"
+                )
+                self.assertEqual(
+                    streamed_datapoints, expected_datapoints, f"chunk size {chunk_size}"
+                )
+
+    def test_raisesAnImportExportErrorWhenAStreamedDatapointDoesNotMatchTheSchema(
+        self,
+    ):
+        """Raises an ImportExportError when a streamed datapoint does not match the schema."""  # noqa: E501
+        json_string = json.dumps(
+            {
+                "relativeVelocity": 0.03,
+                "relativeVelocityError": 0.001,
+                "datapoints": [{"distance": -1}],
+                "setups": [],
+            }
+        )
+
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+            )
+
+            with self.assertRaises(ImportExportError):
+                NapytauFormatJsonService.stream_json_data(
+                    io.StringIO(json_string), lambda _: None
+                )
+
+    def test_raisesAnImportExportErrorWhenTheStreamedDataCanNotBeParsed(self):
+        """Raises an ImportExportError when the streamed data can not be parsed."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+            )
+
+            for json_string in ['{"relativeVelocity": 0.03', '{"datapoints": [{]}']:
+                with self.assertRaises(ImportExportError):
+                    NapytauFormatJsonService.stream_json_data(
+                        io.StringIO(json_string), lambda _: None
+                    )
+
+    def test_validatesDatapointsLikeTheJsonSchema(self):
+        """Validates datapoints like the json schema."""
+        valid_datapoint = {
+            "distance": 1,
+            "distanceError": 0.1,
+            "calibration": 1.5,
+            "calibrationError": 0,
+            "shiftedIntensity": 1,
+            "shiftedIntensityError": 0.1,
+            "unshiftedIntensity": 1,
+            "unshiftedIntensityError": 0.1,
+            "feedingShiftedIntensity": 2,
+        }
+        datapoints = [
+            valid_datapoint,
+            "not an object",
+            {**valid_datapoint, "distance": -1},
+            {**valid_datapoint, "calibration": "1"},
+            {**valid_datapoint, "calibration": True},
+            {**valid_datapoint, "feedingShiftedIntensity": -0.5},
+            {key: value for key, value in valid_datapoint.items() if key != "distance"},
+            {**valid_datapoint, "unknownKey": "ignored"},
+        ]
+
+        with patch.dict("sys.modules"):
+            import jsonschema
+
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+                _SCHEMA,
+            )
+
+            datapoint_schema = json.loads(_SCHEMA)["properties"]["datapoints"]["items"]
+            for index, datapoint in enumerate(datapoints):
+                is_valid = jsonschema.Draft202012Validator(datapoint_schema).is_valid(
+                    datapoint
+                )
+                try:
+                    NapytauFormatJsonService.validate_datapoint(datapoint, index)
+                    is_accepted = True
+                except ImportExportError:
+                    is_accepted = False
+
+                self.assertEqual(is_accepted, is_valid, datapoint)
+
+    def test_validatesOnlyASampleOfTheDatapointsOrNoneDependingOnTheMode(self):
+        """Validates only a sample of the datapoints or none depending on the mode."""
+        with patch.dict("sys.modules"):
+            from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (  # noqa E501
+                NapytauFormatJsonService,
+                VALIDATION_MODE_NONE,
+                VALIDATION_MODE_SAMPLE,
+                VALIDATION_SAMPLE_INTERVAL,
+            )
+
+            NapytauFormatJsonService.validate_datapoint(
+                {}, VALIDATION_SAMPLE_INTERVAL + 1, VALIDATION_MODE_SAMPLE
+            )
+            NapytauFormatJsonService.validate_datapoint({}, 0, VALIDATION_MODE_NONE)
+            with self.assertRaises(ImportExportError):
+                NapytauFormatJsonService.validate_datapoint(
+                    {}, VALIDATION_SAMPLE_INTERVAL, VALIDATION_MODE_SAMPLE
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
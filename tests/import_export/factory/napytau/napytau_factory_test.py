@@ -208,6 +208,81 @@ class NapytauFactoryUnitTest(unittest.TestCase):
 
             self.assertTrue(datapoint.active)
 
+    def test_canCreateADatasetFromAStreamOfDatapoints(self):
+        """Can create a dataset from a stream of datapoints"""
+        napytau_format_json_service_module_mock = MagicMock()
+        napytau_format_json_service_mock = MagicMock()
+        napytau_format_json_service_module_mock.NapytauFormatJsonService = (
+            napytau_format_json_service_mock
+        )
+
+        def stream_json_data(json_stream, datapoint_consumer, validation_mode):
+            datapoint_consumer(
+                {
+                    "distance": 2,
+                    "distanceError": 0.2,
+                    "calibration": 3,
+                    "calibrationError": 0.3,
+                    "shiftedIntensity": 4,
+                    "shiftedIntensityError": 0.4,
+                    "unshiftedIntensity": 5,
+                    "unshiftedIntensityError": 0.5,
+                }
+            )
+            datapoint_consumer(
+                {
+                    "distance": 1,
+                    "distanceError": 0.1,
+                    "calibration": 1,
+                    "calibrationError": 0.1,
+                    "shiftedIntensity": 1,
+                    "shiftedIntensityError": 0.1,
+                    "unshiftedIntensity": 1,
+                    "unshiftedIntensityError": 0.1,
+                    "feedingShiftedIntensity": 6,
+                    "feedingShiftedIntensityError": 0.6,
+                    "feedingUnshiftedIntensity": 7,
+                    "feedingUnshiftedIntensityError": 0.7,
+                }
+            )
+            return {
+                "relativeVelocity": 0.5,
+                "relativeVelocityError": 0.1,
+                "datapoints": [],
+                "setups": ["setup"],
+            }
+
+        napytau_format_json_service_mock.stream_json_data.side_effect = stream_json_data
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": napytau_format_json_service_module_mock,
+            },
+        ):
+            from napytau.import_export.factory.napytau.napytau_factory import (
+                NapyTauFactory,
+            )
+
+            (dataset, raw_json_data) = NapyTauFactory.create_dataset_from_stream(
+                MagicMock()
+            )
+
+            self.assertEqual(raw_json_data["setups"], ["setup"])
+            self.assertEqual(dataset.relative_velocity.value.get_velocity(), 0.5)
+            self.assertEqual(len(dataset.datapoints), 2)
+            self.assertEqual(
+                dataset.datapoints[0].unshifted_intensity, ValueErrorPair(5.0, 0.5)
+            )
+            self.assertIsNone(dataset.datapoints[0].feeding_shifted_intensity)
+            self.assertEqual(
+                dataset.datapoints.get_datapoint_by_distance(
+                    1
+                ).feeding_unshifted_intensity,
+                ValueErrorPair(7.0, 0.7),
+            )
+            self.assertIsNone(dataset.datapoints[1].tau)
+
 
 if __name__ == "__main__":
     unittest.main()
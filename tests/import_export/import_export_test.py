@@ -1,3 +1,6 @@
+import json
+import os
+import tempfile
 import unittest
 from pathlib import PurePath
 from unittest.mock import MagicMock, patch
@@ -6,6 +9,8 @@ from napytau.import_export.crawler.legacy_setup_files import LegacySetupFiles
 from napytau.import_export.factory.legacy.raw_legacy_setup_data import (
     RawLegacySetupData,
 )
+from napytau.import_export.import_export_error import ImportExportError
+from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
 from napytau.import_export.model.dataset import DataSet
 from napytau.import_export.model.relative_velocity import RelativeVelocity
@@ -38,6 +43,7 @@ def set_up_mocks() -> (
     file_reader_module_mock.FileReader = file_reader_mock
     read_rows_mock = MagicMock()
     file_reader_mock.read_rows = read_rows_mock
+    file_reader_mock.iterate_rows = MagicMock()
     regex_module_mock = MagicMock()
     compile_regex_mock = MagicMock()
     regex_module_mock.compile = compile_regex_mock
@@ -201,22 +207,138 @@ class IngestUnitTest(unittest.TestCase):
 
             import_legacy_format_from_files(PurePath("test_directory"))
             self.assertEqual(
-                file_reader_module_mock.FileReader.read_rows.mock_calls[0].args[0],
+                file_reader_module_mock.FileReader.iterate_rows.mock_calls[0].args[0],
                 PurePath("test_v_c"),
             )
             self.assertEqual(
-                file_reader_module_mock.FileReader.read_rows.mock_calls[1].args[0],
+                file_reader_module_mock.FileReader.iterate_rows.mock_calls[1].args[0],
                 PurePath("test_distances.dat"),
             )
             self.assertEqual(
-                file_reader_module_mock.FileReader.read_rows.mock_calls[2].args[0],
+                file_reader_module_mock.FileReader.iterate_rows.mock_calls[2].args[0],
                 PurePath("test_fit"),
             )
             self.assertEqual(
-                file_reader_module_mock.FileReader.read_rows.mock_calls[3].args[0],
+                file_reader_module_mock.FileReader.iterate_rows.mock_calls[3].args[0],
                 PurePath("test_norm.fac"),
             )
 
+    def test_yieldsTheSetupDirectoryAndDatasetForEverySetupInTheDirectoryTree(self):
+        """Yields the setup directory and dataset for every setup in the directory tree."""  # noqa: E501
+        (
+            legacy_factory_module_mock,
+            file_crawler_module_mock,
+            file_reader_module_mock,
+            regex_module_mock,
+            naptau_format_json_service_module_mock,
+            _,
+            _,
+        ) = set_up_mocks()
+        file_crawler_module_mock.FileCrawler.crawl_recursively.return_value = iter(
+            [
+                LegacySetupFiles(
+                    PurePath("archive/first/distances.dat"),
+                    PurePath("archive/first/v_c"),
+                    PurePath("archive/first/first.fit"),
+                    PurePath("archive/first/norm.fac"),
+                ),
+                LegacySetupFiles(
+                    PurePath("archive/second/distances.dat"),
+                    PurePath("archive/second/v_c"),
+                    PurePath("archive/second/second.fit"),
+                    PurePath("archive/second/norm.fac"),
+                ),
+            ]
+        )
+        legacy_factory_module_mock.LegacyFactory.create_dataset.side_effect = [
+            "first dataset",
+            "second dataset",
+        ]
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.import_export.factory.legacy.legacy_factory": legacy_factory_module_mock,
+                "napytau.import_export.crawler.file_crawler": file_crawler_module_mock,
+                "napytau.import_export.reader.file_reader": file_reader_module_mock,
+                "re": regex_module_mock,
+                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": naptau_format_json_service_module_mock,
+            },
+        ):
+            from napytau.import_export.import_export import (
+                import_legacy_format_from_directory_tree,
+            )
+
+            datasets = list(
+                import_legacy_format_from_directory_tree(PurePath("archive"), 4)
+            )
+
+            self.assertEqual(
+                datasets,
+                [
+                    (PurePath("archive/first"), "first dataset"),
+                    (PurePath("archive/second"), "second dataset"),
+                ],
+            )
+            self.assertEqual(
+                file_crawler_module_mock.FileCrawler.crawl_recursively.mock_calls[
+                    0
+                ].args,
+                (PurePath("archive"), 4),
+            )
+            self.assertEqual(
+                len(file_reader_module_mock.FileReader.iterate_rows.mock_calls), 8
+            )
+
+    def test_findsTheSetupDirectoriesInTheDirectoryTreeWithoutReadingThem(self):
+        """Finds the setup directories in the directory tree without reading them."""
+        (
+            legacy_factory_module_mock,
+            file_crawler_module_mock,
+            file_reader_module_mock,
+            regex_module_mock,
+            naptau_format_json_service_module_mock,
+            _,
+            _,
+        ) = set_up_mocks()
+        file_crawler_module_mock.FileCrawler.crawl_recursively.return_value = iter(
+            [
+                LegacySetupFiles(
+                    PurePath("archive/first/distances.dat"),
+                    PurePath("archive/first/v_c"),
+                    PurePath("archive/first/first.fit"),
+                    PurePath("archive/first/norm.fac"),
+                ),
+            ]
+        )
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.import_export.factory.legacy.legacy_factory": legacy_factory_module_mock,
+                "napytau.import_export.crawler.file_crawler": file_crawler_module_mock,
+                "napytau.import_export.reader.file_reader": file_reader_module_mock,
+                "re": regex_module_mock,
+                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": naptau_format_json_service_module_mock,
+            },
+        ):
+            from napytau.import_export.import_export import (
+                find_legacy_setup_directories,
+            )
+
+            directories = list(find_legacy_setup_directories(PurePath("archive"), 4))
+
+            self.assertEqual(directories, [PurePath("archive/first")])
+            self.assertEqual(
+                file_crawler_module_mock.FileCrawler.crawl_recursively.mock_calls[
+                    0
+                ].args,
+                (PurePath("archive"), 4),
+            )
+            self.assertEqual(
+                len(file_reader_module_mock.FileReader.iterate_rows.mock_calls), 0
+            )
+
     def test_callsTheLegacyFactoryWithTheRawLegacyDataIfNoFitFileIsProvided(
         self,
     ):
@@ -239,7 +361,7 @@ class IngestUnitTest(unittest.TestCase):
             PurePath("test_fit"),
             PurePath("test_norm.fac"),
         )
-        file_reader_module_mock.FileReader.read_rows.side_effect = [
+        file_reader_module_mock.FileReader.iterate_rows.side_effect = [
             ["v_c_row"],
             ["distances.dat_row"],
             ["fit_row"],
@@ -308,7 +430,7 @@ class IngestUnitTest(unittest.TestCase):
             PurePath("test_fit"),
             PurePath("test_norm.fac"),
         )
-        file_reader_module_mock.FileReader.read_rows.side_effect = [
+        file_reader_module_mock.FileReader.iterate_rows.side_effect = [
             ["v_c_row"],
             ["distances.dat_row"],
             ["fit_row"],
@@ -604,6 +726,121 @@ class IngestUnitTest(unittest.TestCase):
                 ["setup1", "setup2"],
             )
 
+    def test_streamsADatasetFromTheOpenedFile(self):
+        """Streams a dataset from the opened file."""
+        (
+            legacy_factory_module_mock,
+            file_crawler_module_mock,
+            file_reader_module_mock,
+            regex_module_mock,
+            naptau_format_json_service_module_mock,
+            napytau_factory_module_mock,
+            _,
+        ) = set_up_mocks()
+        json_stream_mock = MagicMock()
+        file_reader_module_mock.FileReader.open_text.return_value.__enter__.return_value = json_stream_mock  # noqa: E501
+        dataset = DataSet(
+            ValueErrorPair(RelativeVelocity(1), RelativeVelocity(0.1)),
+            DatapointCollection([]),
+        )
+        napytau_factory_module_mock.NapyTauFactory.create_dataset_from_stream.return_value = (  # noqa: E501
+            dataset,
+            {"setups": ["setup1"]},
+        )
+
+        with patch.dict(
+            "sys.modules",
+            {
+                "napytau.import_export.factory.legacy.legacy_factory": legacy_factory_module_mock,
+                "napytau.import_export.crawler.file_crawler": file_crawler_module_mock,
+                "napytau.import_export.reader.file_reader": file_reader_module_mock,
+                "re": regex_module_mock,
+                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": naptau_format_json_service_module_mock,
+                "napytau.import_export.factory.napytau.napytau_factory": napytau_factory_module_mock,
+            },
+        ):
+            from napytau.import_export.import_export import (
+                stream_napytau_format_from_file,
+            )
+
+            result = stream_napytau_format_from_file(PurePath("test.napytau.json"))
+
+            self.assertEqual(result, (dataset, ["setup1"]))
+            self.assertEqual(
+                file_reader_module_mock.FileReader.open_text.mock_calls[0].args[0],
+                PurePath("test.napytau.json"),
+            )
+            self.assertEqual(
+                napytau_factory_module_mock.NapyTauFactory.create_dataset_from_stream.mock_calls[  # noqa: E501
+                    0
+                ].args[0],
+                json_stream_mock,
+            )
+            self.assertEqual(
+                len(
+                    file_reader_module_mock.FileReader.open_text.return_value.__exit__.mock_calls
+                ),  # noqa: E501
+                1,
+            )
+
+    def test_skipsTheValidationOfTrustedFilesOnlyIfTheirChecksumMatches(self):
+        """Skips the validation of trusted files only if their checksum matches."""
+        for checksum, expected_validation_mode in [
+            ("ABC123  test.napytau.json\n", "VALIDATION_MODE_NONE"),
+            ("def456  test.napytau.json\n", "VALIDATION_MODE_FULL"),
+        ]:
+            (
+                legacy_factory_module_mock,
+                file_crawler_module_mock,
+                file_reader_module_mock,
+                regex_module_mock,
+                naptau_format_json_service_module_mock,
+                napytau_factory_module_mock,
+                _,
+            ) = set_up_mocks()
+            file_reader_module_mock.FileReader.read_text.return_value = checksum
+            file_reader_module_mock.FileReader.calculate_checksum.return_value = (
+                "abc123"
+            )
+            napytau_factory_module_mock.NapyTauFactory.create_dataset_from_stream.return_value = (  # noqa: E501
+                MagicMock(),
+                {"setups": []},
+            )
+
+            with patch.dict(
+                "sys.modules",
+                {
+                    "napytau.import_export.factory.legacy.legacy_factory": legacy_factory_module_mock,
+                    "napytau.import_export.crawler.file_crawler": file_crawler_module_mock,
+                    "napytau.import_export.reader.file_reader": file_reader_module_mock,
+                    "re": regex_module_mock,
+                    "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": naptau_format_json_service_module_mock,
+                    "napytau.import_export.factory.napytau.napytau_factory": napytau_factory_module_mock,
+                },
+            ):
+                from napytau.import_export.import_export import (
+                    stream_napytau_format_from_file,
+                )
+
+                stream_napytau_format_from_file(
+                    PurePath("test.napytau.json"),
+                    naptau_format_json_service_module_mock.VALIDATION_MODE_TRUSTED,
+                )
+
+                self.assertEqual(
+                    file_reader_module_mock.FileReader.read_text.mock_calls[0].args[0],
+                    PurePath("test.napytau.json.sha256"),
+                )
+                self.assertEqual(
+                    napytau_factory_module_mock.NapyTauFactory.create_dataset_from_stream.mock_calls[  # noqa: E501
+                        0
+                    ].kwargs["validation_mode"],
+                    getattr(
+                        naptau_format_json_service_module_mock,
+                        expected_validation_mode,
+                    ),
+                )
+
     def test_raisesAnExceptionIfTheSetupWithTheGivenNameIsNotFoundInTheProvidedRawSetups(
         self,
     ):
@@ -701,10 +938,10 @@ class IngestUnitTest(unittest.TestCase):
                 {"name": "setup1"},
             )
 
-    def test_usesTheJSONFormatServiceToCreateACalculationDataStringFromTheGivenDatasetWhenSavingNapytauCalculationDataToAFile(
+    def test_usesTheJSONFormatServiceToWriteTheCalculationDataToAnAtomicallyOpenedFile(
         self,
     ):
-        """Uses the JSON format service to create a calculation data string from the given dataset when saving Napytau calculation data to a file."""
+        """Uses the JSON format service to write the calculation data of the given dataset to an atomically opened file."""
         (
             legacy_factory_module_mock,
             file_crawler_module_mock,
@@ -714,7 +951,8 @@ class IngestUnitTest(unittest.TestCase):
             napytau_factory_module_mock,
             file_writer_module_mock,
         ) = set_up_mocks()
-        napytau_format_json_service_module_mock.NapytauFormatJsonService.create_calculation_data_json_string.return_value = "test_calculation_data_string"
+        json_stream_mock = MagicMock()
+        file_writer_module_mock.FileWriter.open_text_atomically.return_value.__enter__.return_value = json_stream_mock
 
         with patch.dict(
             "sys.modules",
@@ -742,61 +980,198 @@ class IngestUnitTest(unittest.TestCase):
                 PurePath("test_file"),
             )
 
-            self.assertEqual(
-                napytau_format_json_service_module_mock.NapytauFormatJsonService.create_calculation_data_json_string.mock_calls[
-                    0
-                ].args[0],
-                dataset,
+            file_writer_module_mock.FileWriter.open_text_atomically.assert_called_once_with(
+                PurePath("test_file")
+            )
+            napytau_format_json_service_module_mock.NapytauFormatJsonService.write_calculation_data_json.assert_called_once_with(
+                dataset, json_stream_mock, False
             )
 
-    def test_usesTheFileWriterToWriteTheCalculationDataStringToTheFile(self):
-        """Uses the file writer to write the calculation data string to the file."""
-        (
-            legacy_factory_module_mock,
-            file_crawler_module_mock,
-            file_reader_module_mock,
-            regex_module_mock,
-            napytau_format_json_service_module_mock,
-            napytau_factory_module_mock,
-            file_writer_module_mock,
-        ) = set_up_mocks()
-        napytau_format_json_service_module_mock.NapytauFormatJsonService.create_calculation_data_json_string.return_value = "test_calculation_data_string"
+    def test_savesCompactCalculationDataWhichParsesLikeTheIndentedString(self):
+        """Saves compact calculation data which parses like the indented string."""
+        dataset = DataSet(
+            ValueErrorPair(RelativeVelocity(0.03), RelativeVelocity(0.001)),
+            DatapointCollection(
+                [
+                    Datapoint(
+                        ValueErrorPair(1.0, 0.1),
+                        shifted_intensity=ValueErrorPair(2.0, 0.2),
+                        unshifted_intensity=ValueErrorPair(3.0, 0.3),
+                        tau=ValueErrorPair(4.0, 0.4),
+                    ),
+                ]
+            ),
+            tau_factor=0.5,
+            weighted_mean_tau=ValueErrorPair(4.0, 0.4),
+            sampling_points=[1.0],
+            polynomials=[],
+        )
 
-        with patch.dict(
-            "sys.modules",
-            {
-                "napytau.import_export.factory.legacy.legacy_factory": legacy_factory_module_mock,
-                "napytau.import_export.crawler.file_crawler": file_crawler_module_mock,
-                "napytau.import_export.reader.file_reader": file_reader_module_mock,
-                "re": regex_module_mock,
-                "napytau.import_export.factory.napytau.json_service.napytau_format_json_service": napytau_format_json_service_module_mock,
-                "napytau.import_export.factory.napytau.napytau_factory": napytau_factory_module_mock,
-                "napytau.import_export.writer.file_writer": file_writer_module_mock,
-            },
-        ):
-            from napytau.import_export.import_export import (
-                save_napytau_calculation_data_to_file,
-            )
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "data.json"))
+            with patch.dict("sys.modules"):
+                from napytau.import_export.factory.napytau.json_service.napytau_format_json_service import (
+                    NapytauFormatJsonService,
+                )
+                from napytau.import_export.import_export import (
+                    save_napytau_calculation_data_to_file,
+                )
 
-            dataset = DataSet(
-                ValueErrorPair(RelativeVelocity(1), RelativeVelocity(0.1)),
-                DatapointCollection([]),
-            )
+                save_napytau_calculation_data_to_file(dataset, file_path, compact=True)
+                with open(file_path) as file:
+                    saved_json = file.read()
+
+                self.assertNotIn("\n", saved_json)
+                self.assertEqual(
+                    json.loads(saved_json),
+                    json.loads(
+                        NapytauFormatJsonService.create_calculation_data_json_string(
+                            dataset
+                        )
+                    ),
+                )
+                self.assertEqual(os.listdir(directory_path), ["data.json"])
+
+    def test_savesAndImportsADatasetInTheBinaryFormat(self):
+        """Saves a dataset in the binary format and imports it memory-mapped."""
+        dataset = DataSet(
+            ValueErrorPair(RelativeVelocity(0.03), RelativeVelocity(0.001)),
+            DatapointCollection(
+                [
+                    Datapoint(ValueErrorPair(1.0, 0.1), ValueErrorPair(2.0, 0.2)),
+                    Datapoint(ValueErrorPair(3.0, 0.3), tau=ValueErrorPair(4.0, 0.4)),
+                ]
+            ),
+        )
+        raw_setups = [{"name": "setup", "tauFactor": 0.5}]
+
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "data.napybin"))
+            with patch.dict("sys.modules"):
+                from napytau.import_export.import_export import (
+                    import_binary_format_from_file,
+                    save_binary_format_to_file,
+                )
 
-            save_napytau_calculation_data_to_file(
-                dataset,
-                PurePath("test_file"),
-            )
+                save_binary_format_to_file(dataset, file_path, raw_setups)
+                (imported_dataset, imported_raw_setups) = (
+                    import_binary_format_from_file(file_path)
+                )
 
+            self.assertEqual(imported_raw_setups, raw_setups)
             self.assertEqual(
-                file_writer_module_mock.FileWriter.write_text.mock_calls[0].args[0],
-                PurePath("test_file"),
+                list(imported_dataset.get_datapoints()),
+                list(dataset.get_datapoints()),
             )
             self.assertEqual(
-                file_writer_module_mock.FileWriter.write_text.mock_calls[0].args[1],
-                "test_calculation_data_string",
+                imported_dataset.get_relative_velocity(),
+                dataset.get_relative_velocity(),
             )
 
+    def test_savesAnImportedBinaryFormatFileToTheSamePath(self):
+        """Saves a dataset imported from a binary format file back to that file."""
+        dataset = DataSet(
+            ValueErrorPair(RelativeVelocity(0.5), RelativeVelocity(0.01)),
+            DatapointCollection(
+                [
+                    Datapoint(ValueErrorPair(1.0, 0.1), ValueErrorPair(2.0, 0.2)),
+                    Datapoint(ValueErrorPair(3.0, 0.3), ValueErrorPair(4.0, 0.4)),
+                ]
+            ),
+        )
+
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "data.napybin"))
+            with patch.dict("sys.modules"):
+                from napytau.import_export.import_export import (
+                    import_binary_format_from_file,
+                    save_binary_format_to_file,
+                )
+
+                save_binary_format_to_file(dataset, file_path)
+                (imported_dataset, _) = import_binary_format_from_file(file_path)
+                # The imported arrays map the file which is replaced here
+                save_binary_format_to_file(imported_dataset, file_path, [])
+                (reimported_dataset, reimported_raw_setups) = (
+                    import_binary_format_from_file(file_path)
+                )
+
+                self.assertEqual(reimported_raw_setups, [])
+                self.assertEqual(
+                    list(reimported_dataset.get_datapoints()),
+                    list(dataset.get_datapoints()),
+                )
+                self.assertEqual(
+                    list(imported_dataset.get_datapoints()),
+                    list(dataset.get_datapoints()),
+                )
+            self.assertEqual(os.listdir(directory_path), ["data.napybin"])
+
+    def test_raisesAnErrorForAnEmptyBinaryFormatFile(self):
+        """Raises an error for an empty binary format file."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "data.napybin"))
+            open(file_path, "wb").close()
+            with patch.dict("sys.modules"):
+                from napytau.import_export.import_export import (
+                    import_binary_format_from_file,
+                )
+
+                with self.assertRaises(ImportExportError):
+                    import_binary_format_from_file(file_path)
+
+    def test_streamsADatasetWithARepeatedDistanceLikeItIsImported(self):
+        """Keeps the last datapoint of a repeated distance when streaming a file."""
+        datapoint = {
+            "distance": 1.0,
+            "distanceError": 0.1,
+            "calibration": 1.0,
+            "calibrationError": 0.1,
+            "shiftedIntensity": 1.0,
+            "shiftedIntensityError": 0.1,
+            "unshiftedIntensity": 1.0,
+            "unshiftedIntensityError": 0.1,
+        }
+        json_data = {
+            "relativeVelocity": 0.5,
+            "relativeVelocityError": 0.01,
+            "setups": [],
+            "datapoints": [
+                datapoint,
+                {**datapoint, "distance": 2.0},
+                {**datapoint, "shiftedIntensity": 2.0},
+            ],
+        }
+
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "data.napytau.json"))
+            with open(file_path, "w") as file:
+                json.dump(json_data, file)
+            with patch.dict("sys.modules"):
+                from napytau.import_export.import_export import (
+                    import_napytau_format_from_file,
+                    stream_napytau_format_from_file,
+                )
+
+                (imported_dataset, _) = import_napytau_format_from_file(file_path)
+                (streamed_dataset, _) = stream_napytau_format_from_file(file_path)
+
+        self.assertEqual(
+            imported_dataset.get_datapoints()
+            .get_shifted_intensities()
+            .get_values()
+            .tolist(),
+            [2.0, 1.0],
+        )
+        self.assertEqual(
+            list(streamed_dataset.get_datapoints()),
+            list(imported_dataset.get_datapoints()),
+        )
+        self.assertEqual(
+            streamed_dataset.get_relative_velocity(),
+            imported_dataset.get_relative_velocity(),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,13 @@
 import unittest
 
+import numpy as np
+
 from napytau.import_export.model.datapoint import Datapoint
 from napytau.import_export.model.datapoint_collection import DatapointCollection
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+)
 from napytau.util.model.ValueErrorPairCollection import ValueErrorPairCollection
 from napytau.util.model.value_error_pair import ValueErrorPair
 
@@ -351,6 +357,126 @@ class DatapointCollectionUnitTest(unittest.TestCase):
             [collection.elements[hash(12.12)], collection.elements[hash(12.14)]],
         )
 
+    def test_storesTheValuesOfAFieldInAContiguousArray(self):
+        """Stores the values of a field in a contiguous array"""
+        collection = DatapointCollection(
+            [
+                Datapoint(
+                    distance=ValueErrorPair(12.12, 0.1),
+                ),
+                Datapoint(
+                    distance=ValueErrorPair(12.13, 0.2),
+                ),
+            ]
+        )
+
+        distances = collection.get_distances().get_values()
+
+        self.assertEqual(distances.dtype, np.float64)
+        self.assertTrue(distances.flags.c_contiguous)
+        self.assertFalse(distances.flags.writeable)
+        np.testing.assert_array_equal(distances, np.array([12.12, 12.13]))
+        np.testing.assert_array_equal(
+            collection.get_distances().get_errors(), np.array([0.1, 0.2])
+        )
+
+    def test_writesChangesOfADatapointThroughToTheColumns(self):
+        """Writes changes of a datapoint through to the columns"""
+        collection = DatapointCollection(
+            [
+                Datapoint(
+                    distance=ValueErrorPair(12.12, 0.1),
+                ),
+                Datapoint(
+                    distance=ValueErrorPair(12.13, 0.1),
+                ),
+            ]
+        )
+
+        collection[1].set_tau(ValueErrorPair(2.0, 0.2))
+        collection[0].active = False
+
+        self.assertEqual(
+            collection.get_taus(),
+            ValueErrorPairCollection([ValueErrorPair(2.0, 0.2)]),
+        )
+        np.testing.assert_array_equal(
+            collection.get_active_mask(), np.array([False, True])
+        )
+
+    def test_keepsDatapointsSharedBetweenCollectionsInSync(self):
+        """Keeps datapoints shared between collections in sync"""
+        datapoint = Datapoint(
+            distance=ValueErrorPair(12.12, 0.1),
+        )
+        first_collection = DatapointCollection([datapoint])
+        second_collection = DatapointCollection([datapoint])
+
+        second_collection[0].set_calibration(ValueErrorPair(1.0, 0.1))
+        datapoint.set_active(False)
+
+        self.assertEqual(first_collection[0].calibration, ValueErrorPair(1.0, 0.1))
+        self.assertEqual(datapoint.calibration, ValueErrorPair(1.0, 0.1))
+        np.testing.assert_array_equal(
+            first_collection.get_active_mask(), np.array([False])
+        )
+        np.testing.assert_array_equal(
+            second_collection.get_active_mask(), np.array([False])
+        )
+
+    def test_detachesAnOverriddenDatapointFromTheColumns(self):
+        """Detaches an overridden datapoint from the columns"""
+        old_datapoint = Datapoint(
+            distance=ValueErrorPair(12.12, 0.1),
+            tau=ValueErrorPair(1.0, 0.1),
+        )
+        collection = DatapointCollection([old_datapoint])
+
+        collection.add_datapoint(
+            Datapoint(
+                distance=ValueErrorPair(12.12, 0.1),
+                tau=ValueErrorPair(2.0, 0.1),
+            )
+        )
+        old_datapoint.set_tau(ValueErrorPair(3.0, 0.1))
+
+        self.assertEqual(old_datapoint.tau, ValueErrorPair(3.0, 0.1))
+        self.assertEqual(
+            collection.get_taus(),
+            ValueErrorPairCollection([ValueErrorPair(2.0, 0.1)]),
+        )
+
+    def test_canBeCreatedOnTopOfFilledColumns(self):
+        """Can be created on top of filled columns"""
+        columns = DatapointColumns()
+        for distance in [2.5, 1.5]:
+            row = columns.append_row()
+            columns.set_value_error_pair(
+                DatapointField.DISTANCE, row, ValueErrorPair(distance, 0.1)
+            )
+
+        collection = DatapointCollection.from_columns(columns)
+
+        self.assertEqual(len(collection), 2)
+        self.assertEqual(
+            collection.get_datapoint_by_distance(1.5).distance,
+            ValueErrorPair(1.5, 0.1),
+        )
+        collection.get_datapoint_by_distance(2.5).set_active(False)
+        np.testing.assert_array_equal(collection.get_active_mask(), [False, True])
+
+    def test_raisesErrorWhenCreatedOnTopOfColumnsWithRepeatedDistances(self):
+        """Raises an error when created on top of columns with repeated distances"""
+        columns = DatapointColumns()
+        for _ in range(2):
+            row = columns.append_row()
+            columns.set_value_error_pair(
+                DatapointField.DISTANCE, row, ValueErrorPair(1.0, 0.1)
+            )
+
+        with self.assertRaises(ValueError):
+            DatapointCollection.from_columns(columns)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+
+import numpy as np
+
+from napytau.import_export.model.datapoint_columns import (
+    DatapointColumns,
+    DatapointField,
+    find_rows_of_unique_distances,
+)
+from napytau.util.model.value_error_pair import ValueErrorPair
+
+
+class DatapointColumnsUnitTest(unittest.TestCase):
+    def test_growsWhenRowsAreAppended(self):
+        """Grows when rows are appended"""
+        columns = DatapointColumns()
+
+        for index in range(20):
+            row = columns.append_row()
+            columns.set_value_error_pair(
+                DatapointField.DISTANCE, row, ValueErrorPair(float(index), 0.1)
+            )
+
+        self.assertEqual(columns.size, 20)
+        np.testing.assert_array_equal(
+            columns.get_values(DatapointField.DISTANCE), np.arange(20, dtype=float)
+        )
+        np.testing.assert_array_equal(
+            columns.get_active_mask(), np.ones(20, dtype=bool)
+        )
+
+    def test_marksUnsetFieldsAsAbsent(self):
+        """Marks unset fields as absent"""
+        columns = DatapointColumns()
+        columns.append_row()
+        columns.append_row()
+
+        columns.set_value_error_pair(DatapointField.TAU, 1, ValueErrorPair(2.0, 0.2))
+
+        self.assertIsNone(columns.get_value_error_pair(DatapointField.TAU, 0))
+        self.assertEqual(
+            columns.get_value_error_pair(DatapointField.TAU, 1),
+            ValueErrorPair(2.0, 0.2),
+        )
+        np.testing.assert_array_equal(
+            columns.get_presence(DatapointField.TAU), np.array([False, True])
+        )
+        self.assertEqual(columns.get_present_count(DatapointField.TAU), 1)
+        self.assertTrue(np.isnan(columns.get_values(DatapointField.TAU)[0]))
+
+    def test_updatesThePresentCountWhenAFieldIsUnset(self):
+        """Updates the present count when a field is unset"""
+        columns = DatapointColumns()
+        columns.append_row()
+
+        columns.set_value_error_pair(
+            DatapointField.CALIBRATION, 0, ValueErrorPair(1.0, 0.1)
+        )
+        columns.set_value_error_pair(
+            DatapointField.CALIBRATION, 0, ValueErrorPair(2.0, 0.1)
+        )
+        self.assertEqual(columns.get_present_count(DatapointField.CALIBRATION), 1)
+
+        columns.set_value_error_pair(DatapointField.CALIBRATION, 0, None)
+        self.assertEqual(columns.get_present_count(DatapointField.CALIBRATION), 0)
+
+    def test_canCopyARowFromOtherColumns(self):
+        """Can copy a row from other columns"""
+        source = DatapointColumns()
+        source.append_row()
+        source.set_value_error_pair(
+            DatapointField.SHIFTED_INTENSITY, 0, ValueErrorPair(5.0, 0.5)
+        )
+        source.set_active(0, False)
+        columns = DatapointColumns()
+        columns.append_row()
+
+        columns.copy_row(source, 0, 0)
+
+        self.assertEqual(
+            columns.get_value_error_pair(DatapointField.SHIFTED_INTENSITY, 0),
+            ValueErrorPair(5.0, 0.5),
+        )
+        self.assertFalse(columns.is_active(0))
+        self.assertEqual(columns.get_present_count(DatapointField.SHIFTED_INTENSITY), 1)
+
+    def test_canBeCreatedFromArrays(self):
+        """Can be created from arrays"""
+        values = np.arange(14, dtype=float).reshape(7, 2)
+        errors = values / 10
+        present = np.zeros((7, 2), dtype=bool)
+        present[DatapointField.DISTANCE] = True
+        present[DatapointField.CALIBRATION, 1] = True
+
+        columns = DatapointColumns.from_arrays(values, errors, present)
+
+        self.assertEqual(columns.size, 2)
+        np.testing.assert_array_equal(
+            columns.get_values(DatapointField.DISTANCE), [0.0, 1.0]
+        )
+        self.assertIsNone(columns.get_value_error_pair(DatapointField.CALIBRATION, 0))
+        self.assertEqual(
+            columns.get_value_error_pair(DatapointField.CALIBRATION, 1),
+            ValueErrorPair(3.0, 0.3),
+        )
+        self.assertEqual(columns.get_present_count(DatapointField.CALIBRATION), 1)
+        np.testing.assert_array_equal(columns.get_active_mask(), [True, True])
+
+    def test_wrapsArraysWithoutCopyingThem(self):
+        """Wraps arrays without copying them"""
+        values = np.full((len(DatapointField), 2), np.nan)
+        values[DatapointField.DISTANCE] = [0.0, 1.0]
+        errors = np.full((len(DatapointField), 2), np.nan)
+        errors[DatapointField.DISTANCE] = [0.1, 0.1]
+        present = np.zeros((len(DatapointField), 2), dtype=bool)
+        present[DatapointField.DISTANCE] = True
+        active = np.array([True, False])
+
+        columns = DatapointColumns.wrap_arrays(values, errors, present, active)
+
+        self.assertEqual(columns.size, 2)
+        self.assertTrue(np.shares_memory(columns.values, values))
+        self.assertTrue(np.shares_memory(columns.active, active))
+        self.assertEqual(columns.get_present_count(DatapointField.DISTANCE), 2)
+        self.assertEqual(columns.get_present_count(DatapointField.TAU), 0)
+        np.testing.assert_array_equal(columns.get_active_mask(), [True, False])
+
+    def test_canSelectRowsWithAMask(self):
+        """Can select rows with a mask"""
+        columns = DatapointColumns()
+        for index in range(3):
+            row = columns.append_row()
+            columns.set_value_error_pair(
+                DatapointField.DISTANCE, row, ValueErrorPair(float(index), 0.1)
+            )
+        columns.set_value_error_pair(DatapointField.TAU, 2, ValueErrorPair(5.0, 0.5))
+
+        selected_columns = columns.select_rows(np.array([True, False, True]))
+
+        self.assertEqual(selected_columns.size, 2)
+        np.testing.assert_array_equal(
+            selected_columns.get_values(DatapointField.DISTANCE), [0.0, 2.0]
+        )
+        self.assertEqual(selected_columns.get_present_count(DatapointField.TAU), 1)
+        self.assertFalse(np.shares_memory(selected_columns.values, columns.values))
+
+        with self.assertRaises(ValueError):
+            columns.select_rows(np.array([True, False]))
+
+    def test_raisesAnErrorIfTheWrappedArraysDoNotMatch(self):
+        """Raises an error if the wrapped arrays do not match"""
+        values = np.zeros((len(DatapointField), 2))
+
+        with self.assertRaises(ValueError):
+            DatapointColumns.wrap_arrays(
+                values, values, np.zeros((2, 2), dtype=bool), np.ones(2, dtype=bool)
+            )
+
+    def test_findsTheLastRowOfRepeatedDistancesInTheOrderOfTheirFirstRow(self):
+        """Finds the last row of repeated distances in the order of their first row"""
+        rows = find_rows_of_unique_distances(np.array([3.0, 1.0, 3.0, 2.0, 1.0]))
+
+        np.testing.assert_array_equal(rows, np.array([2, 4, 3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
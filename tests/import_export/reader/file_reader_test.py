@@ -1,3 +1,6 @@
+import hashlib
+import os
+import tempfile
 import unittest
 from pathlib import PurePath
 from unittest.mock import MagicMock, patch
@@ -58,6 +61,95 @@ class FileReaderUnitTest(unittest.TestCase):
                 text = FileReader.read_text(PurePath("test.txt"))
                 self.assertEqual(text, "text")
 
+    def test_raisesAnErrorIfTheFileDoesNotExistWhenOpeningText(self):
+        """Raises an error if the file does not exist when opening text."""
+        path_mock, isfile_mock = set_up_mocks()
+        isfile_mock.return_value = False
+        with patch.dict("sys.modules", {"os.path": path_mock}):
+            from napytau.import_export.reader.file_reader import FileReader
+
+            with self.assertRaises(FileNotFoundError):
+                FileReader.open_text(PurePath("test.txt"))
+
+    def test_calculatesTheSha256ChecksumOfTheFile(self):
+        """Calculates the SHA-256 checksum of the file."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "test.json")
+            with open(file_path, "wb") as file:
+                file.write(b"{}" * 1000)
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.reader.file_reader import FileReader
+
+                checksum = FileReader.calculate_checksum(PurePath(file_path))
+
+        self.assertEqual(checksum, hashlib.sha256(b"{}" * 1000).hexdigest())
+
+    def test_iteratesLazilyOverTheRowsOfTheFile(self):
+        """Iterates lazily over the rows of the file like reading them does."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "test.fit")
+            with open(file_path, "wb") as file:
+                file.write(b"row1\nrow2\r\nrow3")
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.reader.file_reader import FileReader
+
+                rows = FileReader.iterate_rows(PurePath(file_path))
+                self.assertEqual(next(rows), "row1\n")
+                self.assertEqual(
+                    list(rows), FileReader.read_rows(PurePath(file_path))[1:]
+                )
+
+    def test_iteratesOverNoRowsOfAnEmptyFile(self):
+        """Iterates over no rows of an empty file."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "test.fit")
+            open(file_path, "wb").close()
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.reader.file_reader import FileReader
+
+                self.assertEqual(list(FileReader.iterate_rows(PurePath(file_path))), [])
+
+    def test_raisesAnErrorIfTheFileDoesNotExistWhenIteratingRows(self):
+        """Raises an error if the file does not exist when iterating rows."""
+        path_mock, isfile_mock = set_up_mocks()
+        isfile_mock.return_value = False
+        with patch.dict("sys.modules", {"os.path": path_mock}):
+            from napytau.import_export.reader.file_reader import FileReader
+
+            with self.assertRaises(FileNotFoundError):
+                FileReader.iterate_rows(PurePath("test.fit"))
+
+    def test_mapsTheBytesOfTheFileCopyOnWrite(self):
+        """Maps the bytes of the file, changes are not written back."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "test.napybin")
+            with open(file_path, "wb") as file:
+                file.write(b"binary")
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.reader.file_reader import FileReader
+
+                buffer = FileReader.map_bytes(PurePath(file_path))
+                self.assertEqual(bytes(buffer), b"binary")
+                buffer[0:1] = b"B"
+                buffer.close()
+
+            with open(file_path, "rb") as file:
+                self.assertEqual(file.read(), b"binary")
+
+    def test_raisesAnErrorIfTheFileDoesNotExistWhenMappingBytes(self):
+        """Raises an error if the file does not exist when mapping bytes."""
+        path_mock, isfile_mock = set_up_mocks()
+        isfile_mock.return_value = False
+        with patch.dict("sys.modules", {"os.path": path_mock}):
+            from napytau.import_export.reader.file_reader import FileReader
+
+            with self.assertRaises(FileNotFoundError):
+                FileReader.map_bytes(PurePath("test.napybin"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from pathlib import PurePath
 from unittest.mock import MagicMock, patch
@@ -32,6 +34,77 @@ class FileReaderUnitTest(unittest.TestCase):
             write_function_mock = open_mock.return_value.__enter__.return_value.write
             write_function_mock.assert_called_once_with("text")
 
+    def test_writesBytesChunksToTheFileAtTheGivenPath(self):
+        """Writes bytes chunks to the file at the given path."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "test.napybin"))
+            with open(file_path, "wb") as file:
+                file.write(b"old")
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.writer.file_writer import FileWriter
+
+                FileWriter.write_bytes(file_path, iter([b"a", b"bc"]))
+
+            with open(file_path, "rb") as file:
+                self.assertEqual(file.read(), b"abc")
+            self.assertEqual(os.listdir(directory_path), ["test.napybin"])
+
+    def test_replacesTheFileOnlyOnceTheAtomicallyOpenedFileIsComplete(self):
+        """Replaces the file only once the atomically opened file is complete."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "test.json"))
+            with open(file_path, "w") as file:
+                file.write("old")
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.writer.file_writer import FileWriter
+
+                with FileWriter.open_text_atomically(file_path) as file:
+                    file.write("new")
+                    with open(file_path) as original_file:
+                        self.assertEqual(original_file.read(), "old")
+
+            with open(file_path) as file:
+                self.assertEqual(file.read(), "new")
+            self.assertEqual(os.listdir(directory_path), ["test.json"])
+
+    def test_keepsTheFileIfWritingTheAtomicallyOpenedFileFails(self):
+        """Keeps the file and removes the temporary file if writing fails."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = PurePath(os.path.join(directory_path, "test.json"))
+            with open(file_path, "w") as file:
+                file.write("old")
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.writer.file_writer import FileWriter
+
+                with self.assertRaises(ValueError):
+                    with FileWriter.open_text_atomically(file_path) as file:
+                        file.write("half")
+                        raise ValueError("error")
+
+            with open(file_path) as file:
+                self.assertEqual(file.read(), "old")
+            self.assertEqual(os.listdir(directory_path), ["test.json"])
+
+    def test_givesTheAtomicallyWrittenFileThePermissionsOfANewFile(self):
+        """Gives the atomically written file the permissions of any new file."""
+        with tempfile.TemporaryDirectory() as directory_path:
+            reference_path = os.path.join(directory_path, "reference.json")
+            open(reference_path, "w").close()
+            file_path = PurePath(os.path.join(directory_path, "test.json"))
+
+            with patch.dict("sys.modules"):
+                from napytau.import_export.writer.file_writer import FileWriter
+
+                with FileWriter.open_text_atomically(file_path) as file:
+                    file.write("new")
+
+            self.assertEqual(
+                os.stat(file_path).st_mode, os.stat(reference_path).st_mode
+            )
+
 
 if __name__ == "__main__":
     unittest.main()